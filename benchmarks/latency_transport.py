@@ -0,0 +1,92 @@
+"""A simulated transport that models serial line rate, link RTT and jitter.
+
+Reply contents come from ``SimulatedTransport``; this wrapper only decides
+*when* each reply becomes readable:
+
+- bytes leave the host one at a time at ``10 / baudrate`` seconds per byte
+  (8N1 framing), and the link carries one write at a time;
+- the robot's reply is ready ``rtt`` seconds (plus up to ``jitter``) after the
+  command has been fully transmitted, plus its own transmission time;
+- replies are delivered in order.
+
+``readline`` sleeps until the head reply is ready, so wall-clock measurements
+taken over this transport reflect the modelled link.
+"""
+from __future__ import annotations
+
+import random
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from pyallcode.comm.transport import SimulatedTransport
+
+
+class LatencyTransport:
+    """Transport with a modelled link delay in front of a simulated robot.
+
+    Args:
+        baudrate (int): Serial line rate used for per-byte transmission time.
+        rtt (float): Round-trip link latency in seconds (e.g. ~0.03 for Bluetooth SPP).
+        jitter (float): Maximum extra random delay per reply in seconds.
+        seed (int | None): Seed for the jitter RNG.
+        timeout (float): Seconds ``readline`` waits before returning b''.
+    """
+
+    def __init__(self, baudrate: int = 115200, rtt: float = 0.0, jitter: float = 0.0,
+                 seed: Optional[int] = 0, timeout: float = 1.0) -> None:
+        self.byte_time = 10.0 / float(baudrate)
+        self.rtt = rtt
+        self.jitter = jitter
+        self.timeout = timeout
+        self._rng = random.Random(seed)
+        self._sim = SimulatedTransport(seed=seed, echo=False)
+        self._ready_at: Deque[float] = deque()
+        self._tx_free_at = 0.0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def open(self, port: str) -> None:
+        self._sim.open(port)
+
+    def close(self) -> None:
+        self._sim.close()
+        self._ready_at.clear()
+
+    def write(self, data: bytes) -> None:
+        now = time.perf_counter()
+        tx_done = max(now, self._tx_free_at) + len(data) * self.byte_time
+        self._tx_free_at = tx_done
+        self.bytes_written += len(data)
+        before = self._sim.in_waiting
+        self._sim.write(data)
+        if self._sim.in_waiting > before:
+            # Typical integer reply: a few digits plus newline
+            ready = tx_done + self.rtt + self._rng.uniform(0.0, self.jitter) + 6 * self.byte_time
+            if self._ready_at:
+                ready = max(ready, self._ready_at[-1])
+            self._ready_at.append(ready)
+
+    def readline(self) -> bytes:
+        if not self._ready_at:
+            time.sleep(self.timeout)
+            return b""
+        wait = self._ready_at[0] - time.perf_counter()
+        if wait > self.timeout:
+            time.sleep(self.timeout)
+            return b""
+        if wait > 0:
+            time.sleep(wait)
+        self._ready_at.popleft()
+        line = self._sim.readline()
+        self.bytes_read += len(line)
+        return line
+
+    @property
+    def in_waiting(self) -> int:
+        now = time.perf_counter()
+        return sum(1 for t in self._ready_at if t <= now)
+
+    @property
+    def is_open(self) -> bool:
+        return self._sim.is_open
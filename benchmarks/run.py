@@ -0,0 +1,151 @@
+"""Benchmark runner for the pyallcode command path.
+
+Drives ``Connection``, ``Robot`` and every device class over
+``LatencyTransport`` and prints throughput, latency percentiles and CPU time
+per operation. Run from the repository root:
+
+    python -m benchmarks.run                      # ideal link (no RTT)
+    python -m benchmarks.run --rtt 0.03 --jitter 0.005 -n 50
+    python -m benchmarks.run -k snapshot --max-p99-ms 80   # fail on regression
+
+Each scenario runs ``-n`` operations; one operation is one API call (for
+example one ``IRSensors.read`` or one ``Robot.snapshot``).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from pyallcode.comm.connection import Connection
+from pyallcode.robot import Robot
+from pyallcode.devices.accelerometer import Accelerometer
+from pyallcode.devices.buttons import PushButtons
+from pyallcode.devices.ir import IRSensors
+from pyallcode.devices.lcd import LCD
+from pyallcode.devices.leds import LEDs
+from pyallcode.devices.light import LightSensor
+from pyallcode.devices.line import LineSensors
+from pyallcode.devices.mic import Mic
+from pyallcode.devices.servos import Servos
+
+from .latency_transport import LatencyTransport
+
+
+def _robot(transport: LatencyTransport) -> Robot:
+    robot = Robot(autoconn=False)
+    robot.transport = robot.conn.transport = transport
+    transport.open("BENCH")
+    return robot
+
+
+def scenarios(robot: Robot) -> Dict[str, Callable[[], object]]:
+    """Return the benchmark scenarios keyed by name."""
+    conn: Connection = robot.conn
+    ir = IRSensors(conn)
+    sweep = [f"ReadIR {i}" for i in range(8)] + ["ReadLine 0", "ReadLight"]
+    return {
+        "conn.execute ReadIR": lambda: conn.execute("ReadIR 2"),
+        "conn.execute fire-and-forget": lambda: conn.execute("LEDOn 1", expect_response=False),
+        "conn.read_value": lambda: (conn.send("ReadMic\n"), conn.read_value("ReadMic")),
+        "10 reads sequential": lambda: [conn.execute(c) for c in sweep],
+        "10 reads execute_many": lambda: conn.execute_many(sweep),
+        "robot.snapshot": robot.snapshot,
+        "robot.get_battery_voltage": robot.get_battery_voltage,
+        "robot.set_motors": lambda: robot.set_motors(50, 50),
+        "Accelerometer.x": Accelerometer(conn).x,
+        "PushButtons.read": lambda: PushButtons(conn).read(0),
+        "IRSensors.read": lambda: ir.read(2),
+        "LCD.pixel": lambda: LCD(conn).pixel(1, 1, 1),
+        "LEDs.write": lambda: LEDs(conn).write(0x55),
+        "LightSensor.read": LightSensor(conn).read,
+        "LineSensors.read": lambda: LineSensors(conn).read(0),
+        "Mic.read": Mic(conn).read,
+        "Servos.set_pos": lambda: Servos(conn).set_pos(1, 90),
+    }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def measure(op: Callable[[], object], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    """Time ``iterations`` calls of ``op``; return throughput/latency/CPU stats."""
+    for _ in range(warmup):
+        op()
+    latencies: List[float] = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        op()
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    latencies.sort()
+    return {
+        "ops_per_sec": iterations / wall if wall > 0 else float("inf"),
+        "p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "cpu_us_per_op": cpu / iterations * 1e6,
+    }
+
+
+def run(args: argparse.Namespace) -> List[Tuple[str, Dict[str, float]]]:
+    """Run the selected scenarios and return ``(name, stats)`` rows."""
+    transport = LatencyTransport(baudrate=args.baud, rtt=args.rtt, jitter=args.jitter, seed=args.seed)
+    robot = _robot(transport)
+    rows = []
+    for name, op in scenarios(robot).items():
+        if args.k and args.k.lower() not in name.lower():
+            continue
+        rows.append((name, measure(op, args.iterations)))
+    robot.close()
+    return rows
+
+
+def print_table(rows: List[Tuple[str, Dict[str, float]]], args: argparse.Namespace) -> None:
+    """Print results as an aligned text table."""
+    print(f"link: baud={args.baud} rtt={args.rtt * 1e3:.1f}ms jitter={args.jitter * 1e3:.1f}ms "
+          f"iterations={args.iterations}")
+    header = f"{'scenario':32} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'cpu us/op':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, s in rows:
+        print(f"{name:32} {s['ops_per_sec']:>10.1f} {s['p50_ms']:>9.3f} {s['p99_ms']:>9.3f} "
+              f"{s['cpu_us_per_op']:>10.1f}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=200, help="operations per scenario")
+    parser.add_argument("-k", default="", help="only run scenarios whose name contains this text")
+    parser.add_argument("--baud", type=int, default=115200, help="modelled serial baud rate")
+    parser.add_argument("--rtt", type=float, default=0.0, help="modelled link round trip in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="max extra random reply delay in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the jitter RNG")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--max-p99-ms", type=float, default=None,
+                        help="exit with status 1 if any scenario's p99 latency exceeds this")
+    args = parser.parse_args(argv)
+
+    rows = run(args)
+    if args.json:
+        print(json.dumps({name: stats for name, stats in rows}, indent=2))
+    else:
+        print_table(rows, args)
+    if args.max_p99_ms is not None:
+        slow = [name for name, s in rows if s["p99_ms"] > args.max_p99_ms]
+        if slow:
+            print(f"p99 above {args.max_p99_ms} ms: {', '.join(slow)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,10 @@
 Provides access to the Robot class, enums, and communication port utilities.
 """
 from .robot import Robot
+from .async_robot import AsyncRobot
+from .snapshot import Snapshot
+from .sampler import Sampler
+from .events import EventMonitor
 from .enums import (
     Axis,
     Button,
@@ -13,10 +17,16 @@ from .comm.ports import (
     list_ports_detailed,
     find_robot_ports,
     autodetect_robot_port,
+    autodetect_robot_ports,
+    forget_robot_port,
 )
 
 __all__ = [
     "Robot",
+    "AsyncRobot",
+    "Snapshot",
+    "Sampler",
+    "EventMonitor",
     "AccelerometerAxis",
     "ButtonIndex",
     "LineSensorIndex",
@@ -25,4 +35,6 @@ __all__ = [
     "list_ports_detailed",
     "find_robot_ports",
     "autodetect_robot_port",
+    "autodetect_robot_ports",
+    "forget_robot_port",
 ]
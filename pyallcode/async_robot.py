@@ -0,0 +1,208 @@
+"""Module providing the AsyncRobot class, an asyncio counterpart of Robot.
+
+All commands are coroutines backed by an ``AsyncConnection``, so long moves
+and sensor reads on many robots can be awaited concurrently from one event
+loop instead of parking a thread per call.
+
+Example:
+
+    async with AsyncRobot() as bot:
+        await bot.forwards(100)
+        front = await bot.ir_sensors.read(2)
+"""
+from __future__ import annotations
+
+import asyncio
+
+from .comm.clock import clock_of
+from .comm.transport import SerialTransport, SimulatedTransport, transport_mode_from_env
+from .comm.commands import (
+    BACKWARDS,
+    FORWARDS,
+    GET_API_VERSION,
+    GET_BATTERY_VOLTAGE,
+    LEFT,
+    RIGHT,
+    SET_MOTORS,
+    move_timeout,
+)
+from .comm.async_connection import AsyncConnection
+from .comm.ports import autodetect_robot_port
+from .devices.async_devices import (
+    AsyncAccelerometer,
+    AsyncPushButtons,
+    AsyncIRSensors,
+    AsyncLCD,
+    AsyncLEDs,
+    AsyncLightSensor,
+    AsyncLineSensors,
+    AsyncMic,
+    AsyncSDCard,
+    AsyncServos,
+    AsyncSpeaker,
+)
+from .snapshot import SENSOR_COMMANDS, Snapshot, build_snapshot, resolve_sensors
+
+
+class AsyncRobot:
+    """Represents the AllCode robot with an asyncio API.
+
+    Construction never touches the hardware; call ``await autoconnect()`` or
+    ``await open(port)``, or use the robot as an async context manager.
+
+    Args:
+        verbose (int): Verbosity level for connection debugging (default: 0).
+        mm_per_sec (int): Speed in mm/s for movement commands (default: 50).
+        deg_per_sec (int): Speed in degrees/s for turn commands (default: 45).
+
+    Attributes:
+        transport (Transport): The transport layer for communication.
+        conn (AsyncConnection): The connection object for sending commands.
+        accelerometer, push_buttons, ir_sensors, lcd, leds, light_sensor,
+        line_sensors, mic, sd_card, servo, speaker: Async device interfaces,
+            mirroring the ``Robot`` attributes of the same name.
+    """
+
+    def __init__(self, verbose: int = 0, mm_per_sec: int = 50, deg_per_sec: int = 45) -> None:
+        self._forced_mode = transport_mode_from_env()
+        if self._forced_mode == "simulated":
+            self.transport = SimulatedTransport()
+        else:
+            # The reader thread keeps readline non-blocking for the event loop
+            self.transport = SerialTransport(reader_thread=True)
+        self.conn = AsyncConnection(self.transport, verbose=verbose)
+        self.mm_per_sec = max(1, mm_per_sec)
+        self.deg_per_sec = max(1, deg_per_sec)
+        self.accelerometer = AsyncAccelerometer(self.conn)
+        self.push_buttons = AsyncPushButtons(self.conn)
+        self.ir_sensors = AsyncIRSensors(self.conn)
+        self.lcd = AsyncLCD(self.conn)
+        self.leds = AsyncLEDs(self.conn)
+        self.light_sensor = AsyncLightSensor(self.conn)
+        self.line_sensors = AsyncLineSensors(self.conn)
+        self.mic = AsyncMic(self.conn)
+        self.sd_card = AsyncSDCard(self.conn)
+        self.servo = AsyncServos(self.conn)
+        self.speaker = AsyncSpeaker(self.conn)
+
+    async def __aenter__(self) -> "AsyncRobot":
+        if not self.transport.is_open:
+            await self.autoconnect()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def open(self, port: str | int) -> None:
+        """Open connection to the robot on the specified port.
+
+        Falls back to the simulated transport if the port cannot be opened.
+
+        Args:
+            port (str | int): The port name or index to open.
+        """
+        try:
+            await self.conn.open(port)
+        except Exception as e:
+            self._use_simulated(str(port) if isinstance(port, str) else f"SIMULATED-{port}")
+            if self.conn.verbose:
+                print(f"[SimulatedRobot] Falling back to simulated transport: {e}")
+
+    async def close(self) -> None:
+        """Close the connection to the robot."""
+        await self.conn.close()
+
+    async def autoconnect(self,
+                          prefer_keywords: list[str] | None = None,
+                          max_to_probe: int | None = None,
+                          per_port_timeout: float = 0.75) -> str:
+        """Discover and open the robot's serial port.
+
+        Port probing runs in the default executor. Falls back to the simulated
+        transport when no robot responds or simulation is forced.
+
+        Returns:
+            str: The device path of the connected port, or 'SIMULATED'.
+        """
+        if self._forced_mode == "simulated":
+            self.transport.open("SIMULATED")
+            return "SIMULATED"
+        loop = asyncio.get_running_loop()
+        port = await loop.run_in_executor(
+            None, autodetect_robot_port, prefer_keywords, max_to_probe, per_port_timeout)
+        if port:
+            await self.open(port)
+            return port
+        self._use_simulated("SIMULATED")
+        if self.conn.verbose:
+            print("[SimulatedRobot] No serial hardware detected; using simulated transport")
+        return "SIMULATED"
+
+    def set_verbose(self, value: int) -> None:
+        """Set the verbosity level of the connection."""
+        self.conn.verbose = value
+
+    def _use_simulated(self, label: str) -> None:
+        self.transport = SimulatedTransport()
+        self.conn.transport = self.transport
+        self.transport.open(label)
+
+    # ----- movement & commands -----
+    async def get_api_version(self) -> int:
+        """Get the API version of the robot firmware."""
+        return int(await self.conn.execute(GET_API_VERSION()) or -1)
+
+    async def get_battery_voltage(self) -> int:
+        """Get the battery voltage in millivolts."""
+        return int(await self.conn.execute(GET_BATTERY_VOLTAGE()) or -1)
+
+    async def set_motors(self, left: int, right: int) -> None:
+        """Set the left and right motor speeds."""
+        await self.conn.execute(SET_MOTORS(left, right), expect_response=False)
+
+    async def forwards(self, distance_mm: int) -> int:
+        """Move forwards by the distance in millimeters and await completion."""
+        timeout = move_timeout(distance_mm, self.mm_per_sec)
+        return int(await self.conn.execute(FORWARDS(distance_mm), True, timeout) or -1)
+
+    async def backwards(self, distance_mm: int) -> int:
+        """Move backwards by the distance in millimeters and await completion."""
+        timeout = move_timeout(distance_mm, self.mm_per_sec)
+        return int(await self.conn.execute(BACKWARDS(distance_mm), True, timeout) or -1)
+
+    async def left(self, angle_deg: int) -> int:
+        """Turn left by the angle in degrees and await completion."""
+        timeout = move_timeout(angle_deg, self.deg_per_sec)
+        return int(await self.conn.execute(LEFT(angle_deg), True, timeout) or -1)
+
+    async def right(self, angle_deg: int) -> int:
+        """Turn right by the angle in degrees and await completion."""
+        timeout = move_timeout(angle_deg, self.deg_per_sec)
+        return int(await self.conn.execute(RIGHT(angle_deg), True, timeout) or -1)
+
+    def start_forwards(self, distance_mm: int) -> "asyncio.Future[int]":
+        """Send a forwards move and return a future for its completion reply.
+
+        The move is written before this returns, so commands awaited afterwards
+        follow it on the wire; their replies still go to their own callers.
+        """
+        return self.conn.submit(FORWARDS(distance_mm), move_timeout(distance_mm, self.mm_per_sec))
+
+    def start_backwards(self, distance_mm: int) -> "asyncio.Future[int]":
+        """Send a backwards move; see ``start_forwards``."""
+        return self.conn.submit(BACKWARDS(distance_mm), move_timeout(distance_mm, self.mm_per_sec))
+
+    def start_left(self, angle_deg: int) -> "asyncio.Future[int]":
+        """Send a left turn; see ``start_forwards``."""
+        return self.conn.submit(LEFT(angle_deg), move_timeout(angle_deg, self.deg_per_sec))
+
+    def start_right(self, angle_deg: int) -> "asyncio.Future[int]":
+        """Send a right turn; see ``start_forwards``."""
+        return self.conn.submit(RIGHT(angle_deg), move_timeout(angle_deg, self.deg_per_sec))
+
+    async def snapshot(self, sensors: list[str] | None = None) -> Snapshot:
+        """Read several sensors concurrently; see ``Robot.snapshot``."""
+        chosen = resolve_sensors(sensors)
+        commands = [c for name in chosen for c in SENSOR_COMMANDS[name]]
+        timestamp = clock_of(self.conn.transport).now()
+        return build_snapshot(timestamp, chosen, await self.conn.execute_many(commands))
@@ -0,0 +1,248 @@
+"""asyncio-native connection to the device.
+
+``AsyncConnection`` writes commands immediately and matches newline-terminated
+replies to a FIFO of awaiting futures. A single pump task per connection polls
+the transport, so any number of commands across many robots can be awaited
+from one event loop without a thread per blocked call.
+
+The pump only calls ``readline`` when ``in_waiting`` reports data, so it never
+blocks the loop as long as the transport reports complete lines. Use a
+``SerialTransport(reader_thread=True)`` (the ``AsyncRobot`` default) for real
+hardware.
+
+The firmware does not tag replies, so a reply that arrives after its command
+timed out would be taken for the next command's. The pump counts timed-out
+commands and discards that many lines before resolving the next waiter. For
+the same reason a reply's timeout starts only when the reply before it has
+resolved: a read sent behind a move is answered once the move finishes.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Deque, Iterable, List, Optional
+
+from .codec import AsciiCodec, ascii_codec
+from .connection import port_path
+from .transport import Transport, SimulatedTransport
+
+
+class _Waiter:
+    __slots__ = ("label", "future", "timeout", "deadline")
+
+    def __init__(self, label: str, future: "asyncio.Future[int]", timeout: float) -> None:
+        self.label = label
+        self.future = future
+        self.timeout = timeout
+        # Started when the waiter reaches the head of the FIFO; see _start_head
+        self.deadline: Optional[float] = None
+
+
+class AsyncConnection:
+    """Manages asynchronous communication with the device over a transport.
+
+    Args:
+        transport (Transport): The transport layer to use for communication.
+        verbose (int, optional): Verbosity level (0 = no output, 1 = some output, 2 = debug output).
+        poll_interval (float, optional): Seconds between transport polls while
+            replies are outstanding.
+        max_in_flight (int, optional): Maximum number of commands awaiting a reply;
+            further commands wait for a free slot before being written.
+        codec (AsciiCodec | None, optional): Wire codec; the firmware's ASCII
+            protocol by default.
+
+    Attributes:
+        stale_replies (int): Late replies discarded so far.
+    """
+
+    def __init__(self, transport: Transport, verbose: int = 0,
+                 poll_interval: float = 0.002, max_in_flight: int = 16,
+                 codec: Optional[AsciiCodec] = None) -> None:
+        self.transport = transport
+        self.codec = codec if codec is not None else ascii_codec
+        self.verbose = verbose
+        self.poll_interval = poll_interval
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._waiters: Deque[_Waiter] = deque()
+        self._pump: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stale_replies = 0
+        # Replies still owed to commands that timed out; see _run_pump
+        self._late = 0
+
+    async def open(self, port: str | int) -> None:
+        """Opens the connection on the specified port.
+
+        The transport is opened in the default executor since opening a serial
+        port can block.
+
+        Args:
+            port (str | int): The port to open.
+        """
+        s = port_path(port)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.transport.open, s)
+        if self.verbose:
+            print(f"Connected on {s}")
+
+    async def close(self) -> None:
+        """Fails outstanding commands and closes the connection."""
+        self._fail_waiters()
+        self._late = 0
+        if self._pump is not None:
+            self._pump.cancel()
+            self._pump = None
+        self.transport.close()
+
+    def send(self, command: str) -> None:
+        """Sends a command to the device without waiting.
+
+        Args:
+            command (str): The command to send.
+        """
+        if self.verbose:
+            print(f"-> {command.strip()}")
+        self.transport.write(self.codec.encode(command))
+
+    async def execute(self, command: str, expect_response: bool = True, timeout: float = 1.0) -> int | None:
+        """Executes a command on the device and optionally awaits its reply.
+
+        Args:
+            command (str): The command to execute.
+            expect_response (bool, optional): Whether to expect a response from the device.
+            timeout (float, optional): Seconds to wait for the reply, once
+                the replies before it have arrived.
+
+        Returns:
+            int | None: The integer response, -1 if none arrived in time, or None
+            if no response is expected.
+        """
+        # Keep registry calls intact: they carry their encoded payload
+        text = command if not command.endswith("\n") else command.rstrip("\n")
+        if not expect_response:
+            self.send(text)
+            if isinstance(self.transport, SimulatedTransport):
+                print(f"[SimulatedRobot] OK: {text.strip()}")
+            return None
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        async with self._slots:
+            return await asyncio.shield(self._enqueue(text, timeout))
+
+    def submit(self, command: str, timeout: float = 1.0) -> "asyncio.Future[int]":
+        """Writes a response-bearing command now and returns a future for its reply.
+
+        Unlike ``execute`` this does not wait for a free in-flight slot, so the
+        command is on the wire when the call returns. It must be called from
+        the running event loop.
+
+        Args:
+            command (str): The command to send.
+            timeout (float, optional): Seconds to wait for the reply, once
+                the replies before it have arrived.
+
+        Returns:
+            asyncio.Future[int]: Resolves to the reply, or -1 if none arrived in time.
+        """
+        text = command if not command.endswith("\n") else command.rstrip("\n")
+        return self._enqueue(text, timeout)
+
+    async def execute_many(self, commands: Iterable[str], timeout: float = 1.0) -> List[int | None]:
+        """Executes several response-bearing commands concurrently.
+
+        Args:
+            commands (Iterable[str]): The commands to execute.
+            timeout (float, optional): Seconds to wait for each reply, once
+                the replies before it have arrived.
+
+        Returns:
+            list[int | None]: The replies, in the same order as ``commands``.
+        """
+        return list(await asyncio.gather(*(self.execute(c, True, timeout) for c in commands)))
+
+    # ----- internals -----
+    def _enqueue(self, text: str, timeout: float) -> "asyncio.Future[int]":
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[int] = loop.create_future()
+        # Queue and write without yielding so FIFO order matches wire order
+        self._waiters.append(_Waiter(self.codec.label(text), future, max(0.0, timeout)))
+        self.send(text)
+        self._start_head(loop)
+        if self._pump is None or self._pump.done():
+            self._pump = loop.create_task(self._run_pump())
+        return future
+
+    async def _run_pump(self) -> None:
+        loop = asyncio.get_running_loop()
+        waiters = self._waiters
+        # The last line discarded as late, kept in case it was the head's own
+        held: Optional[bytes] = None
+        try:
+            while waiters:
+                head = waiters[0]
+                self._start_head(loop)
+                if self.transport.in_waiting > 0:
+                    line = self.transport.readline()
+                    if not line:
+                        continue
+                    if self._late:
+                        # Replies come in order: this one belongs to a command that timed out
+                        self._late -= 1
+                        self.stale_replies += 1
+                        held = line
+                        if self.verbose > 1:
+                            print(f"<- discarding late reply {line.strip()!r}")
+                        continue
+                    held = None
+                    waiters.popleft()
+                    self._resolve(head, line)
+                    continue
+                if loop.time() >= head.deadline:
+                    waiters.popleft()
+                    if held is not None:
+                        # Nothing followed the discarded line, so it was ours after all:
+                        # the earlier reply was lost rather than late.
+                        self._late = 0
+                        self.stale_replies -= 1
+                        self._resolve(head, held)
+                        held = None
+                        continue
+                    self._late += 1
+                    if self.verbose:
+                        print(f"<- {head.label}: timed out")
+                    if not head.future.done():
+                        head.future.set_result(-1)
+                    continue
+                await asyncio.sleep(self.poll_interval)
+        except Exception as e:  # transport failure: fail everyone still waiting
+            self._fail_waiters(e)
+
+    def _start_head(self, loop: asyncio.AbstractEventLoop) -> None:
+        # The device answers in order: the head's reply is the one it works on now
+        if self._waiters and self._waiters[0].deadline is None:
+            self._waiters[0].deadline = loop.time() + self._waiters[0].timeout
+
+    def _resolve(self, waiter: _Waiter, line: bytes) -> None:
+        try:
+            val = self.codec.decode_int(line)
+        except ValueError:
+            val = None
+        if val is None:
+            if self.verbose:
+                print(f"<- {waiter.label}: no valid int")
+            val = -1
+        else:
+            if self.verbose:
+                print(f"<- {waiter.label}: {val}")
+        if not waiter.future.done():
+            waiter.future.set_result(val)
+
+    def _fail_waiters(self, error: Optional[BaseException] = None) -> None:
+        while self._waiters:
+            future = self._waiters.popleft().future
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(-1)
+            else:
+                future.set_exception(error)
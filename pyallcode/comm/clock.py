@@ -0,0 +1,147 @@
+"""Time sources shared by transports, connections and sampling utilities.
+
+Everything that sleeps or timestamps asks the transport for its clock (see
+``clock_of``). Real transports use ``SystemClock``. A ``VirtualClock`` lets a
+simulated robot, the code driving it and any periodic samplers share a
+simulated timeline: sleeping advances the clock instantly, so a long mission
+script runs in milliseconds while reporting simulated elapsed times.
+
+    clock = VirtualClock()
+    transport = SimulatedTransport(world=World(), seed=1, clock=clock)
+    ...
+    bot.forwards(500)          # returns at once; clock.now() is ~10 s later
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+class SystemClock:
+    """Wall-clock time: ``time.monotonic`` and real sleeping."""
+
+    virtual = False
+
+    def now(self) -> float:
+        """Returns the current time in seconds."""
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        """Blocks for ``seconds``."""
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def wait(self, event: threading.Event, timeout: Optional[float]) -> bool:
+        """Waits for ``event`` for up to ``timeout`` seconds; returns whether it is set."""
+        return event.wait(timeout)
+
+
+class VirtualClock:
+    """Simulated time that only moves when advanced.
+
+    ``sleep`` and ``advance`` move time forward instantly. Callbacks registered
+    with ``call_every`` run on the advancing thread at their due times, so
+    periodic work (such as a ``Sampler``) interleaves deterministically with
+    the code being simulated.
+
+    Args:
+        start (float): Initial time in seconds.
+    """
+
+    virtual = True
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = float(start)
+        self._lock = threading.RLock()
+        self._timers: List[Tuple[float, int, float, Callable[[], None]]] = []
+        self._ids = itertools.count()
+        self._cancelled: set = set()
+        self._advancing = False
+
+    def now(self) -> float:
+        """Returns the current simulated time in seconds."""
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        """Advances simulated time by ``seconds`` without blocking."""
+        self.advance(seconds)
+
+    def wait(self, event: threading.Event, timeout: Optional[float]) -> bool:
+        """Returns whether ``event`` is set, advancing time by ``timeout`` if not."""
+        if not event.is_set() and timeout:
+            self.advance(timeout)
+        return event.is_set()
+
+    def advance(self, seconds: float) -> None:
+        """Moves time forward by ``seconds``, running any timers that fall due."""
+        if seconds > 0:
+            self.advance_to(self._now + seconds)
+
+    def advance_to(self, target: float, run_timers: bool = True) -> None:
+        """Moves time forward to ``target`` (never backwards), running due timers.
+
+        Args:
+            target (float): The new time in seconds.
+            run_timers (bool): When False, timers that fall due wait for the
+                next advance. The simulator uses this while a command holds
+                the connection, as a real sampler would be blocked then too.
+        """
+        with self._lock:
+            if self._advancing or not run_timers:
+                # Called from a timer callback: move time but let the outer call fire timers
+                self._now = max(self._now, target)
+                return
+            self._advancing = True
+            try:
+                while self._timers and self._timers[0][0] <= target:
+                    due, tid, period, callback = heapq.heappop(self._timers)
+                    if tid in self._cancelled:
+                        self._cancelled.discard(tid)
+                        continue
+                    self._now = max(self._now, due)
+                    callback()
+                    if tid in self._cancelled:
+                        self._cancelled.discard(tid)
+                        continue
+                    nxt = due + period
+                    if nxt < self._now:
+                        # Ran late (time jumped past several periods): re-anchor
+                        nxt = self._now + period
+                    heapq.heappush(self._timers, (nxt, tid, period, callback))
+                self._now = max(self._now, target)
+            finally:
+                self._advancing = False
+
+    def call_every(self, period: float, callback: Callable[[], None]) -> int:
+        """Runs ``callback`` every ``period`` simulated seconds, starting now.
+
+        Returns:
+            int: A timer id for ``cancel``.
+        """
+        if period <= 0:
+            raise ValueError("period must be positive")
+        with self._lock:
+            tid = next(self._ids)
+            heapq.heappush(self._timers, (self._now, tid, float(period), callback))
+            return tid
+
+    def cancel(self, timer_id: int) -> None:
+        """Stops a timer registered with ``call_every``."""
+        with self._lock:
+            self._cancelled.add(timer_id)
+
+
+system_clock = SystemClock()
+
+
+def clock_of(obj) -> "SystemClock | VirtualClock":
+    """Returns the clock of a transport, connection or scheduler.
+
+    Objects without a ``clock`` attribute (or with ``clock = None``) use
+    ``system_clock``.
+    """
+    clock = getattr(obj, "clock", None)
+    return clock if clock is not None else system_clock
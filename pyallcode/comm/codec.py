@@ -0,0 +1,109 @@
+"""Wire codecs: how commands are encoded and replies decoded.
+
+``Connection`` and ``AsyncConnection`` hand every outgoing command and every
+reply line to a codec. ``AsciiCodec`` implements the AllCode firmware's
+protocol (space-separated text commands, one decimal integer per reply line)
+and is the default.
+
+Encoding a command from its head and integer arguments uses a table of
+pre-encoded heads, so no text is formatted on the hot path; decoding parses
+the reply bytes directly with ``int()`` without building a ``str``.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Command heads understood by the firmware; pre-encoded by the default codec.
+FIRMWARE_HEADS = (
+    "Forwards", "Backwards", "Left", "Right", "SetMotors",
+    "GetAPIVersion", "GetBatteryVoltage",
+    "ReadIR", "ReadLine", "ReadLight", "ReadMic", "ReadAxis", "ReadSwitch",
+    "LEDWrite", "LEDOn", "LEDOff",
+    "LCDClear", "LCDPrint", "LCDNumber", "LCDPixel", "LCDLine", "LCDRect",
+    "LCDBacklight", "LCDOptions", "LCDVerbose",
+    "ServoEnable", "ServoDisable", "ServoSetPos", "ServoAutoMove", "ServoMoveSpeed",
+    "PlayNote",
+    "CardInit", "CardCreate", "CardOpen", "CardDelete", "CardWriteByte", "CardReadByte",
+    "CardRecordMic", "CardPlayback", "CardBitmap",
+)
+
+
+class AsciiCodec:
+    """The firmware's newline-terminated ASCII protocol.
+
+    Args:
+        heads (Sequence[str]): Command heads to pre-encode up front. Other
+            heads are added to the table on first use.
+    """
+
+    terminator = b"\n"
+
+    def __init__(self, heads: Sequence[str] = ()) -> None:
+        self._prefixes: Dict[str, bytes] = {}
+        for head in heads:
+            self.prefix(head)
+
+    def prefix(self, head: str) -> bytes:
+        """Returns the pre-encoded ``b'<head> '`` for a command head."""
+        try:
+            return self._prefixes[head]
+        except KeyError:
+            encoded = self._prefixes[head] = head.encode("ascii") + b" "
+            return encoded
+
+    def encode(self, command: str) -> bytes:
+        """Encodes a command string, adding the line terminator if missing.
+
+        Commands built from the registry (``pyallcode.comm.commands``) carry
+        their payload already and are written as-is.
+        """
+        payload = getattr(command, "payload", None)
+        if payload is not None:
+            return payload
+        data = command.encode()
+        return data if data.endswith(b"\n") else data + b"\n"
+
+    def encode_call(self, head: str, args: Sequence[int] = ()) -> bytes:
+        """Encodes ``head`` followed by integer arguments.
+
+        Args:
+            head (str): The command head, e.g. ``'ReadIR'``.
+            args (Sequence[int]): Integer arguments.
+        """
+        if not args:
+            return head.encode("ascii") + b"\n"
+        return self.prefix(head) + b" ".join([b"%d" % a for a in args]) + b"\n"
+
+    @staticmethod
+    def label(command: str) -> str:
+        """Returns the command head used to label replies."""
+        head = getattr(command, "head", None)
+        if head is not None:
+            return head
+        return command.split(None, 1)[0] if command.strip() else ""
+
+    @staticmethod
+    def decode_int(line: Buffer) -> Optional[int]:
+        """Parses a reply line.
+
+        Returns:
+            int | None: The integer, or None for an empty line (a read timeout).
+
+        Raises:
+            ValueError: If the line is not an integer.
+        """
+        if isinstance(line, memoryview):
+            line = line.tobytes()
+        try:
+            # int() accepts ASCII bytes and ignores surrounding whitespace
+            return int(line)
+        except ValueError:
+            text = bytes(line).decode(errors="ignore").strip()
+            if not text:
+                return None
+            return int(text)
+
+
+ascii_codec = AsciiCodec(FIRMWARE_HEADS)
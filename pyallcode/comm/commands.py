@@ -0,0 +1,175 @@
+"""Registry of firmware commands with pre-encoded wire payloads.
+
+Each firmware command is a ``Command`` that knows its head, how many integer
+arguments it takes and whether it ends with a free-text argument (a file
+name, or the text for ``LCDPrint``). Calling a command returns a ``Call``:
+a ``str`` of the familiar command text that also carries its encoded wire
+bytes and head, so ``Connection`` writes it without formatting, encoding or
+splitting it again.
+
+Recently used calls are cached per command. A hot loop that repeats a
+command (``READ_IR(2)``, ``SET_MOTORS(40, 40)``) gets back the same prebuilt
+``Call`` each time.
+
+    from pyallcode.comm.commands import READ_IR
+    conn.execute(READ_IR(2))
+"""
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+from .codec import ascii_codec
+
+
+class Call(str):
+    """Command text that carries its encoded payload.
+
+    Attributes:
+        head (str): The command head, e.g. ``'ReadIR'``.
+        payload (bytes): The newline-terminated wire bytes.
+    """
+
+    def __new__(cls, text: str, head: str, payload: bytes) -> "Call":
+        self = str.__new__(cls, text)
+        self.head = head
+        self.payload = payload
+        return self
+
+
+class Command:
+    """A firmware command template.
+
+    Args:
+        head (str): The command head.
+        arity (int): Number of integer arguments.
+        text (bool): Whether a free-text argument follows the integers.
+        expects_reply (bool): Whether the firmware replies to the command.
+        cache_size (int): Maximum number of distinct calls kept for reuse.
+    """
+
+    __slots__ = ("head", "arity", "text", "expects_reply", "cache_size", "_cache", "_bare")
+
+    def __init__(self, head: str, arity: int = 0, text: bool = False,
+                 expects_reply: bool = True, cache_size: int = 256) -> None:
+        self.head = head
+        self.arity = arity
+        self.text = text
+        self.expects_reply = expects_reply
+        self.cache_size = cache_size
+        self._cache: Dict[Tuple, Call] = {}
+        self._bare = Call(head, head, ascii_codec.encode_call(head)) if arity == 0 and not text else None
+
+    def __repr__(self) -> str:
+        return f"Command({self.head!r}, arity={self.arity}, text={self.text})"
+
+    def __call__(self, *args) -> Call:
+        """Returns the ``Call`` for these arguments.
+
+        Raises:
+            TypeError: If the number of arguments does not match the command.
+        """
+        if self._bare is not None and not args:
+            return self._bare
+        # 1, 1.0 and True are one dict key but print differently: key the
+        # free text by the string that is sent
+        key = args[:-1] + (str(args[-1]),) if self.text and args else args
+        cache = self._cache
+        try:
+            return cache[key]
+        except (KeyError, TypeError):
+            pass
+        call = self._build(args)
+        if len(cache) >= self.cache_size:
+            cache.clear()
+        try:
+            cache[key] = call
+        except TypeError:  # unhashable argument; just don't cache it
+            pass
+        return call
+
+    def _build(self, args: Tuple) -> Call:
+        expected = self.arity + (1 if self.text else 0)
+        if len(args) != expected:
+            raise TypeError(f"{self.head} takes {expected} argument(s), got {len(args)}")
+        ints = [int(a) for a in args[:self.arity]]
+        parts = [self.head] + [str(i) for i in ints]
+        if self.text:
+            parts.append(str(args[-1]))
+            text = " ".join(parts)
+            return Call(text, self.head, text.encode() + b"\n")
+        return Call(" ".join(parts), self.head, ascii_codec.encode_call(self.head, ints))
+
+
+COMMANDS: Dict[str, Command] = {}
+
+
+def register(command: Command) -> Command:
+    """Adds a command to ``COMMANDS`` and returns it."""
+    COMMANDS[command.head] = command
+    return command
+
+
+# Movement and system
+FORWARDS = register(Command("Forwards", 1))
+BACKWARDS = register(Command("Backwards", 1))
+LEFT = register(Command("Left", 1))
+RIGHT = register(Command("Right", 1))
+SET_MOTORS = register(Command("SetMotors", 2, expects_reply=False))
+GET_API_VERSION = register(Command("GetAPIVersion"))
+GET_BATTERY_VOLTAGE = register(Command("GetBatteryVoltage"))
+
+# Extra seconds a move may take beyond distance / speed (acceleration, wheel slip).
+MOVE_SLACK = 1.0
+
+
+def move_timeout(amount: float, per_second: float) -> float:
+    """Returns how long to wait for a move's reply.
+
+    Args:
+        amount (float): Distance in mm or angle in degrees (sign ignored).
+        per_second (float): The robot's speed in the same unit per second.
+    """
+    return abs(amount) / max(per_second, 1e-9) + MOVE_SLACK
+
+# Sensors
+READ_IR = register(Command("ReadIR", 1))
+READ_LINE = register(Command("ReadLine", 1))
+READ_LIGHT = register(Command("ReadLight"))
+READ_MIC = register(Command("ReadMic"))
+READ_AXIS = register(Command("ReadAxis", 1))
+READ_SWITCH = register(Command("ReadSwitch", 1))
+
+# LEDs
+LED_WRITE = register(Command("LEDWrite", 1, expects_reply=False))
+LED_ON = register(Command("LEDOn", 1, expects_reply=False))
+LED_OFF = register(Command("LEDOff", 1, expects_reply=False))
+
+# LCD
+LCD_CLEAR = register(Command("LCDClear", expects_reply=False))
+LCD_PRINT = register(Command("LCDPrint", 2, text=True, expects_reply=False))
+LCD_NUMBER = register(Command("LCDNumber", 3, expects_reply=False))
+LCD_PIXEL = register(Command("LCDPixel", 3, expects_reply=False))
+LCD_LINE = register(Command("LCDLine", 4, expects_reply=False))
+LCD_RECT = register(Command("LCDRect", 4, expects_reply=False))
+LCD_BACKLIGHT = register(Command("LCDBacklight", 1, expects_reply=False))
+LCD_OPTIONS = register(Command("LCDOptions", 3, expects_reply=False))
+LCD_VERBOSE = register(Command("LCDVerbose", 1, expects_reply=False))
+
+# Servos and speaker
+SERVO_ENABLE = register(Command("ServoEnable", 1, expects_reply=False))
+SERVO_DISABLE = register(Command("ServoDisable", 1, expects_reply=False))
+SERVO_SET_POS = register(Command("ServoSetPos", 2, expects_reply=False))
+SERVO_AUTO_MOVE = register(Command("ServoAutoMove", 2, expects_reply=False))
+SERVO_MOVE_SPEED = register(Command("ServoMoveSpeed", 1, expects_reply=False))
+PLAY_NOTE = register(Command("PlayNote", 2, expects_reply=False))
+
+# SD card
+CARD_INIT = register(Command("CardInit"))
+CARD_CREATE = register(Command("CardCreate", 0, text=True))
+CARD_OPEN = register(Command("CardOpen", 0, text=True))
+CARD_DELETE = register(Command("CardDelete", 0, text=True))
+CARD_WRITE_BYTE = register(Command("CardWriteByte", 1, expects_reply=False))
+CARD_READ_BYTE = register(Command("CardReadByte"))
+CARD_RECORD_MIC = register(Command("CardRecordMic", 3, text=True))
+CARD_PLAYBACK = register(Command("CardPlayback", 0, text=True))
+CARD_BITMAP = register(Command("CardBitmap", 2, text=True))
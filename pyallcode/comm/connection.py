@@ -1,50 +1,238 @@
 """Manages the connection to the device over a specified transport layer."""
-from typing import Optional
+from collections import deque
+import contextlib
+import threading
+from typing import Deque, Iterable, Iterator, List, Optional
 from sys import platform
+from .clock import clock_of
+from .codec import AsciiCodec, ascii_codec
+from .retry import NO_RETRY, RetryPolicy
 from .transport import Transport, SimulatedTransport
 
+
+# How a Connection clears unread input before a command; see Connection.
+FLUSH_POLICIES = ("on_error", "always", "reset", "tagged", "never")
+
+# While waiting for a reply against a deadline, the transport is polled at
+# intervals that start short (fast replies return at once) and double up to
+# the maximum (long moves do not spin).
+POLL_MIN = 0.0005
+POLL_MAX = 0.02
+
+
+def port_path(port: str | int) -> str:
+    """Maps a bare port number to the platform's serial device path.
+
+    Args:
+        port (str | int): A port number (e.g. 3 or '3') or a full device path.
+
+    Returns:
+        str: The device path to open.
+
+    Raises:
+        ValueError: If a port number is given on an unsupported platform.
+    """
+    if isinstance(port, int) or (isinstance(port, str) and port.isdigit()):
+        if platform in ("linux", "linux2"):
+            return f"/dev/rfcomm{port}"
+        if platform == "darwin":
+            return f"/dev/tty.{port}-Port"
+        if platform == "win32":
+            return f"\\\\.\\COM{port}"
+        raise ValueError("Unsupported platform")
+    return str(port)
+
+
+class PendingReply:
+    """Handle for a command submitted with ``Connection.submit``.
+
+    The reply is matched in FIFO order with the other in-flight commands of the
+    same connection. Calling ``result()`` reads replies off the transport until
+    this one is resolved.
+
+    The firmware answers commands in order, so a read sent behind a move is
+    only answered once the move finishes. A reply's ``timeout`` therefore
+    starts when it reaches the head of the FIFO: when its command is sent, or
+    when the reply before it resolves.
+
+    Attributes:
+        command (str): The command text as sent (without the trailing newline).
+        label (str): The command head used for verbose output.
+        attempts (int): The number of read attempts allowed for the reply.
+        timeout (float | None): Seconds the reply may take once it is at the
+            head of the FIFO; when set it replaces ``attempts``.
+        deadline (float | None): Clock time by which the reply must arrive;
+            None until the reply reaches the head (or without a timeout).
+        timed_out (bool): Whether the result is -1 because no valid reply
+            arrived, rather than a -1 sent by the device.
+    """
+
+    __slots__ = ("command", "label", "attempts", "timeout", "deadline", "timed_out", "_conn", "_value",
+                 "_done")
+
+    def __init__(self, conn: Optional["Connection"], command: str, label: str, attempts: int = 1,
+                 timeout: Optional[float] = None) -> None:
+        self.command = command
+        self.label = label
+        self.attempts = attempts
+        self.timeout = timeout
+        self.deadline: Optional[float] = None
+        self.timed_out = False
+        self._conn = conn
+        self._value: Optional[int] = None
+        self._done = conn is None
+
+    def done(self) -> bool:
+        """Returns True once the reply has been read (or none is expected)."""
+        return self._done
+
+    def poll(self) -> bool:
+        """Reads replies that have already arrived, without blocking.
+
+        Returns:
+            bool: Whether this reply is now resolved.
+        """
+        conn = self._conn
+        if conn is not None and not self._done:
+            conn.poll()
+        return self._done
+
+    def result(self) -> Optional[int]:
+        """Waits for the reply and returns it.
+
+        Returns:
+            int | None: The integer reply (-1 if unreadable), or None for
+            fire-and-forget commands.
+        """
+        conn = self._conn
+        if conn is not None:
+            with conn.lock:
+                while not self._done:
+                    conn._resolve_next()
+        return self._value
+
+    def _set(self, value: Optional[int], timed_out: bool = False) -> None:
+        self._value = value
+        self.timed_out = timed_out
+        self._done = True
+        self._conn = None
+
+
 class Connection:
     """Manages communication with the device over a given transport.
     Args:
         transport (Transport): The transport layer to use for communication.
         verbose (int, optional): Verbosity level (0 = no output, 1 = some output, 2 = debug output).
+        max_in_flight (int, optional): Maximum number of pipelined commands awaiting a
+            reply before ``submit`` blocks to read the oldest one.
+        codec (AsciiCodec | None, optional): Encodes commands and decodes replies;
+            the firmware's ASCII protocol by default.
+        flush_policy (str, optional): When unread input is discarded before a
+            command (or a new pipelined burst):
+
+            - ``'on_error'`` (default): only after a read timed out or returned
+              garbage, so the common path does no extra I/O.
+            - ``'always'``: before every command (``flush_input``).
+            - ``'reset'``: before every command, but only via the transport's
+              ``reset_input_buffer``; never reads lines, so it cannot block.
+            - ``'tagged'``: never flushes. Replies to commands that timed out
+              are counted and the same number of late lines is discarded.
+              The firmware does not tag replies, so this relies on it
+              answering in order.
+            - ``'never'``: no flushing at all.
+        timeout (float | None, optional): Default seconds to wait for a reply.
+            None waits for one transport ``readline`` per read attempt, as
+            bounded by the transport's own timeout.
+        retry (RetryPolicy | None, optional): Default policy for resending
+            commands whose reply timed out; no resends by default.
+
+    Attributes:
+        stale_replies (int): Late or unsolicited reply lines discarded so far.
+
+    Commands are serialised with ``lock`` (re-entrant), so one Connection can be
+    shared by several devices and threads without interleaving a command with
+    another thread's reply.
     """
 
-    def __init__(self, transport: Transport, verbose: int = 0) -> None:
+    def __init__(self, transport: Transport, verbose: int = 0, max_in_flight: int = 16,
+                 codec: Optional[AsciiCodec] = None, flush_policy: str = "on_error",
+                 timeout: Optional[float] = None, retry: Optional[RetryPolicy] = None) -> None:
         """Initializes the Connection with a transport and verbosity level."""
         self.transport = transport
+        self.codec = codec if codec is not None else ascii_codec
+        self.flush_policy = flush_policy
+        self.timeout = timeout
+        self.retry = retry if retry is not None else NO_RETRY
+        self.stale_replies = 0
+        self._dirty = False
+        self._late = 0
+        # A whole line read ahead by _line_waiting, returned by the next _readline
+        self._unread: Optional[bytes] = None
         self.verbose = verbose
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._in_flight: Deque[PendingReply] = deque()
+        self.lock = threading.RLock()
 
     def open(self, port: str | int) -> None:
         """Opens the connection on the specified port.
         Args:
             port (str | int): The port to open.
         """
-        s: str
-        if isinstance(port, int) or (isinstance(port, str) and port.isdigit()):
-            if platform in ("linux", "linux2"):
-                s = f"/dev/rfcomm{port}"
-            elif platform == "darwin":
-                s = f"/dev/tty.{port}-Port"
-            elif platform == "win32":
-                s = f"\\\\.\\COM{port}"
-            else:
-                raise ValueError("Unsupported platform")
-        else:
-            s = str(port)
+        s = port_path(port)
         self.transport.open(s)
         if self.verbose:
             print(f"Connected on {s}")
 
     def close(self) -> None:
         """Closes the connection."""
-        self.transport.close()
+        with self.lock:
+            self._abandon_in_flight()
+            self._dirty = False
+            self._late = 0
+            self._unread = None
+            self.transport.close()
+
+    @property
+    def flush_policy(self) -> str:
+        """When unread input is discarded; one of ``FLUSH_POLICIES``."""
+        return self._flush_policy
+
+    @flush_policy.setter
+    def flush_policy(self, value: str) -> None:
+        if value not in FLUSH_POLICIES:
+            raise ValueError(f"flush_policy must be one of {FLUSH_POLICIES}, got {value!r}")
+        self._flush_policy = value
 
     def flush_input(self) -> None:
         """Flushes the input buffer to remove any stale data."""
+        if self._unread is not None:
+            self._unread = None
+            self.stale_replies += 1
+        # Transports that can discard their buffer in one call do so
+        reset = getattr(self.transport, "reset_input_buffer", None)
+        if reset is not None:
+            if self.verbose > 1 and self.transport.in_waiting > 0:
+                print(f"<- discarding {self.transport.in_waiting} unsolicited byte(s)")
+            reset()
+            return
         # Drain input buffer
         while self.transport.in_waiting > 0:
-            self.transport.readline()
+            if self.transport.readline():
+                self.stale_replies += 1
+
+    def _before_command(self) -> None:
+        policy = self._flush_policy
+        if policy == "on_error":
+            if self._dirty:
+                self._dirty = False
+                self.flush_input()
+        elif policy == "always":
+            self.flush_input()
+        elif policy == "reset":
+            reset = getattr(self.transport, "reset_input_buffer", None)
+            if reset is not None:
+                self._unread = None
+                reset()
 
     def send(self, command: str) -> None:
         """Sends a command to the device.
@@ -53,49 +241,332 @@ class Connection:
         """
         if self.verbose:
             print(f"-> {command.strip()}")
-        self.transport.write(command.encode())
+        self.transport.write(self.codec.encode(command))
+
+    def send_many(self, commands: Iterable[str]) -> int:
+        """Writes several fire-and-forget commands in a single transport write.
+
+        Args:
+            commands (Iterable[str]): Commands the firmware does not reply to.
 
-    def read_value(self, label: str, attempts: int = 1) -> int:
+        Returns:
+            int: The number of bytes written.
+        """
+        encode = self.codec.encode
+        data = b"".join([encode(c) for c in commands])
+        if not data:
+            return 0
+        with self.lock:
+            if self.verbose:
+                print(f"-> {data.count(self.codec.terminator)} command(s), {len(data)} bytes")
+            self.transport.write(data)
+        return len(data)
+
+    def read_value(self, label: str, attempts: int = 1, timeout: Optional[float] = None) -> int:
         """Reads an integer value from the device.
         Args:
             label (str): The label for the value being read.
             attempts (int, optional): The number of attempts to read the value.
-        
+            timeout (float | None, optional): Seconds to wait for the value.
+                When given it replaces ``attempts``: the read returns as soon
+                as a complete line arrives and gives up at the deadline.
+
         Returns:
             int: The integer value read from the device, or -1 if unsuccessful.
-            
-            raises: ValueError: If the read value cannot be converted to an integer.
         """
-        val = -1
-        for i in range(max(1, attempts)):
+        deadline = None if timeout is None else self.clock.now() + timeout
+        val = self._read(label, attempts, deadline)
+        return -1 if val is None else val
+
+    def _wait_for_line(self, deadline: float) -> bool:
+        """Polls until input is waiting or the deadline passes."""
+        transport = self.transport
+        clock = self.clock
+        delay = POLL_MIN
+        while self._unread is None and transport.in_waiting <= 0:
+            remaining = deadline - clock.now()
+            if remaining <= 0:
+                return False
+            clock.sleep(min(delay, remaining))
+            delay = min(delay * 2, POLL_MAX)
+        return True
+
+    def _readline(self, deadline: Optional[float]) -> bytes:
+        """Reads one line, waiting no later than ``deadline`` where the transport allows.
+
+        ``in_waiting`` may count the bytes of a line that is still arriving;
+        a transport with ``readline_within`` then returns b"" at the deadline
+        rather than blocking for its own timeout.
+        """
+        if self._unread is not None:
+            line, self._unread = self._unread, None
+            return line
+        within = getattr(self.transport, "readline_within", None)
+        if deadline is None or within is None:
+            return self.transport.readline()
+        return within(deadline - self.clock.now())
+
+    def _line_waiting(self) -> bool:
+        """Returns whether a whole reply line can be read without waiting."""
+        if self._unread is not None:
+            return True
+        if self.transport.in_waiting <= 0:
+            return False
+        within = getattr(self.transport, "readline_within", None)
+        if within is None:
+            return True
+        self._unread = within(0.0) or None
+        return self._unread is not None
+
+    def _read(self, label: str, attempts: int, deadline: Optional[float]) -> Optional[int]:
+        """Reads one reply; returns None if none arrived (see ``read_value``)."""
+        decode = self.codec.decode_int
+        tries = max(1, attempts)
+        held: Optional[int] = None
+        i = 0
+        while True:
+            if deadline is None:
+                if i >= tries:
+                    break
+            elif not self._wait_for_line(deadline):
+                break
             try:
-                line = self.transport.readline().decode(errors="ignore").strip()
-                if line:
-                    val = int(line)
-                    if self.verbose:
-                        print(f"<- {label}: {val}")
-                    return val
+                val = decode(self._readline(deadline))
             except ValueError:
+                self._dirty = True
+                i += 1
                 if self.verbose:
-                    print(f"<- {label}: no valid int (attempt {i+1})")
-        return val
+                    print(f"<- {label}: no valid int (attempt {i})")
+                continue
+            if val is None:
+                i += 1
+                continue
+            if self._late:
+                # Replies come in order: this one belongs to a command that timed out
+                self._late -= 1
+                self.stale_replies += 1
+                held = val
+                if self.verbose > 1:
+                    print(f"<- discarding late reply {val}")
+                continue
+            if self.verbose:
+                print(f"<- {label}: {val}")
+            return val
+        if held is not None:
+            # Nothing followed the discarded line, so it was ours after all:
+            # the earlier reply was lost rather than late.
+            self._late = 0
+            self.stale_replies -= 1
+            if self.verbose:
+                print(f"<- {label}: {held}")
+            return held
+        self._dirty = True
+        if self._flush_policy == "tagged":
+            self._late += 1
+        if self.verbose and deadline is not None:
+            print(f"<- {label}: timed out")
+        return None
 
-    def execute(self, command: str, expect_response: bool = True, attempts: int = 1) -> int | None:
+    def execute(self, command: str, expect_response: bool = True, attempts: int = 1,
+                timeout: Optional[float] = None, retry: Optional[RetryPolicy] = None) -> int | None:
         """Executes a command on the device and optionally reads a response.
         
         Args:
             command (str): The command to execute.
             expect_response (bool, optional): Whether to expect a response from the device.
             attempts (int, optional): The number of attempts to read the response.
+            timeout (float | None, optional): Seconds to wait for the response,
+                measured from when the command is sent, or from when the
+                in-flight replies before it resolve; replaces ``attempts``.
+                Defaults to the connection's ``timeout``.
+            retry (RetryPolicy | None, optional): Resend policy for a timed-out
+                response; defaults to the connection's ``retry``.
             
             Returns:
                 int | None: The integer response from the device, or None if no response is expected.
         """
-        self.flush_input()
-        self.send(command if command.endswith("\n") else command + "\n")
-        if expect_response:
-            return self.read_value(command.split()[0], attempts)
+        with self.lock:
+            if expect_response:
+                return self._reply_to(command, attempts, timeout, retry)
+            if self._in_flight:
+                # Pipelined commands are still awaiting replies; see _exchange
+                return self.submit(command, False).result()
+            self._before_command()
+            self.send(command)
         # In dummy mode, print a friendly acknowledgement for fire-and-forget commands
         if isinstance(self.transport, SimulatedTransport):
             print(f"[SimulatedRobot] OK: {command.strip()}")
         return None
+
+    def _reply_to(self, command: str, attempts: int, timeout: Optional[float],
+                  retry: Optional[RetryPolicy]) -> int:
+        label = self.codec.label(command)
+        if timeout is None:
+            timeout = self.timeout
+        policy = retry if retry is not None else self.retry
+        clock = self.clock
+        n = 0
+        while True:
+            val = self._exchange(command, label, attempts, timeout)
+            if val is not None:
+                return val
+            if n >= policy.retries or not policy.applies_to(label):
+                return -1
+            clock.sleep(policy.delay(n))
+            n += 1
+            if self.verbose:
+                print(f"-> {label}: retry {n} of {policy.retries}")
+
+    def _exchange(self, command: str, label: str, attempts: int, timeout: Optional[float]) -> Optional[int]:
+        """Sends a command and reads its reply; None if none arrived in time."""
+        if self._in_flight:
+            # Pipelined commands (e.g. a move from Robot.start_forwards) are
+            # still awaiting replies: queue behind them rather than wait. Input
+            # is not flushed, since that would discard their replies.
+            pending = self.submit(command, True, attempts, timeout)
+            val = pending.result()
+            return None if pending.timed_out else val
+        self._before_command()
+        self.send(command)
+        deadline = None if timeout is None else self.clock.now() + timeout
+        return self._read(label, attempts, deadline)
+
+    @property
+    def clock(self):
+        """The transport's clock (``system_clock`` unless it has a virtual one)."""
+        return clock_of(self.transport)
+
+    # ----- pipelining -----
+    @property
+    def in_flight(self) -> int:
+        """Returns the number of submitted commands still awaiting a reply."""
+        return len(self._in_flight)
+
+    def submit(self, command: str, expect_response: bool = True, attempts: int = 1,
+               timeout: Optional[float] = None) -> PendingReply:
+        """Sends a command without waiting for its reply.
+
+        Replies are newline-terminated and arrive in the order the commands were
+        sent, so each response-bearing command is queued and matched FIFO.
+        Fire-and-forget commands are never queued. When ``max_in_flight``
+        replies are outstanding the oldest one is read before sending.
+
+        Args:
+            command (str): The command to send.
+            expect_response (bool, optional): Whether the device replies to the command.
+            attempts (int, optional): The number of attempts to read the reply.
+            timeout (float | None, optional): Seconds the reply may take once
+                the replies before it have resolved (see ``PendingReply``);
+                defaults to the connection's ``timeout``. Pipelined commands
+                are never resent.
+
+        Returns:
+            PendingReply: A handle whose ``result()`` returns the reply.
+        """
+        with self.lock:
+            if not self._in_flight:
+                # Start of a new burst: discard leftovers as the flush policy says
+                self._before_command()
+            while len(self._in_flight) >= self.max_in_flight:
+                self._resolve_next()
+            # Keep registry calls intact: they carry their encoded payload
+            text = command if not command.endswith("\n") else command.rstrip("\n")
+            self.send(text)
+            label = self.codec.label(text)
+            if not expect_response:
+                if isinstance(self.transport, SimulatedTransport):
+                    print(f"[SimulatedRobot] OK: {text.strip()}")
+                return PendingReply(None, text, label)
+            if timeout is None:
+                timeout = self.timeout
+            pending = PendingReply(self, text, label, attempts, timeout)
+            self._in_flight.append(pending)
+            if len(self._in_flight) == 1:
+                self._start_head()
+            return pending
+
+    @contextlib.contextmanager
+    def pipeline_window(self, max_in_flight: int) -> Iterator[None]:
+        """Holds the connection with a different ``max_in_flight`` for one burst.
+
+        Bulk transfers use this to keep more (or fewer) requests outstanding
+        than the connection's default. The previous limit is restored on exit.
+
+        Args:
+            max_in_flight (int): Replies allowed to be outstanding inside the block.
+        """
+        with self.lock:
+            saved = self.max_in_flight
+            self.max_in_flight = max(1, int(max_in_flight))
+            try:
+                yield
+            finally:
+                self.max_in_flight = saved
+
+    def execute_many(self, commands: Iterable[str], attempts: int = 1,
+                     timeout: Optional[float] = None,
+                     max_in_flight: Optional[int] = None) -> List[Optional[int]]:
+        """Executes several response-bearing commands in one pipelined burst.
+
+        Args:
+            commands (Iterable[str]): The commands to execute.
+            attempts (int, optional): The number of attempts to read each reply.
+            timeout (float | None, optional): Seconds to wait for each reply,
+                measured from when the reply before it resolves.
+            max_in_flight (int | None, optional): Outstanding replies allowed
+                for this burst (see ``pipeline_window``); the connection's
+                ``max_in_flight`` when None.
+
+        Returns:
+            list[int | None]: The replies, in the same order as ``commands``.
+        """
+        window = self.max_in_flight if max_in_flight is None else max_in_flight
+        with self.pipeline_window(window):
+            pending = [self.submit(c, True, attempts, timeout) for c in commands]
+            return [p.result() for p in pending]
+
+    def poll(self) -> int:
+        """Reads the in-flight replies that have already arrived, without blocking.
+
+        Returns:
+            int: The number of pending replies resolved. 0 if another thread
+            holds the connection.
+        """
+        if not self.lock.acquire(blocking=False):
+            return 0
+        try:
+            resolved = 0
+            while self._in_flight and self._line_waiting():
+                self._resolve_next()
+                resolved += 1
+            return resolved
+        finally:
+            self.lock.release()
+
+    def drain(self) -> None:
+        """Reads the replies of all in-flight commands."""
+        with self.lock:
+            while self._in_flight:
+                self._resolve_next()
+
+    def _resolve_next(self) -> None:
+        pending = self._in_flight.popleft()
+        try:
+            value = self._read(pending.label, pending.attempts, pending.deadline)
+        except Exception:
+            pending._set(-1)
+            raise
+        finally:
+            self._start_head()
+        pending._set(-1 if value is None else value, value is None)
+
+    def _start_head(self) -> None:
+        # The device answers in order: the head's reply is the one it works on now
+        if self._in_flight:
+            head = self._in_flight[0]
+            if head.deadline is None and head.timeout is not None:
+                head.deadline = self.clock.now() + head.timeout
+
+    def _abandon_in_flight(self) -> None:
+        while self._in_flight:
+            self._in_flight.popleft()._set(-1)
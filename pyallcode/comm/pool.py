@@ -0,0 +1,134 @@
+"""Process-wide registry of shared, reference-counted connections.
+
+Standalone devices (``LEDs()``, ``LightSensor()``...) acquire their
+``Connection`` here instead of opening the serial port themselves, so every
+device and ``Robot`` talking to the same port shares one open transport.
+``Connection`` serialises commands with its own lock, which makes sharing it
+across threads safe.
+
+Connections are keyed by resolved port path. A simulated robot standing in
+for a port that could not be opened is keyed ``'SIMULATED-<port>'`` (plain
+``'SIMULATED'`` when no port was given), never by the real path, so the
+port is tried again on the next ``acquire``. The port is closed when the
+last holder releases it.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional
+
+from .connection import Connection, port_path
+from .transport import SerialTransport, SimulatedTransport, transport_mode_from_env
+from .ports import autodetect_robot_port
+
+
+def _simulated_key(port: str | int | None) -> str:
+    return "SIMULATED" if port is None else f"SIMULATED-{port}"
+
+
+class _Entry:
+    __slots__ = ("conn", "refs")
+
+    def __init__(self, conn: Connection) -> None:
+        self.conn = conn
+        self.refs = 1
+
+
+class ConnectionPool:
+    """Hands out one shared Connection per port."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+
+    def acquire(self, port: str | int | None = None, verbose: int = 0) -> Connection:
+        """Return the shared connection for ``port``, opening it on first use.
+
+        When ``port`` is None the robot port is auto-detected. If no robot is
+        found or the port cannot be opened, a simulated connection is shared
+        instead, under its own ``'SIMULATED-<port>'`` key.
+
+        Args:
+            port: Port number or device path, or None to auto-detect.
+            verbose: Verbosity for a newly created Connection.
+
+        Returns:
+            Connection: An open connection; give it back with ``release``.
+        """
+        with self._lock:
+            if transport_mode_from_env() == "simulated":
+                return self._share_simulated(_simulated_key(port), verbose, "Forced by PYALLCODE_TRANSPORT")
+            key = port_path(port) if port is not None else autodetect_robot_port()
+            if key is None:
+                return self._share_simulated("SIMULATED", verbose, "No responsive robot port found")
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refs += 1
+                return entry.conn
+            conn = Connection(SerialTransport(), verbose=verbose)
+            try:
+                conn.open(key)
+            except Exception as e:
+                return self._share_simulated(_simulated_key(port), verbose, f"Could not open {key}: {e}")
+            self._entries[key] = _Entry(conn)
+            return conn
+
+    def register(self, port: str | int, conn: Connection) -> None:
+        """Share an already open connection under ``port``.
+
+        The caller holds one reference and should ``release`` it when done.
+
+        Raises:
+            ValueError: If another connection is already shared for ``port``;
+                ``acquire`` that one instead of opening the port twice.
+        """
+        key = port_path(port)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = _Entry(conn)
+            elif entry.conn is conn:
+                entry.refs += 1
+            else:
+                raise ValueError(f"{key} is already shared by another connection; acquire it instead")
+
+    def release(self, conn: Connection) -> bool:
+        """Drop one reference to ``conn``; close it when none remain.
+
+        Returns:
+            bool: True if ``conn`` was managed by this pool.
+        """
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry.conn is conn:
+                    entry.refs -= 1
+                    if entry.refs <= 0:
+                        del self._entries[key]
+                        conn.close()
+                    return True
+        return False
+
+    def port_of(self, conn: Connection) -> Optional[str]:
+        """Return the key ``conn`` is shared under, or None if unmanaged."""
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry.conn is conn:
+                    return key
+        return None
+
+    def _share_simulated(self, label: str, verbose: int, reason: str) -> Connection:
+        entry = self._entries.get(label)
+        if entry is not None:
+            entry.refs += 1
+            return entry.conn
+        transport = SimulatedTransport()
+        conn = Connection(transport, verbose=verbose)
+        transport.open(label)
+        if verbose:
+            print(f"[SimulatedRobot] {reason}; using simulated transport")
+        self._entries[label] = _Entry(conn)
+        return conn
+
+
+# The pool used by DeviceBase and Robot.
+default_pool = ConnectionPool()
@@ -0,0 +1,75 @@
+"""On-disk cache of the last port a robot was found on.
+
+``autodetect_robot_port`` records the winning port together with its
+description and hardware ID. On the next start the entry is only trusted if
+the same device path still enumerates with the same hardware ID, and it is
+confirmed with a single probe before use.
+
+The cache lives in the per-user cache directory (``%LOCALAPPDATA%\\pyallcode``
+on Windows, ``~/Library/Caches/pyallcode`` on macOS, ``$XDG_CACHE_HOME/pyallcode``
+or ``~/.cache/pyallcode`` elsewhere). Set ``PYALLCODE_CACHE_DIR`` to override it.
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import sys
+from typing import Dict, Optional
+
+_CACHE_FILE = "robot_port.json"
+
+
+def cache_dir() -> str:
+    """Return the directory used for pyallcode's cache files."""
+    override = os.environ.get("PYALLCODE_CACHE_DIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "pyallcode")
+
+
+def cache_path() -> str:
+    """Return the path of the cached robot port file."""
+    return os.path.join(cache_dir(), _CACHE_FILE)
+
+
+def load_cached_port() -> Optional[Dict[str, str]]:
+    """Return the cached entry ``{'device', 'description', 'hwid'}`` or None.
+
+    Missing, unreadable or malformed cache files are treated as empty.
+    """
+    try:
+        with open(cache_path(), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or not isinstance(entry.get("device"), str):
+        return None
+    return {
+        "device": entry["device"],
+        "description": str(entry.get("description") or ""),
+        "hwid": str(entry.get("hwid") or ""),
+    }
+
+
+def save_cached_port(device: str, description: str, hwid: str) -> None:
+    """Persist the robot's port. Failures to write are silently ignored."""
+    path = cache_path()
+    tmp = path + ".tmp"
+    with contextlib.suppress(OSError):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"device": device, "description": description, "hwid": hwid}, f)
+        os.replace(tmp, path)
+
+
+def clear_cached_port() -> None:
+    """Delete the cached entry if present."""
+    with contextlib.suppress(OSError):
+        os.remove(cache_path())
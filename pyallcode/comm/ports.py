@@ -9,15 +9,26 @@ pairs often expose two COM ports (incoming/outgoing). Relying on names alone is
 unreliable, so we provide a content-based probe that tries a short handshake and
 selects the first responsive port.
 """
-from typing import List, Dict, Any, Tuple, Iterable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Tuple, Iterable, Optional
 import contextlib
+import threading
 import time
 import serial
 import serial.tools.list_ports
 
+from .port_cache import load_cached_port, save_cached_port, clear_cached_port
+
 # A tiny, non-invasive probe command that all supported firmwares implement.
 # We use GetAPIVersion as a read-only command that returns an integer.
 _PROBE_COMMAND = "GetAPIVersion\n"
+# A probe reads in slices this long, so a cancelled probe closes its port quickly
+_PROBE_SLICE = 0.05
+
+# In-process memo of the detected robot port as (device, description, hwid),
+# shared by every Robot/device constructed in this program.
+_memo: Optional[Tuple[str, str, str]] = None
+_memo_lock = threading.Lock()
 
 def list_available_ports() -> List[str]:
     """
@@ -118,16 +129,25 @@ def candidate_ports(prefer_keywords: list[str] | None = None) -> List[str]:
     return [p.device for p in ranked]
 
 
-def probe_port_is_robot(port: str, write_timeout: float = 0.25, read_timeout: float = 0.75) -> bool:
+def probe_port_is_robot(port: str, write_timeout: float = 0.25, read_timeout: float = 0.75,
+                        cancel: Optional[threading.Event] = None) -> bool:
     """Open a port briefly and check if it responds like an AllCode robot.
 
     The probe sends a single GetAPIVersion command and expects a small integer
     within the timeout window. Any exceptions/timeouts are treated as a miss.
     The port is always closed before returning.
+
+    Args:
+        cancel: Optional event; when set the probe gives up at its next check.
+            The reply is read in short slices, so once the port is open a
+            cancelled probe closes it within about 50 ms.
     """
     ser = None
     try:
-        ser = serial.Serial(port=port, baudrate=115200, timeout=read_timeout, write_timeout=write_timeout)
+        if cancel is not None and cancel.is_set():
+            return False
+        ser = serial.Serial(port=port, baudrate=115200, timeout=min(read_timeout, _PROBE_SLICE),
+                            write_timeout=write_timeout)
         # Clear any buffered data
         _ = ser.in_waiting
         while ser.in_waiting:
@@ -137,8 +157,11 @@ def probe_port_is_robot(port: str, write_timeout: float = 0.25, read_timeout: fl
         deadline = time.time() + max(0.1, read_timeout)
         line = b""
         while time.time() < deadline:
-            line = ser.readline()
-            if line:
+            if cancel is not None and cancel.is_set():
+                return False
+            # A slice can end mid-line; keep what arrived
+            line += ser.readline()
+            if line.endswith(b"\n"):
                 break
         if not line:
             return False
@@ -156,23 +179,156 @@ def probe_port_is_robot(port: str, write_timeout: float = 0.25, read_timeout: fl
                 ser.close()
 
 
+def _probe_concurrently(candidates: List[str],
+                       per_port_timeout: float,
+                       first_only: bool,
+                       deadline: Optional[float],
+                       max_workers: Optional[int]) -> List[str]:
+    """Probe ports on a thread pool; return responsive ports in candidate order.
+
+    With ``first_only`` the first port to answer wins and the remaining probes
+    are cancelled. ``deadline`` bounds the wait for answers in seconds. Either
+    way, probes that have not started are dropped and running ones are waited
+    for, so no port is left open when this returns.
+    """
+    if not candidates:
+        return []
+    cancel = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=max_workers or min(32, len(candidates)),
+                              thread_name_prefix="pyallcode-probe")
+    futures = {}
+    for dev in candidates:
+        print(f"Probing port: {dev}")
+        futures[pool.submit(probe_port_is_robot, dev, 0.25, per_port_timeout, cancel)] = dev
+    end = None if deadline is None else time.monotonic() + max(0.0, deadline)
+    found = set()
+    pending = set(futures)
+    try:
+        while pending:
+            remaining = None if end is None else end - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if not fut.exception() and fut.result():
+                    found.add(futures[fut])
+            if found and first_only:
+                break
+    finally:
+        cancel.set()
+        for fut in pending:
+            fut.cancel()
+        # Running probes see the cancel within one read slice and close their ports
+        pool.shutdown(wait=True)
+    return [dev for dev in candidates if dev in found]
+
+
+def autodetect_robot_ports(prefer_keywords: list[str] | None = None,
+                           max_to_probe: int | None = None,
+                           per_port_timeout: float = 0.75,
+                           deadline: float | None = None,
+                           max_workers: int | None = None) -> List[str]:
+    """Probe all candidate ports concurrently and return every responsive one.
+
+    Args:
+        prefer_keywords: Optional description hint words to rank ports first.
+        max_to_probe: Optional cap on how many ports to try (best-first).
+        per_port_timeout: Read timeout per port used during probing.
+        deadline: Optional overall limit in seconds for the whole scan.
+        max_workers: Optional cap on concurrent probes (default: one per port, up to 32).
+
+    Returns:
+        List[str]: Responsive device paths, ordered best-first.
+    """
+    candidates = candidate_ports(prefer_keywords)
+    if max_to_probe is not None:
+        candidates = candidates[:max(0, int(max_to_probe))]
+    return _probe_concurrently(candidates, per_port_timeout, False, deadline, max_workers)
+
+
 def autodetect_robot_port(prefer_keywords: list[str] | None = None,
                           max_to_probe: int | None = None,
-                          per_port_timeout: float = 0.75) -> str | None:
+                          per_port_timeout: float = 0.75,
+                          parallel: bool = True,
+                          deadline: float | None = None,
+                          use_cache: bool = True) -> str | None:
     """Find the first serial port that behaves like the robot.
 
+    By default all candidates are probed concurrently and the first port to
+    answer wins, so detection takes about one probe timeout regardless of the
+    number of ports.
+
+    With ``use_cache`` the result is remembered for the rest of the program and
+    on disk (see ``pyallcode.comm.port_cache``). A remembered port is reused
+    only while it still enumerates with the same hardware ID; the on-disk
+    entry is additionally confirmed with a single probe and discarded on
+    mismatch.
+
     Args:
         prefer_keywords: Optional description hint words to rank ports first.
         max_to_probe: Optional cap on how many ports to try (best-first).
         per_port_timeout: Read timeout per port used during probing.
+        parallel: Probe ports concurrently (default) or one at a time best-first.
+        deadline: Optional overall limit in seconds for the whole scan.
+        use_cache: Reuse and record the detected port (default True).
 
     Returns:
         The device path (e.g. "COM7", "/dev/ttyUSB0") if found, else None.
     """
+    if not use_cache:
+        return _scan_for_robot(prefer_keywords, max_to_probe, per_port_timeout, parallel, deadline)
+    global _memo
+    # Serialise discovery so devices constructed together share one scan
+    with _memo_lock:
+        if _memo is not None and _enumerated(_memo[0], _memo[2]) is not None:
+            return _memo[0]
+        _memo = None
+        entry = load_cached_port()
+        if entry is not None:
+            current = _enumerated(entry["device"], entry["hwid"])
+            if current is not None and probe_port_is_robot(entry["device"], read_timeout=per_port_timeout):
+                _memo = current
+                return current[0]
+            clear_cached_port()
+        dev = _scan_for_robot(prefer_keywords, max_to_probe, per_port_timeout, parallel, deadline)
+        if dev:
+            info = next((p for p in list_ports_detailed() if p[0] == dev), (dev, "", ""))
+            _memo = (info[0], info[1] or "", info[2] or "")
+            save_cached_port(*_memo)
+        return dev
+
+
+def forget_robot_port() -> None:
+    """Drop the remembered robot port, both in-process and on disk."""
+    global _memo
+    with _memo_lock:
+        _memo = None
+        clear_cached_port()
+
+
+def _enumerated(device: str, hwid: str) -> Optional[Tuple[str, str, str]]:
+    """Return (device, description, hwid) if ``device`` is present with ``hwid``."""
+    for dev, desc, h in list_ports_detailed():
+        if dev == device and (h or "") == hwid:
+            return (dev, desc or "", h or "")
+    return None
+
+
+def _scan_for_robot(prefer_keywords: list[str] | None,
+                    max_to_probe: int | None,
+                    per_port_timeout: float,
+                    parallel: bool,
+                    deadline: float | None) -> str | None:
     candidates = candidate_ports(prefer_keywords)
     if max_to_probe is not None:
         candidates = candidates[:max(0, int(max_to_probe))]
+    if parallel:
+        found = _probe_concurrently(candidates, per_port_timeout, True, deadline, None)
+        return found[0] if found else None
+    end = None if deadline is None else time.monotonic() + max(0.0, deadline)
     for dev in candidates:
+        if end is not None and time.monotonic() >= end:
+            break
         print(f"Probing port: {dev}")
         if probe_port_is_robot(dev, read_timeout=per_port_timeout):
             return dev
@@ -0,0 +1,260 @@
+"""Record robot traffic to a log and replay it without hardware.
+
+``RecordingTransport`` wraps any transport and logs every write and every
+line read, with a timestamp relative to the start of the session, as one
+compact JSON object per line:
+
+    {"t":0.0,"open":"/dev/rfcomm0"}
+    {"t":0.0132,"w":"ReadIR 2\\n"}
+    {"t":0.0419,"r":"1873\\n"}
+    {"t":9.87,"close":1}
+
+Payloads are stored as latin-1 text, so any byte value round-trips. Paths
+ending in ``.gz`` are gzip-compressed. Records are buffered in memory and
+written in batches of ``buffer_records``, so long sessions use bounded memory.
+
+``ReplayTransport`` serves a recorded session back. Each write is matched
+against the next recorded command. The replies that followed that command
+become readable after the recorded latency, divided by ``speed``. Pass
+``speed=None`` to replay without waiting.
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import json
+from collections import deque
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from .clock import clock_of, system_clock
+
+PathOrFile = Union[str, IO[str]]
+
+
+class ReplayMismatch(RuntimeError):
+    """Raised when a replayed command differs from the recorded one."""
+
+
+def _open_text(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding="utf-8", newline="\n")
+    return open(path, mode, encoding="utf-8", newline="\n")
+
+
+def iter_records(source: PathOrFile) -> Iterator[Dict[str, Any]]:
+    """Yields the records of a session log one at a time.
+
+    Args:
+        source (str | IO[str]): A log path (``.gz`` for compressed) or an open text file.
+    """
+    f = _open_text(source, "r") if isinstance(source, str) else source
+    try:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    finally:
+        if isinstance(source, str):
+            f.close()
+
+
+class RecordingTransport:
+    """Transport wrapper that logs all traffic of another transport.
+
+    Args:
+        inner (Transport): The transport to record.
+        sink (str | IO[str]): Log path (``.gz`` for compressed) or an open text file.
+        buffer_records (int): Records held in memory before they are written out.
+
+    Attributes:
+        records_written (int): Records written to the sink so far.
+    """
+
+    def __init__(self, inner, sink: PathOrFile, buffer_records: int = 256) -> None:
+        self.inner = inner
+        self._sink = sink
+        self._file: Optional[IO[str]] = None if isinstance(sink, str) else sink
+        self._buffer: List[str] = []
+        self.buffer_records = max(1, int(buffer_records))
+        self._start: Optional[float] = None
+        self.records_written = 0
+
+    @property
+    def clock(self):
+        """The inner transport's clock."""
+        return clock_of(self.inner)
+
+    def _record(self, key: str, value: Any) -> None:
+        now = self.clock.now()
+        if self._start is None:
+            self._start = now
+        rec = {"t": round(now - self._start, 6), key: value}
+        self._buffer.append(json.dumps(rec, separators=(",", ":")))
+        if len(self._buffer) >= self.buffer_records:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes buffered records to the log."""
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._file = _open_text(self._sink, "w")
+        self._file.write("\n".join(self._buffer) + "\n")
+        self._file.flush()
+        self.records_written += len(self._buffer)
+        self._buffer.clear()
+
+    def open(self, port: str) -> None:
+        self.inner.open(port)
+        self._record("open", str(port))
+
+    def close(self) -> None:
+        try:
+            self.inner.close()
+        finally:
+            self._record("close", 1)
+            self.flush()
+            if isinstance(self._sink, str) and self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def write(self, data: bytes) -> None:
+        self._record("w", data.decode("latin-1"))
+        self.inner.write(data)
+
+    def readline(self) -> bytes:
+        line = self.inner.readline()
+        if line:
+            self._record("r", line.decode("latin-1"))
+        return line
+
+    def reset_input_buffer(self) -> None:
+        """Discards buffered input; drained lines are recorded as reads."""
+        reset = getattr(self.inner, "reset_input_buffer", None)
+        if reset is not None:
+            reset()
+            return
+        while self.inner.in_waiting > 0:
+            self.readline()
+
+    @property
+    def in_waiting(self) -> int:
+        return self.inner.in_waiting
+
+    @property
+    def is_open(self) -> bool:
+        return self.inner.is_open
+
+
+class ReplayTransport:
+    """Transport that plays back a session recorded by ``RecordingTransport``.
+
+    The log is read lazily, so sessions of any length replay in constant
+    memory.
+
+    Args:
+        source (str | IO[str]): Log path (``.gz`` for compressed) or an open text file.
+        speed (float | None): Latency scale: 1.0 replays the recorded reply
+            latency, 10.0 is ten times faster, None serves replies at once.
+        strict (bool): Raise ``ReplayMismatch`` when a command differs from the
+            recording; otherwise the difference is noted in ``mismatches``.
+        clock (SystemClock | VirtualClock | None): Time source for reply latency.
+
+    Attributes:
+        mismatches (list[tuple[str, str]]): ``(expected, actual)`` commands
+            that differed in non-strict mode.
+    """
+
+    def __init__(self, source: PathOrFile, speed: Optional[float] = 1.0, strict: bool = True,
+                 clock=None) -> None:
+        self._source = source
+        self.speed = speed
+        self.strict = strict
+        self.clock = clock if clock is not None else system_clock
+        self.mismatches: List[Tuple[str, str]] = []
+        self._records: Optional[Iterator[Dict[str, Any]]] = None
+        self._peeked: Optional[Dict[str, Any]] = None
+        self._pending: Deque[Tuple[float, bytes]] = deque()
+        self._is_open = False
+        self.port: Optional[str] = None
+
+    def _peek(self) -> Optional[Dict[str, Any]]:
+        if self._peeked is None and self._records is not None:
+            self._peeked = next(self._records, None)
+        return self._peeked
+
+    def _take(self) -> Optional[Dict[str, Any]]:
+        rec = self._peek()
+        self._peeked = None
+        return rec
+
+    def open(self, port: str) -> None:
+        self._records = iter_records(self._source)
+        self._peeked = None
+        self._pending.clear()
+        self._is_open = True
+        first = self._peek()
+        if first is not None and "open" in first:
+            self.port = first["open"]
+            self._take()
+
+    def close(self) -> None:
+        self._is_open = False
+        self._pending.clear()
+        if self._records is not None:
+            close = getattr(self._records, "close", None)
+            if close is not None:
+                close()
+            self._records = None
+
+    def write(self, data: bytes) -> None:
+        if not self._is_open:
+            raise RuntimeError("Replay transport is not open")
+        actual = data.decode("latin-1")
+        # Skip session markers such as close/open between commands
+        rec = self._take()
+        while rec is not None and "w" not in rec:
+            rec = self._take()
+        if rec is None:
+            raise ReplayMismatch(f"Recording ended before command {actual.strip()!r}")
+        expected = rec["w"]
+        if expected != actual:
+            if self.strict:
+                raise ReplayMismatch(f"Expected {expected.strip()!r}, got {actual.strip()!r}")
+            self.mismatches.append((expected, actual))
+        # The replies recorded after this command, up to the next command, belong to it
+        now = self.clock.now()
+        while True:
+            nxt = self._peek()
+            if nxt is None or "r" not in nxt:
+                break
+            self._take()
+            delay = 0.0 if not self.speed else (nxt["t"] - rec["t"]) / self.speed
+            self._pending.append((now + max(0.0, delay), nxt["r"].encode("latin-1")))
+
+    def readline(self) -> bytes:
+        if not self._is_open:
+            raise RuntimeError("Replay transport is not open")
+        if not self._pending:
+            return b""
+        ready_at, line = self._pending[0]
+        wait = ready_at - self.clock.now()
+        if wait > 0:
+            self.clock.sleep(wait)
+        self._pending.popleft()
+        return line
+
+    def reset_input_buffer(self) -> None:
+        """Discards replies that are already readable."""
+        now = self.clock.now()
+        while self._pending and self._pending[0][0] <= now:
+            self._pending.popleft()
+
+    @property
+    def in_waiting(self) -> int:
+        now = self.clock.now()
+        return sum(len(line) for ready_at, line in self._pending if ready_at <= now)
+
+    @property
+    def is_open(self) -> bool:
+        return self._is_open
@@ -0,0 +1,75 @@
+"""Retry policies for commands whose reply did not arrive in time.
+
+A ``RetryPolicy`` decides whether ``Connection.execute`` sends a command again
+after its reply timed out, and how long to wait first. Waits grow
+exponentially and can be jittered so that many robots sharing a radio link
+do not retry in lockstep.
+
+Only commands that are safe to repeat are retried. By default these are the
+sensor and status reads; moves and SD card operations change the robot's
+state and are never sent twice.
+
+    conn = Connection(transport, timeout=0.2, retry=RetryPolicy(retries=2))
+    conn.execute(READ_IR(2))          # up to three sends, about 0.6 s worst case
+"""
+from __future__ import annotations
+
+import random
+from typing import FrozenSet, Iterable, Optional
+
+# Command heads that only read state, so a second send is harmless.
+RETRYABLE_HEADS: FrozenSet[str] = frozenset({
+    "GetAPIVersion", "GetBatteryVoltage",
+    "ReadIR", "ReadLine", "ReadLight", "ReadMic", "ReadAxis", "ReadSwitch",
+})
+
+
+class RetryPolicy:
+    """Exponential backoff with optional jitter.
+
+    The wait before resend ``n`` (counting from 0) is
+    ``min(max_backoff, backoff * factor ** n)``, reduced by a random fraction
+    of up to ``jitter`` of itself.
+
+    Args:
+        retries (int): How many times a timed-out command is sent again.
+        backoff (float): Seconds to wait before the first resend.
+        factor (float): Multiplier applied to the wait after each resend.
+        max_backoff (float): Upper bound for a single wait in seconds.
+        jitter (float): Fraction of each wait that is randomised, from 0
+            (fixed waits) to 1 (anywhere between zero and the full wait).
+        heads (Iterable[str]): Command heads that may be resent.
+        seed (int | None): Seed for the jitter's random number generator.
+    """
+
+    def __init__(self, retries: int = 2, backoff: float = 0.01, factor: float = 2.0,
+                 max_backoff: float = 0.5, jitter: float = 0.5,
+                 heads: Iterable[str] = RETRYABLE_HEADS, seed: Optional[int] = None) -> None:
+        if not 0.0 <= jitter <= 1.0:
+            raise ValueError("jitter must be between 0 and 1")
+        self.retries = max(0, int(retries))
+        self.backoff = max(0.0, float(backoff))
+        self.factor = float(factor)
+        self.max_backoff = float(max_backoff)
+        self.jitter = float(jitter)
+        self.heads = frozenset(heads)
+        self._rng = random.Random(seed)
+
+    def __repr__(self) -> str:
+        return (f"RetryPolicy(retries={self.retries}, backoff={self.backoff}, "
+                f"factor={self.factor}, max_backoff={self.max_backoff}, jitter={self.jitter})")
+
+    def applies_to(self, head: str) -> bool:
+        """Returns whether commands with this head may be resent."""
+        return self.retries > 0 and head in self.heads
+
+    def delay(self, retry: int) -> float:
+        """Returns the seconds to wait before resend number ``retry`` (from 0)."""
+        wait = min(self.max_backoff, self.backoff * self.factor ** retry)
+        if self.jitter:
+            wait -= wait * self.jitter * self._rng.random()
+        return wait
+
+
+# Never resend; the default for Connection.
+NO_RETRY = RetryPolicy(retries=0)
@@ -0,0 +1,229 @@
+"""Priority command scheduler with a single writer thread.
+
+``CommandScheduler`` wraps a ``Connection`` and runs every command on one
+writer thread, taken from a priority queue. Threads that share a robot submit
+through the scheduler, so motor commands are never stuck behind a backlog of
+LCD drawing, and each caller gets back exactly the reply to its own command.
+
+The scheduler has the same ``execute`` and ``execute_many`` signatures as
+``Connection``, so it can be handed to any device class in place of a
+connection:
+
+    sched = CommandScheduler(robot.conn)
+    lcd = LCD(sched)            # LCD commands now queue at LOW priority
+
+A command already on the wire is never pre-empted: a blocking ``Forwards``
+still has to finish before the next command is sent.
+"""
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+from enum import IntEnum, unique
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from .clock import clock_of
+from .connection import Connection
+
+
+@unique
+class Priority(IntEnum):
+    """Scheduling classes; lower values run first."""
+
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+# Default class per command head. Heads not listed run at NORMAL, except the
+# LCD drawing commands which run at LOW.
+DEFAULT_PRIORITIES: Dict[str, Priority] = {
+    "SetMotors": Priority.CRITICAL,
+    "ServoSetPos": Priority.HIGH,
+    "ServoAutoMove": Priority.HIGH,
+    "ServoEnable": Priority.HIGH,
+    "ServoDisable": Priority.HIGH,
+    "LEDWrite": Priority.LOW,
+    "LEDOn": Priority.LOW,
+    "LEDOff": Priority.LOW,
+}
+
+
+def priority_for(command: str, priorities: Optional[Mapping[str, Priority]] = None) -> Priority:
+    """Return the scheduling class for a command.
+
+    Args:
+        command (str): The command text.
+        priorities (Mapping[str, Priority] | None): Overrides per command head,
+            consulted before ``DEFAULT_PRIORITIES``.
+    """
+    head = getattr(command, "head", None)
+    if head is None:
+        parts = command.split(None, 1)
+        head = parts[0] if parts else ""
+    if priorities is not None and head in priorities:
+        return Priority(priorities[head])
+    if head in DEFAULT_PRIORITIES:
+        return DEFAULT_PRIORITIES[head]
+    if head.startswith("LCD"):
+        return Priority.LOW
+    return Priority.NORMAL
+
+
+class _Request:
+    __slots__ = ("command", "expect_response", "attempts", "timeout", "batch", "window", "future")
+
+    def __init__(self, command, expect_response: bool, attempts: int,
+                 timeout: Optional[float] = None, batch: bool = False,
+                 window: Optional[int] = None) -> None:
+        # One command, or a list of them for a pipelined burst
+        self.command = command
+        self.expect_response = expect_response
+        self.attempts = attempts
+        self.timeout = timeout
+        self.batch = batch
+        self.window = window
+        self.future: Future = Future()
+
+
+# Sorts after every real priority so queued work finishes before shutdown.
+_STOP = len(Priority)
+
+
+class CommandScheduler:
+    """Serialises commands from many threads through one prioritised writer.
+
+    Args:
+        conn (Connection): The connection to drive.
+        priorities (Mapping[str, Priority] | None): Per-head overrides of the
+            default scheduling classes.
+    """
+
+    def __init__(self, conn: Connection, priorities: Optional[Mapping[str, Priority]] = None) -> None:
+        self.conn = conn
+        self.priorities = dict(priorities or {})
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._closed = False
+        # Orders puts against shutdown, so nothing is queued behind the stop marker
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name="pyallcode-scheduler", daemon=True)
+        self._writer.start()
+
+    @property
+    def clock(self):
+        """Clock of the underlying connection."""
+        return clock_of(self.conn)
+
+    @property
+    def verbose(self) -> int:
+        """Verbosity of the underlying connection."""
+        return self.conn.verbose
+
+    @verbose.setter
+    def verbose(self, value: int) -> None:
+        self.conn.verbose = value
+
+    def submit(self, command: str, expect_response: bool = True, attempts: int = 1,
+               priority: Optional[Priority] = None, timeout: Optional[float] = None) -> Future:
+        """Queue a command and return a Future for its reply.
+
+        Args:
+            command (str): The command to execute.
+            expect_response (bool, optional): Whether to expect a response from the device.
+            attempts (int, optional): The number of attempts to read the response.
+            priority (Priority | None): Scheduling class; derived from the
+                command head when None.
+            timeout (float | None): Seconds to wait for the reply once the
+                command is sent; see ``Connection.execute``.
+
+        Raises:
+            RuntimeError: If the scheduler has been shut down.
+        """
+        if priority is None:
+            priority = priority_for(command, self.priorities)
+        return self._put(_Request(command, expect_response, attempts, timeout), priority)
+
+    def submit_many(self, commands: Iterable[str], attempts: int = 1, priority: Optional[Priority] = None,
+                    timeout: Optional[float] = None, max_in_flight: Optional[int] = None) -> Future:
+        """Queue response-bearing commands as one pipelined burst.
+
+        The writer thread sends them back-to-back with
+        ``Connection.execute_many``; no other queued command runs in between.
+
+        Args:
+            commands (Iterable[str]): The commands to execute.
+            attempts (int, optional): The number of attempts to read each reply.
+            priority (Priority | None): Scheduling class; the most urgent class
+                of the commands when None.
+            timeout (float | None): Seconds to wait for each reply.
+            max_in_flight (int | None): Outstanding replies allowed for this
+                burst; see ``Connection.execute_many``.
+
+        Returns:
+            Future: Resolves to the list of replies, in order.
+        """
+        commands = list(commands)
+        if priority is None:
+            priority = min((priority_for(c, self.priorities) for c in commands), default=Priority.NORMAL)
+        return self._put(_Request(commands, True, attempts, timeout, batch=True, window=max_in_flight), priority)
+
+    def _put(self, request: _Request, priority: Priority) -> Future:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("CommandScheduler is shut down")
+            self._queue.put((int(priority), next(self._seq), request))
+        return request.future
+
+    def execute(self, command: str, expect_response: bool = True, attempts: int = 1,
+                priority: Optional[Priority] = None, timeout: Optional[float] = None) -> int | None:
+        """Queue a command and wait for its reply; same contract as ``Connection.execute``."""
+        if threading.current_thread() is self._writer:
+            # Called from inside a scheduled command: run inline to avoid deadlock
+            return self.conn.execute(command, expect_response, attempts, timeout=timeout)
+        return self.submit(command, expect_response, attempts, priority, timeout).result()
+
+    def execute_many(self, commands: Iterable[str], attempts: int = 1, timeout: Optional[float] = None,
+                     max_in_flight: Optional[int] = None,
+                     priority: Optional[Priority] = None) -> List[Optional[int]]:
+        """Queue a pipelined burst and wait for its replies; same contract as ``Connection.execute_many``."""
+        if threading.current_thread() is self._writer:
+            return self.conn.execute_many(commands, attempts, timeout, max_in_flight)
+        return self.submit_many(commands, attempts, priority, timeout, max_in_flight).result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting commands; queued commands still run before the writer exits."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((_STOP, next(self._seq), None))
+        if wait and threading.current_thread() is not self._writer:
+            self._writer.join()
+
+    def close(self) -> None:
+        """Shut down the scheduler and close the underlying connection."""
+        self.shutdown()
+        self.conn.close()
+
+    def _run(self) -> None:
+        while True:
+            _, _, request = self._queue.get()
+            if request is None:
+                return
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            try:
+                if request.batch:
+                    value = self.conn.execute_many(request.command, request.attempts, request.timeout,
+                                                   request.window)
+                else:
+                    value = self.conn.execute(request.command, request.expect_response, request.attempts,
+                                              timeout=request.timeout)
+            except BaseException as e:
+                request.future.set_exception(e)
+            else:
+                request.future.set_result(value)
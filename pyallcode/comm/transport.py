@@ -2,11 +2,17 @@
 Provides a Transport protocol (interface), a SerialTransport implementation
 using pyserial, and a SimulatedTransport for hardware-free simulation.
 """
-from typing import Optional, Protocol, runtime_checkable
+from collections import deque
+from typing import Deque, Optional, Protocol, runtime_checkable
+import contextlib
 import os
 import random
+import threading
 import time
 
+from ..sim.engine import CARD_FILE_HEADS, NO_REPLY, SimCard, SimRobot
+from ..sim.world import World
+
 # pyserial is optional for users running in dummy mode. Import lazily/safely.
 try:
     import serial  # type: ignore
@@ -42,13 +48,21 @@ class SerialTransport:
         parity (serial.Parity): The parity setting for the serial connection.
         stopbits (serial.StopBits): The stop bits setting for the serial connection.
         bytesize (serial.ByteSize): The byte size setting for the serial connection.
+        timeout (float | None): Read timeout in seconds for ``readline``.
+        reader_thread (bool): When True, a background thread pulls bytes from the
+            port into a bounded line buffer and ``readline``/``in_waiting`` are
+            served from memory.
+        max_buffered_lines (int): Capacity of the line buffer in reader-thread
+            mode. The oldest lines are dropped when it overflows.
     """
     def __init__(self,
                  baudrate: int = 115200,
                  parity = serial.PARITY_NONE,
                  stopbits = serial.STOPBITS_ONE,
                  bytesize = serial.EIGHTBITS,
-                 timeout: Optional[float] = 1.0) -> None:
+                 timeout: Optional[float] = 1.0,
+                 reader_thread: bool = False,
+                 max_buffered_lines: int = 1024) -> None:
         self._serial: Optional[object] = None
         self._config = dict(
             baudrate=baudrate,
@@ -57,6 +71,21 @@ class SerialTransport:
             bytesize=bytesize,
             timeout=timeout,
         )
+        self._timeout = timeout
+        self._use_reader = reader_thread
+        # deque append/popleft are atomic, so the reader thread and callers
+        # share the buffer without a lock; the event only wakes waiting readers.
+        self._lines: Deque[bytes] = deque(maxlen=max(1, int(max_buffered_lines)))
+        self._data_ready = threading.Event()
+        self._stop = threading.Event()
+        self._reader: Optional[threading.Thread] = None
+        self._reader_error: Optional[BaseException] = None
+        # Bumped by reset_input_buffer so the reader thread drops its half-read line
+        self._resets = 0
+        # Without the reader thread: bytes readline_within took off the port
+        # that do not yet end in a newline
+        self._partial = b""
+        self.dropped_lines = 0
 
     def open(self, port: str) -> None:
         """Opens the serial port.
@@ -64,15 +93,18 @@ class SerialTransport:
             port (str): The serial port to open.
         """
         if self._serial and self._serial.is_open:
-            self._serial.close()
+            self.close()
         self._serial = serial.Serial(port=port, **self._config)
         if not self._serial.is_open:
             self._serial.open()
         if not self._serial.is_open:
             raise RuntimeError(f"Failed to open serial port: {port}")
+        if self._use_reader:
+            self._start_reader()
 
     def close(self) -> None:
         """Closes the serial port."""
+        self._stop_reader()
         if self._serial and self._serial.is_open:
             self._serial.close()
 
@@ -92,14 +124,83 @@ class SerialTransport:
         """
         if not self._serial or not self._serial.is_open:
             raise RuntimeError("Serial port is not open")
-        return self._serial.readline()
+        if self._reader is None:
+            line = self._take_line()
+            if line:
+                return line
+            data, self._partial = self._partial + self._serial.readline(), b""
+            return data
+        return self._readline_buffered()
+
+    def readline_within(self, timeout: float) -> bytes:
+        """Reads a line, waiting at most ``timeout`` seconds.
+
+        Unlike ``readline``, a line that is still incomplete is kept for the
+        next read instead of being returned, so a caller with a deadline never
+        blocks for the full port timeout. Without the reader thread this does
+        not wait at all: it takes the bytes that have arrived (``read`` of
+        ``in_waiting``, leaving the port's timeout alone) and returns a line
+        only if one is complete; the caller polls ``in_waiting`` meanwhile.
+
+        Args:
+            timeout (float): Seconds to wait; 0 reads only what has arrived.
+
+        Returns:
+            bytes: A newline-terminated line, or b"" if none arrived in time.
+        """
+        if not self._serial or not self._serial.is_open:
+            raise RuntimeError("Serial port is not open")
+        if self._reader is not None:
+            if self._timeout is not None:
+                timeout = min(timeout, self._timeout)
+            return self._readline_buffered(max(0.0, timeout))
+        waiting = self._serial.in_waiting
+        if waiting > 0:
+            self._partial += self._serial.read(waiting)
+        return self._take_line()
+
+    def _take_line(self) -> bytes:
+        partial = self._partial
+        end = partial.find(b"\n") + 1
+        if not end:
+            return b""
+        self._partial = partial[end:]
+        return partial[:end]
+
+    def reset_input_buffer(self) -> None:
+        """Discards all buffered input.
+
+        In reader-thread mode this clears the in-memory line buffer and the
+        reader's partial line; otherwise it asks pyserial to discard the OS
+        input buffer.
+        """
+        if self._reader is not None:
+            self._resets += 1
+            self._lines.clear()
+            return
+        self._partial = b""
+        if self._serial and self._serial.is_open:
+            reset = getattr(self._serial, "reset_input_buffer", None)
+            if reset is not None:
+                reset()
+            else:
+                while self._serial.in_waiting > 0:
+                    self._serial.readline()
 
     @property
     def in_waiting(self) -> int:
-        """Returns the number of bytes in the input buffer."""
+        """Returns the number of bytes in the input buffer.
+
+        In reader-thread mode only complete lines are counted, so a non-zero
+        value guarantees ``readline`` returns without waiting.
+        """
         if not self._serial or not self._serial.is_open:
             return 0
-        return self._serial.in_waiting
+        if self._reader is not None:
+            return sum(len(line) for line in tuple(self._lines))
+        # Bytes already taken off the port count once they make a whole line
+        held = self._partial.rfind(b"\n") + 1
+        return self._serial.in_waiting + held
 
     @property
     def is_open(self) -> bool:
@@ -111,36 +212,147 @@ class SerialTransport:
         """Returns the raw serial object."""
         return self._serial
 
+    # ----- reader thread -----
+    def _start_reader(self) -> None:
+        self._lines.clear()
+        self._stop.clear()
+        self._data_ready.clear()
+        self._reader_error = None
+        self._reader = threading.Thread(target=self._reader_loop, args=(self._serial,),
+                                        name="pyallcode-serial-reader", daemon=True)
+        self._reader.start()
+
+    def _stop_reader(self) -> None:
+        reader, self._reader = self._reader, None
+        if reader is None:
+            return
+        self._stop.set()
+        cancel = getattr(self._serial, "cancel_read", None)
+        if cancel is not None:
+            with contextlib.suppress(Exception):
+                cancel()
+        reader.join(timeout=(self._timeout or 0) + 1.0)
+        self._data_ready.set()
+
+    def _reader_loop(self, ser) -> None:
+        partial = b""
+        lines = self._lines
+        seen = self._resets
+        try:
+            while not self._stop.is_set():
+                data = ser.read(ser.in_waiting or 1)
+                if not data:
+                    continue
+                if self._resets != seen:
+                    # The input was reset: the half-read line is stale
+                    seen = self._resets
+                    partial = b""
+                parts = (partial + data).split(b"\n")
+                partial = parts.pop()
+                if not parts:
+                    continue
+                if self._resets != seen:
+                    # Reset while splitting: these lines were read before it
+                    seen = self._resets
+                    partial = b""
+                    continue
+                for line in parts:
+                    if len(lines) == lines.maxlen:
+                        self.dropped_lines += 1
+                    lines.append(line + b"\n")
+                self._data_ready.set()
+        except Exception as e:  # port unplugged or closed underneath us
+            if not self._stop.is_set():
+                self._reader_error = e
+        finally:
+            self._data_ready.set()
+
+    def _readline_buffered(self, timeout: Optional[float] = None) -> bytes:
+        if timeout is None:
+            timeout = self._timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._lines.popleft()
+            except IndexError:
+                pass
+            if self._reader_error is not None:
+                raise RuntimeError(f"Serial reader stopped: {self._reader_error}")
+            if self._reader is None:
+                return b""
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return b""
+            self._data_ready.clear()
+            # Re-check after clearing so a line appended in between is not missed
+            if self._lines:
+                continue
+            self._data_ready.wait(remaining)
+
 
 class SimulatedTransport:
     """A hardware-free transport that simulates the robot.
 
     Behavior:
     - open/close simply toggle an internal flag.
-    - write() records the last command and prints a user-friendly message.
-    - readline() synthesizes a plausible integer response based on the last
-      command and returns it as a newline-terminated bytes string.
-    - in_waiting is always 0 (no buffering needed).
+    - write() records the command, prints a user-friendly message and queues
+      a reply for commands that expect one.
+    - readline() returns the oldest queued reply as a newline-terminated bytes
+      string (or, without a world model, a reply for the last command when
+      nothing is queued).
+    - in_waiting reports the number of queued replies, so pipelined commands
+      are answered in order.
+
+    Without a world, sensor reads return plausible random integers and the SD
+    card is modelled by ``card`` (a ``SimCard``), so files written can be read
+    back and reads stop at the end of a file. Pass a
+    ``World`` (or a prepared ``SimRobot``) to drive a deterministic physics
+    model instead: movement commands update the robot's pose and IR, line and
+    light readings are computed from the map. ``seed`` makes either mode
+    reproducible; the global ``random`` module is never touched.
 
     This transport enables students to run code without any hardware. For
     commands that don't expect a reply, an acknowledgement is printed by the
     Connection layer when it detects this transport.
+
+    Args:
+        world (World | None): Map for the physics model.
+        seed (int | None): Seed for the private random number generator.
+        robot (SimRobot | None): A prepared simulated robot (or a ``Fleet``
+            member); overrides ``world``.
+        echo (bool): Print movement and SD card commands as they are written.
+        clock (VirtualClock | None): Simulated clock shared with the physics
+            model, connection and samplers. Sleeps and moves then take no
+            wall-clock time.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, world: Optional[World] = None, seed: Optional[int] = None,
+                 robot: Optional[SimRobot] = None, echo: bool = True, clock=None) -> None:
         self._is_open = False
         self._last_command: str | None = None
         self._connected_port: Optional[str] = None
+        self._pending: Deque[bytes] = deque()
+        self._rng = random.Random(seed)
+        if robot is None and world is not None:
+            robot = SimRobot(world, seed=seed, clock=clock)
+        if clock is None and robot is not None:
+            clock = getattr(robot, "clock", None)
+        self.robot = robot
+        self.clock = clock
+        self.echo = echo
+        self.card = SimCard(lambda: self._rng.randint(0, 255))
 
     def open(self, port: str) -> None:
         self._is_open = True
         self._connected_port = port
-        print(f"[SimulatedRobot] Connected (simulated) on {port}")
+        if self.echo:
+            print(f"[SimulatedRobot] Connected (simulated) on {port}")
 
     def close(self) -> None:
-        if self._is_open:
+        if self._is_open and self.echo:
             print("[SimulatedRobot] Disconnected")
         self._is_open = False
+        self._pending.clear()
 
     def _echo_command(self, cmd: str | None) -> int:
         """Prints a user-friendly echo of certain commands."""
@@ -153,35 +365,45 @@ class SimulatedTransport:
     def write(self, data: bytes) -> None:
         if not self._is_open:
             raise RuntimeError("Simulated transport is not open")
-        try:
-            cmd = data.decode(errors="ignore").strip()
-        except Exception:
-            cmd = ""
+        # A batched write (Connection.send_many) carries several commands
+        for line in data.splitlines() or [b""]:
+            self._handle(line.decode(errors="ignore").strip())
+
+    def _handle(self, cmd: str) -> None:
         self._last_command = cmd
+        if self.robot is not None:
+            reply = self.robot.handle(cmd)
+            if reply is not None:
+                self._pending.append(b"%d\n" % reply)
+        elif cmd and cmd.split()[0] in CARD_FILE_HEADS:
+            reply = self.card.handle(cmd)
+            if reply is not None:
+                self._pending.append(b"%d\n" % reply)
+        elif cmd and cmd.split()[0] not in NO_REPLY:
+            self._pending.append(b"%d\n" % self._random_for_command(cmd))
         # Light echo to help students see what was sent
-        self._echo_command(cmd)
+        if self.echo and cmd:
+            self._echo_command(cmd)
             
     def _random_for_command(self, cmd: str | None) -> int:
         head = (cmd or "").split()[0]
-        # Deterministic-ish seed per call to avoid identical bursts while
-        # remaining unpredictable across different commands.
-        random.seed(time.time_ns() ^ hash(cmd))
+        rng = self._rng
         if head == "GetAPIVersion":
             return 7
         if head == "GetBatteryVoltage":
-            return random.randint(0, 5000)
+            return rng.randint(0, 5000)
         if head == "ReadAxis":  # accelerometer XYZ
-            return random.randint(-32768, 32768)
+            return rng.randint(-32768, 32768)
         if head == "ReadSwitch":  # buttons
-            return random.randint(0, 1)
+            return rng.randint(0, 1)
         if head == "ReadIR":
-            return random.randint(0, 4095)
+            return rng.randint(0, 4095)
         if head == "ReadLight":
-            return random.randint(0, 4095)
+            return rng.randint(0, 4095)
         if head == "ReadLine":
-            return random.randint(0, 1)
+            return rng.randint(0, 1)
         if head == "ReadMic":
-            return random.randint(1, 4095)
+            return rng.randint(1, 4095)
         if head in ("Forwards", "Backwards", "Left", "Right"):
             # Movement complete/ack
             return 1
@@ -189,19 +411,22 @@ class SimulatedTransport:
                     "CardRecordMic", "CardPlayback", "CardBitmap"):
             return 1
         if head == "CardReadByte":
-            return random.randint(0, 255)
+            return rng.randint(0, 255)
         # Default: benign OK
         return 1
 
     def readline(self) -> bytes:
         if not self._is_open:
             raise RuntimeError("Simulated transport is not open")
-        val = self._random_for_command(self._last_command)
-        return f"{val}\n".encode()
+        if self._pending:
+            return self._pending.popleft()
+        if self.robot is not None or not self._last_command:
+            return b""
+        return b"%d\n" % self._random_for_command(self._last_command)
 
     @property
     def in_waiting(self) -> int:
-        return 0
+        return len(self._pending)
 
     @property
     def is_open(self) -> bool:
@@ -1,4 +1,5 @@
 """Module for interacting with the accelerometer device."""
+from ..comm.commands import READ_AXIS
 from ..comm.connection import Connection
 from .base import DeviceBase
 
@@ -23,7 +24,7 @@ class Accelerometer(DeviceBase):
             Returns:
                 int: The accelerometer value for the specified axis.
         """
-        return int(self.conn.execute(f'ReadAxis {int(index)}') or -1)
+        return int(self.conn.execute(READ_AXIS(index)) or -1)
 
     # Convenience helpers
     def x(self) -> int:
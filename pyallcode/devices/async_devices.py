@@ -0,0 +1,264 @@
+"""asyncio facades for the device classes.
+
+Each class mirrors its synchronous counterpart in ``pyallcode.devices`` but
+takes an ``AsyncConnection`` and exposes coroutine methods. They are normally
+reached through ``AsyncRobot`` attributes.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from ..comm.async_connection import AsyncConnection
+from ..comm.commands import (
+    CARD_BITMAP,
+    CARD_CREATE,
+    CARD_DELETE,
+    CARD_INIT,
+    CARD_OPEN,
+    CARD_PLAYBACK,
+    CARD_READ_BYTE,
+    CARD_RECORD_MIC,
+    CARD_WRITE_BYTE,
+    LCD_BACKLIGHT,
+    LCD_CLEAR,
+    LCD_LINE,
+    LCD_NUMBER,
+    LCD_OPTIONS,
+    LCD_PIXEL,
+    LCD_PRINT,
+    LCD_RECT,
+    LCD_VERBOSE,
+    LED_OFF,
+    LED_ON,
+    LED_WRITE,
+    PLAY_NOTE,
+    READ_AXIS,
+    READ_IR,
+    READ_LIGHT,
+    READ_LINE,
+    READ_MIC,
+    READ_SWITCH,
+    SERVO_AUTO_MOVE,
+    SERVO_DISABLE,
+    SERVO_ENABLE,
+    SERVO_MOVE_SPEED,
+    SERVO_SET_POS,
+)
+
+
+class AsyncDevice:
+    """Base for async devices; holds the shared ``AsyncConnection``.
+
+    Args:
+        conn (AsyncConnection): The connection to the device.
+    """
+
+    def __init__(self, conn: AsyncConnection) -> None:
+        self.conn = conn
+
+
+class AsyncAccelerometer(AsyncDevice):
+    """Async version of ``Accelerometer``."""
+
+    async def read_axis(self, index: int) -> int:
+        """Reads the accelerometer value for the axis index (0 X, 1 Y, 2 Z)."""
+        return int(await self.conn.execute(READ_AXIS(index)) or -1)
+
+    async def x(self) -> int:
+        """Reads the accelerometer value for the X axis."""
+        return await self.read_axis(0)
+
+    async def y(self) -> int:
+        """Reads the accelerometer value for the Y axis."""
+        return await self.read_axis(1)
+
+    async def z(self) -> int:
+        """Reads the accelerometer value for the Z axis."""
+        return await self.read_axis(2)
+
+
+class AsyncPushButtons(AsyncDevice):
+    """Async version of ``PushButtons``."""
+
+    async def read(self, index: int) -> bool:
+        """Returns True if the button (0 left, 1 right) is pressed."""
+        value = await self.conn.execute(READ_SWITCH(index))
+        try:
+            return bool(int(value))
+        except Exception:
+            return False
+
+
+class AsyncIRSensors(AsyncDevice):
+    """Async version of ``IRSensors``."""
+
+    async def read(self, index: int) -> int:
+        """Reads the value from the IR sensor (0-7)."""
+        return int(await self.conn.execute(READ_IR(index)) or -1)
+
+
+class AsyncLCD(AsyncDevice):
+    """Async version of ``LCD``. Drawing commands are fire-and-forget."""
+
+    async def clear(self) -> None:
+        """Clears the LCD display."""
+        await self.conn.execute(LCD_CLEAR(), expect_response=False)
+
+    async def print(self, x: int, y: int, text: str) -> None:
+        """Prints text at the specified coordinates."""
+        await self.conn.execute(LCD_PRINT(x, y, text), expect_response=False)
+
+    async def number(self, x: int, y: int, value: int) -> None:
+        """Displays a number at the specified coordinates."""
+        await self.conn.execute(LCD_NUMBER(x, y, value), expect_response=False)
+
+    async def pixel(self, x: int, y: int, state: int) -> None:
+        """Sets the state of a pixel (1 on, 0 off)."""
+        await self.conn.execute(LCD_PIXEL(x, y, state), expect_response=False)
+
+    async def line(self, x1: int, y1: int, x2: int, y2: int) -> None:
+        """Draws a line."""
+        await self.conn.execute(LCD_LINE(x1, y1, x2, y2), expect_response=False)
+
+    async def rect(self, x1: int, y1: int, x2: int, y2: int) -> None:
+        """Draws a rectangle."""
+        await self.conn.execute(LCD_RECT(x1, y1, x2, y2), expect_response=False)
+
+    async def backlight(self, value: int) -> None:
+        """Sets the backlight (1 on, 0 off)."""
+        await self.conn.execute(LCD_BACKLIGHT(value), expect_response=False)
+
+    async def options(self, fg: int, bg: int, transparent: int) -> None:
+        """Sets the foreground/background colours and transparency."""
+        await self.conn.execute(LCD_OPTIONS(fg, bg, transparent), expect_response=False)
+
+    async def verbose(self, value: int) -> None:
+        """Sets the verbosity of the LCD (1 on, 0 off)."""
+        await self.conn.execute(LCD_VERBOSE(value), expect_response=False)
+
+
+class AsyncLEDs(AsyncDevice):
+    """Async version of ``LEDs``."""
+
+    async def write(self, value: int) -> None:
+        """Writes a value (0-255) to the LEDs."""
+        await self.conn.execute(LED_WRITE(value), expect_response=False)
+
+    async def on(self, index: int) -> None:
+        """Turns on the specified LED."""
+        await self.conn.execute(LED_ON(index), expect_response=False)
+
+    async def off(self, index: int) -> None:
+        """Turns off the specified LED."""
+        await self.conn.execute(LED_OFF(index), expect_response=False)
+
+
+class AsyncLightSensor(AsyncDevice):
+    """Async version of ``LightSensor``."""
+
+    async def read(self) -> int:
+        """Reads the value from the light sensor."""
+        return int(await self.conn.execute(READ_LIGHT()) or -1)
+
+
+class AsyncLineSensors(AsyncDevice):
+    """Async version of ``LineSensors``."""
+
+    async def read(self, index: int) -> bool:
+        """Returns True when the line sensor (0-1) reads a line."""
+        value = await self.conn.execute(READ_LINE(index))
+        try:
+            return bool(int(value))
+        except Exception:
+            return False
+
+
+class AsyncMic(AsyncDevice):
+    """Async version of ``Mic``."""
+
+    async def read(self) -> int:
+        """Reads the microphone level, or -1 on error."""
+        return int(await self.conn.execute(READ_MIC()) or -1)
+
+
+class AsyncSDCard(AsyncDevice):
+    """Async version of ``SDCard``."""
+
+    async def init(self) -> int:
+        """Initialize the SD card."""
+        return int(await self.conn.execute(CARD_INIT(), True, 2) or -1)
+
+    async def create(self, filename: str) -> int:
+        """Create a new file on the SD card."""
+        return int(await self.conn.execute(CARD_CREATE(filename), True, 2) or -1)
+
+    async def open(self, filename: str) -> int:
+        """Open a file on the SD card."""
+        return int(await self.conn.execute(CARD_OPEN(filename), True, 2) or -1)
+
+    async def delete(self, filename: str) -> int:
+        """Delete a file on the SD card."""
+        return int(await self.conn.execute(CARD_DELETE(filename), True, 2) or -1)
+
+    async def write_byte(self, data: int) -> None:
+        """Write a byte (0-255) to the SD card.
+
+        Raises:
+            ValueError: If the data is not an integer or is out of range.
+        """
+        if not isinstance(data, int) or not (0 <= data <= 255):
+            raise ValueError("write_byte expects 0..255")
+        await self.conn.execute(CARD_WRITE_BYTE(data), expect_response=False)
+
+    async def read_byte(self) -> int:
+        """Read a byte (0-255) from the SD card."""
+        return int(await self.conn.execute(CARD_READ_BYTE(), True, 2) or -1)
+
+    async def record_mic(self, bitdepth: int, samplerate: int, seconds: int, filename: str,
+                         timeout: float | None = None) -> int:
+        """Record audio from the microphone to a file on the SD card."""
+        effective_timeout = seconds + 5 if timeout is None else timeout
+        return int(await self.conn.execute(
+            CARD_RECORD_MIC(bitdepth, samplerate, seconds, filename), True, effective_timeout) or -1)
+
+    async def playback(self, filename: str, timeout: float = 50) -> int:
+        """Play back an audio file from the SD card."""
+        return int(await self.conn.execute(CARD_PLAYBACK(filename), True, timeout) or -1)
+
+    async def bitmap(self, x: int, y: int, filename: str) -> int:
+        """Display a bitmap file from the SD card on the LCD."""
+        safe_filename = '"' + str(filename).replace('"', '') + '"'
+        return int(await self.conn.execute(CARD_BITMAP(x, y, safe_filename), True, 5) or -1)
+
+
+class AsyncServos(AsyncDevice):
+    """Async version of ``Servos``."""
+
+    async def enable(self, index: int) -> None:
+        """Enable the specified servo motor."""
+        await self.conn.execute(SERVO_ENABLE(index), expect_response=False)
+
+    async def disable(self, index: int) -> None:
+        """Disable the specified servo motor."""
+        await self.conn.execute(SERVO_DISABLE(index), expect_response=False)
+
+    async def set_pos(self, index: int, position: int) -> None:
+        """Set the position of the specified servo motor."""
+        await self.conn.execute(SERVO_SET_POS(index, position), expect_response=False)
+
+    async def auto_move(self, index: int, position: int) -> None:
+        """Move the specified servo motor to the position automatically."""
+        await self.conn.execute(SERVO_AUTO_MOVE(index, position), expect_response=False)
+
+    async def move_speed(self, speed: int) -> None:
+        """Set the servo movement speed."""
+        await self.conn.execute(SERVO_MOVE_SPEED(speed), expect_response=False)
+
+
+class AsyncSpeaker(AsyncDevice):
+    """Async version of ``Speaker``."""
+
+    async def play_note(self, note: int, length_ms: int) -> None:
+        """Plays a note and waits (without blocking the loop) for its duration."""
+        await self.conn.execute(PLAY_NOTE(note, length_ms), expect_response=False)
+        await asyncio.sleep(max(0, length_ms) / 1000.0)
@@ -0,0 +1,209 @@
+"""Streaming decoder for WAV recordings made with ``SDCard.record_mic``.
+
+``WavStream`` reads a recording block by block from any binary file. This
+can be an SD card file from ``SDCard.open_file``, which downloads it in
+pipelined chunks, or a local file. It yields fixed-size blocks of samples,
+so a long recording can be analysed without holding it in memory:
+
+    with bot.sd_card.stream_wav("REC.WAV", block_frames=1024) as stream:
+        for block in stream:
+            spectrum = numpy.abs(numpy.fft.rfft(block))
+
+Blocks are NumPy arrays when NumPy is installed and ``array.array``
+otherwise, in the recording's own sample format: ``uint8`` for 8-bit
+recordings and ``int16`` for 16-bit ones. Multi-channel blocks are shaped
+``(frames, channels)`` in NumPy and interleaved in an ``array``.
+"""
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterator, Optional
+
+from ..enums import BitDepth, SampleRate
+
+try:  # NumPy is optional; fall back to array-backed blocks without it
+    import numpy as _np  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    _np = None
+
+# Sample width in bytes -> (NumPy dtype, array typecode); WAV data is little-endian
+_FORMATS = {1: ("u1", "B"), 2: ("<i2", "h")}
+_WAVE_FORMAT_PCM = 1
+# Data chunk sizes written by recorders that did not know the final length
+_UNKNOWN_SIZES = (0, 0xFFFFFFFF)
+# The codes record_mic takes, as bits per sample and Hz
+_BIT_DEPTHS = {BitDepth.BIT_8: 8, BitDepth.BIT_16: 16}
+_SAMPLE_RATES = {SampleRate.SR_8KHZ: 8000, SampleRate.SR_16KHZ: 16000}
+
+
+def _read_exact(f: BinaryIO, n: int) -> bytes:
+    data = f.read(n) or b""
+    while len(data) < n:
+        more = f.read(n - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def _skip(f: BinaryIO, n: int) -> None:
+    while n > 0:
+        got = len(f.read(min(n, 4096)) or b"")
+        if not got:
+            return
+        n -= got
+
+
+class WavStream:
+    """Iterates over a PCM WAV recording in fixed-size blocks.
+
+    The RIFF header is parsed from the start of the file and the sample data
+    is read as it is consumed; the file is never seeked. A file without a
+    header can be read as raw PCM by passing ``bitdepth`` and
+    ``samplerate``, either as bits and Hz or as the ``BitDepth`` and
+    ``SampleRate`` codes given to ``record_mic``.
+
+    Args:
+        file (BinaryIO): The open recording, positioned at its start.
+        block_frames (int): Frames per block; the last block may be shorter.
+        bitdepth (int | BitDepth | None): Bits per sample (8 or 16) of a raw
+            (headerless) file, or its ``BitDepth`` code; None to read the WAV
+            header.
+        samplerate (int | SampleRate | None): Sample rate of a raw file in
+            Hz, or its ``SampleRate`` code.
+        channels (int): Channels of a raw file.
+
+    Attributes:
+        samplerate (int): Frames per second.
+        bitdepth (int): Bits per sample, 8 or 16.
+        channels (int): Samples per frame.
+        frames (int | None): Frames in the recording, if the header says.
+        position (int): Frames yielded so far.
+
+    Raises:
+        ValueError: If the header is not a PCM WAV header, the sample format
+            is not 8- or 16-bit, or the sample rate is not positive.
+    """
+
+    def __init__(self, file: BinaryIO, block_frames: int = 1024, bitdepth: Optional[int] = None,
+                 samplerate: Optional[int] = None, channels: int = 1) -> None:
+        if block_frames < 1:
+            raise ValueError("block_frames must be positive")
+        self.file = file
+        self.block_frames = int(block_frames)
+        self.position = 0
+        self._remaining: Optional[int] = None
+        if bitdepth is None:
+            self._read_header()
+        else:
+            if samplerate is None:
+                raise ValueError("raw PCM needs both bitdepth and samplerate")
+            self.bitdepth = _BIT_DEPTHS.get(bitdepth, int(bitdepth))
+            self.samplerate = _SAMPLE_RATES.get(samplerate, int(samplerate))
+            self.channels = int(channels)
+            self.frames = None
+        if self.bitdepth // 8 not in _FORMATS or self.bitdepth % 8:
+            raise ValueError(f"unsupported bit depth {self.bitdepth}; expected 8 or 16")
+        if self.samplerate <= 0:
+            raise ValueError(f"invalid sample rate {self.samplerate}")
+        if self.channels < 1:
+            raise ValueError("channels must be positive")
+        self.frame_bytes = self.bitdepth // 8 * self.channels
+
+    def __enter__(self) -> "WavStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator:
+        return self.blocks()
+
+    def __repr__(self) -> str:
+        return (f"WavStream({self.samplerate} Hz, {self.bitdepth} bit, {self.channels} ch, "
+                f"frames={self.frames})")
+
+    @property
+    def dtype(self) -> str:
+        """The NumPy dtype of the samples: ``'uint8'`` or ``'int16'``."""
+        return "uint8" if self.bitdepth == 8 else "int16"
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Length of the recording in seconds, if the header says."""
+        return None if self.frames is None else self.frames / self.samplerate
+
+    def close(self) -> None:
+        """Closes the underlying file."""
+        self.file.close()
+
+    def _read_header(self) -> None:
+        riff = _read_exact(self.file, 12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:] != b"WAVE":
+            raise ValueError("not a WAV file; pass bitdepth and samplerate to read raw PCM")
+        fmt = None
+        while True:
+            head = _read_exact(self.file, 8)
+            if len(head) < 8:
+                raise ValueError("WAV file has no data chunk")
+            tag, size = head[:4], struct.unpack("<I", head[4:])[0]
+            if tag == b"fmt ":
+                body = _read_exact(self.file, size)
+                if len(body) < 16:
+                    raise ValueError("truncated WAV fmt chunk")
+                fmt = struct.unpack("<HHIIHH", body[:16])
+                if size & 1:
+                    _skip(self.file, 1)
+            elif tag == b"data":
+                break
+            else:
+                _skip(self.file, size + (size & 1))
+        if fmt is None:
+            raise ValueError("WAV data chunk comes before its fmt chunk")
+        format_tag, self.channels, self.samplerate, _, _, self.bitdepth = fmt
+        if format_tag != _WAVE_FORMAT_PCM:
+            raise ValueError(f"unsupported WAV format {format_tag}; only PCM is supported")
+        frame_bytes = max(1, self.bitdepth // 8 * self.channels)
+        if size in _UNKNOWN_SIZES:
+            self.frames = None
+        else:
+            self.frames = size // frame_bytes
+            self._remaining = self.frames * frame_bytes
+
+    def read(self, frames: Optional[int] = None):
+        """Reads and decodes up to ``frames`` frames (one block by default).
+
+        Returns:
+            numpy.ndarray | array.array: The samples; empty at the end.
+        """
+        n = (self.block_frames if frames is None else int(frames)) * self.frame_bytes
+        if self._remaining is not None:
+            n = min(n, self._remaining)
+        data = _read_exact(self.file, n) if n > 0 else b""
+        # Drop a trailing partial frame from a truncated file
+        data = data[:len(data) - len(data) % self.frame_bytes]
+        if self._remaining is not None:
+            self._remaining -= len(data)
+        self.position += len(data) // self.frame_bytes
+        return self._decode(data)
+
+    def blocks(self) -> Iterator:
+        """Yields blocks of ``block_frames`` frames until the recording ends."""
+        while True:
+            block = self.read()
+            if not len(block):
+                return
+            yield block
+
+    def _decode(self, data: bytes):
+        dtype, typecode = _FORMATS[self.bitdepth // 8]
+        if _np is not None:
+            samples = _np.frombuffer(data, dtype=dtype).astype(self.dtype)
+            return samples.reshape(-1, self.channels) if self.channels > 1 else samples
+        samples = array(typecode)
+        samples.frombytes(data)
+        if samples.itemsize > 1 and sys.byteorder == "big":
+            samples.byteswap()
+        return samples
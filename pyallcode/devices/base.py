@@ -3,7 +3,7 @@
 This mixin/base lets each device be used either:
 
 - With an existing Connection provided by the Robot (backward compatible)
-- Or standalone by auto-creating and opening its own serial connection
+- Or standalone, sharing a pooled connection per port (see ``pyallcode.comm.pool``)
 
 Usage pattern inside device classes:
 
@@ -20,12 +20,16 @@ from typing import Optional
 
 from ..comm.connection import Connection
 from ..comm.transport import SerialTransport, SimulatedTransport, transport_mode_from_env
-from ..comm.ports import autodetect_robot_port
+from ..comm.pool import default_pool
 
 
 class DeviceBase:
     """Provide a Connection for device classes.
 
+    Standalone devices share connections through ``pyallcode.comm.pool``: every
+    device (and ``Robot``) using the same port gets the same open Connection,
+    so constructing several devices neither re-probes nor double-opens the port.
+
     Args:
         conn: Existing Connection to use (e.g., from Robot). If provided, it's used as-is.
         port: Serial port to open if creating our own connection. Can be a COM index/int
@@ -43,26 +47,19 @@ class DeviceBase:
         autoconn: bool = True,
         verbose: int = 0,
     ) -> None:
+        self._pooled = False
         # If a connection is supplied (Robot path), keep legacy behavior.
         if conn is not None:
             self.conn = conn
             return
 
-        # Otherwise create our own connection (standalone device usage).
-        forced_mode = transport_mode_from_env()
-        if forced_mode == "simulated":
-            transport = SimulatedTransport()
-            self.conn = Connection(transport, verbose=verbose)
-            if autoconn:
-                label = "SIMULATED" if port is None else (str(port) if isinstance(port, str) else f"SIMULATED-{port}")
-                transport.open(label)
-                if getattr(self.conn, "verbose", 0):
-                    print("[SimulatedRobot] Forced by PYALLCODE_TRANSPORT; using simulated transport")
+        # Otherwise share a pooled connection (standalone device usage).
+        if autoconn:
+            self._open_with_fallback(port, verbose)
         else:
-            transport = SerialTransport()
+            # Placeholder until .open() is called; nothing is opened yet.
+            transport = SimulatedTransport() if transport_mode_from_env() == "simulated" else SerialTransport()
             self.conn = Connection(transport, verbose=verbose)
-            if autoconn:
-                self._open_with_fallback(port)
 
     # ----- lifecycle helpers -----
     def open(self, port: str | int | None = None) -> str:
@@ -70,46 +67,29 @@ class DeviceBase:
 
         Returns the connected port label (real device path or 'SIMULATED').
         """
-        return self._open_with_fallback(port)
+        return self._open_with_fallback(port, self.conn.verbose)
 
     def close(self) -> None:
-        """Close the underlying connection."""
-        self.conn.close()
+        """Close the underlying connection.
+
+        A pooled connection is only closed once no other device uses it.
+        """
+        if self._pooled:
+            self._pooled = False
+            default_pool.release(self.conn)
+        else:
+            self.conn.close()
 
     def set_verbose(self, value: int) -> None:
         """Set Connection verbosity."""
         self.conn.verbose = value
 
     # ----- internals -----
-    def _open_with_fallback(self, port: str | int | None) -> str:
-        # Honor forced simulated mode via environment variable first.
-        if transport_mode_from_env() == "simulated":
-            sim = SimulatedTransport()
-            self.conn.transport = sim
-            label = "SIMULATED" if port is None else (str(port) if isinstance(port, str) else f"SIMULATED-{port}")
-            sim.open(label)
-            if getattr(self.conn, "verbose", 0):
-                print("[SimulatedRobot] Forced by PYALLCODE_TRANSPORT; using simulated transport")
-            return label
-
-        # Try the requested or auto-detected real serial first.
-        chosen_port: Optional[str]
-        try:
-            if port is None:
-                chosen_port = autodetect_robot_port()
-                if chosen_port:
-                    self.conn.open(chosen_port)
-                    return chosen_port
-                raise RuntimeError("No responsive robot port found")
-            else:
-                self.conn.open(port)
-                return str(port)
-        except Exception as e:
-            # Fall back to a simulated device so examples/tests can run without hardware.
-            sim = SimulatedTransport()
-            self.conn.transport = sim
-            label = "SIMULATED" if port is None else (str(port) if isinstance(port, str) else f"SIMULATED-{port}")
-            sim.open(label)
-            if getattr(self.conn, "verbose", 0):
-                print(f"[SimulatedRobot] DeviceBase: using simulated transport: {e}")
-            return label
+    def _open_with_fallback(self, port: str | int | None, verbose: int) -> str:
+        # The pool honours PYALLCODE_TRANSPORT and falls back to a simulated
+        # device so examples/tests can run without hardware.
+        if self._pooled:
+            default_pool.release(self.conn)
+        self.conn = default_pool.acquire(port, verbose=verbose)
+        self._pooled = True
+        return default_pool.port_of(self.conn) or "SIMULATED"
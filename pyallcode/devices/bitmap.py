@@ -0,0 +1,261 @@
+"""Preparing images for ``SDCard.bitmap`` and caching them on the card.
+
+``CardBitmap`` draws a BMP file from the SD card. This module turns an
+in-memory image into a monochrome BMP on the host, and ``BitmapCache`` makes
+sure each distinct image is uploaded only once:
+
+- ``to_mono`` converts a grayscale, RGB or RGBA image to on/off pixels, by
+  thresholding or by ordered (Bayer) dithering. Both are single NumPy
+  expressions over the whole image.
+- ``encode_bmp`` packs the pixels into a 1-bit BMP.
+- Files are named after a hash of their contents. A manifest file on the
+  card lists the images already there, so an image that was uploaded before,
+  in this session or an earlier one, is drawn with a single ``CardBitmap``
+  command.
+
+    cache = BitmapCache(bot.sd_card)
+    cache.show(numpy.asarray(PIL.Image.open("menu.png")), dither=True)
+
+NumPy is required for ``to_mono`` and ``encode_bmp``
+(``pip install pyallcode[numpy]``).
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import struct
+from typing import Container, Dict, NamedTuple, Optional
+
+try:  # NumPy is optional for the package; image preparation needs it
+    import numpy as _np  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    _np = None
+
+from .sdcard import SDTransferError
+
+# Default manifest of cached bitmaps on the card
+MANIFEST = "BMPCACHE.TXT"
+# Longest manifest that is read; anything larger is treated as damaged
+MANIFEST_MAX_SIZE = 64 * 1024
+_MANIFEST_HEADER = "pyallcode bitmap cache 1"
+_MANIFEST_LINE = re.compile(r"([0-9A-F]{8}\.BMP) ([0-9A-F]{64}) (\d+)")
+
+# 4x4 Bayer matrix: the order in which pixels of a tile turn on as gray darkens
+_BAYER4 = ((0, 8, 2, 10), (12, 4, 14, 6), (3, 11, 1, 9), (15, 7, 13, 5))
+# ITU-R BT.601 luma weights
+_LUMA = (0.299, 0.587, 0.114)
+
+
+def _require_numpy() -> None:
+    if _np is None:
+        raise ImportError("bitmap preparation requires NumPy; install it with 'pip install pyallcode[numpy]'")
+
+
+def to_mono(image, threshold: int = 128, dither: bool = False, invert: bool = False):
+    """Converts an image to display pixels.
+
+    Args:
+        image: A 2-D grayscale or ``(h, w, 3|4)`` RGB(A) array of 0-255
+            values, anything ``numpy.asarray`` accepts (such as a PIL image),
+            or a boolean array that is already on/off.
+        threshold (int): Gray level below which a pixel is on (dark).
+        dither (bool): Use ordered dithering instead of a fixed threshold, so
+            gradients come out as pixel patterns.
+        invert (bool): Turn light pixels on instead of dark ones.
+
+    Returns:
+        numpy.ndarray: A 2-D boolean array, True where the pixel is on.
+    """
+    _require_numpy()
+    a = _np.asarray(image)
+    if a.dtype == bool:
+        if a.ndim != 2:
+            raise ValueError("a boolean image must be 2-D")
+        return ~a if invert else a.copy()
+    if a.ndim == 3 and a.shape[2] in (3, 4):
+        gray = a[..., :3].astype(_np.float32) @ _np.asarray(_LUMA, dtype=_np.float32)
+        if a.shape[2] == 4:
+            # Composite onto white, so transparent areas stay off
+            alpha = a[..., 3].astype(_np.float32) / 255.0
+            gray = gray * alpha + 255.0 * (1.0 - alpha)
+    elif a.ndim == 2:
+        gray = a.astype(_np.float32)
+    else:
+        raise ValueError(f"expected a 2-D or (h, w, 3|4) image, got shape {a.shape}")
+    if dither:
+        h, w = gray.shape
+        bayer = (_np.asarray(_BAYER4, dtype=_np.float32) + 0.5) * (255.0 / 16.0)
+        limit = _np.tile(bayer, (h // 4 + 1, w // 4 + 1))[:h, :w]
+    else:
+        limit = float(threshold)
+    on = gray < limit
+    return ~on if invert else on
+
+
+def encode_bmp(pixels) -> bytes:
+    """Packs on/off pixels into a 1-bit BMP file (palette: white, black).
+
+    Args:
+        pixels: A 2-D array; non-zero entries are drawn.
+
+    Returns:
+        bytes: The BMP file.
+    """
+    _require_numpy()
+    mask = _np.asarray(pixels).astype(bool)
+    if mask.ndim != 2 or 0 in mask.shape:
+        raise ValueError("pixels must be a non-empty 2-D array")
+    h, w = mask.shape
+    stride = (w + 31) // 32 * 4
+    # BMP rows are stored bottom-up, each padded to a multiple of 4 bytes
+    rows = _np.zeros((h, stride), dtype=_np.uint8)
+    rows[:, :(w + 7) // 8] = _np.packbits(mask[::-1], axis=1)
+    palette = b"\xff\xff\xff\x00\x00\x00\x00\x00"
+    offset = 14 + 40 + len(palette)
+    header = struct.pack("<2sIHHI", b"BM", offset + rows.size, 0, 0, offset)
+    info = struct.pack("<IiiHHIIiiII", 40, w, h, 1, 1, 0, rows.size, 2835, 2835, 2, 2)
+    return header + info + palette + rows.tobytes()
+
+
+def content_digest(data: bytes) -> str:
+    """Returns the hash that identifies a bitmap: 64 upper-case hex digits (BLAKE2s)."""
+    return hashlib.blake2s(data).hexdigest().upper()
+
+
+def content_name(digest: str, taken: Container[str] = ()) -> str:
+    """Returns an 8.3 file name for a bitmap, e.g. ``'3FA2C01B.BMP'``.
+
+    The name is the first 8 digits of the digest. If that name is in
+    ``taken`` (another image's file), the next 8-digit window of the digest
+    is tried, and so on.
+
+    Raises:
+        ValueError: If every window of the digest is taken.
+    """
+    for k in range(len(digest) - 7):
+        name = digest[k:k + 8] + ".BMP"
+        if name not in taken:
+            return name
+    raise ValueError("no free file name for this bitmap")
+
+
+class _Entry(NamedTuple):
+    name: str
+    size: int
+
+
+class BitmapCache:
+    """Uploads bitmaps on first use and remembers them in a manifest on the card.
+
+    The manifest is a text file: a header line, then one ``<name> <digest>
+    <size>`` line per image, keyed by ``content_digest``. It is read on first
+    use (at most ``MANIFEST_MAX_SIZE`` bytes) and rewritten after each upload,
+    once the image itself is on the card. Files are deleted before they are
+    rewritten, so nothing of an older, longer version survives. A missing, oversized or malformed
+    manifest is treated as empty. Later shows of a known image send only
+    ``CardBitmap``.
+
+    Two images whose digests start alike get different file names, so one
+    never overwrites the other.
+
+    Images drawn this way bypass any LCD ``Canvas``; call its
+    ``invalidate()`` afterwards.
+
+    Args:
+        card (SDCard): The SD card to store images on.
+        manifest (str): Name of the manifest file on the card.
+        verify (bool): Read each upload back and compare checksums.
+
+    Attributes:
+        uploads (int): Images uploaded by this cache.
+        hits (int): Images found on the card already.
+    """
+
+    def __init__(self, card, manifest: str = MANIFEST, verify: bool = False) -> None:
+        self.card = card
+        self.manifest = manifest
+        self.verify = verify
+        self.uploads = 0
+        self.hits = 0
+        self._entries: Optional[Dict[str, _Entry]] = None
+
+    @property
+    def entries(self) -> Dict[str, _Entry]:
+        """Images known to be on the card: digest -> (file name, size)."""
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def reload(self) -> None:
+        """Forgets the cached manifest; it is read from the card again on next use."""
+        self._entries = None
+
+    def ensure(self, data: bytes) -> str:
+        """Puts a prepared BMP file on the card unless it is there already.
+
+        Args:
+            data (bytes): The BMP file, e.g. from ``encode_bmp``.
+
+        Returns:
+            str: The file name on the card.
+        """
+        data = bytes(data)
+        digest = content_digest(data)
+        entries = self.entries
+        entry = entries.get(digest)
+        if entry is not None and entry.size == len(data):
+            self.hits += 1
+            return entry.name
+        taken = {e.name for d, e in entries.items() if d != digest}
+        name = content_name(digest, taken)
+        self._write(data, name, self.verify)
+        entries[digest] = _Entry(name, len(data))
+        self._save()
+        self.uploads += 1
+        return name
+
+    def prepare(self, image, threshold: int = 128, dither: bool = False, invert: bool = False) -> str:
+        """Converts an image (see ``to_mono``) and ensures it is on the card.
+
+        Returns:
+            str: The file name on the card.
+        """
+        return self.ensure(encode_bmp(to_mono(image, threshold, dither, invert)))
+
+    def show(self, image, x: int = 0, y: int = 0, threshold: int = 128,
+             dither: bool = False, invert: bool = False) -> int:
+        """Draws an image at ``(x, y)``, uploading it first if the card does not have it.
+
+        Returns:
+            int: The result of the ``CardBitmap`` command.
+        """
+        return self.card.bitmap(x, y, self.prepare(image, threshold, dither, invert))
+
+    def _load(self) -> Dict[str, _Entry]:
+        try:
+            data = self.card.download_bytes(self.manifest, max_size=MANIFEST_MAX_SIZE)
+        except SDTransferError:
+            # No manifest yet, or one that does not end
+            return {}
+        lines = data.decode("ascii", errors="replace").splitlines()
+        if not lines or lines[0] != _MANIFEST_HEADER:
+            return {}
+        entries: Dict[str, _Entry] = {}
+        for line in lines[1:]:
+            m = _MANIFEST_LINE.fullmatch(line)
+            if m is None:
+                # Not written by this cache, or damaged: trust none of it
+                return {}
+            entries[m.group(2)] = _Entry(m.group(1), int(m.group(3)))
+        return entries
+
+    def _save(self) -> None:
+        lines = [_MANIFEST_HEADER]
+        lines += [f"{e.name} {digest} {e.size}" for digest, e in sorted(self.entries.items())]
+        self._write(("\n".join(lines) + "\n").encode("ascii"), self.manifest)
+
+    def _write(self, data: bytes, name: str, verify: bool = False) -> None:
+        # CardCreate need not truncate a file that exists: delete it first so a
+        # shorter rewrite leaves none of the old bytes behind
+        self.card.delete(name)
+        self.card.upload(data, name, verify=verify)
@@ -1,4 +1,5 @@
 """Module for interacting with the push buttons device."""
+from ..comm.commands import READ_SWITCH
 from ..comm.connection import Connection
 from .base import DeviceBase
 
@@ -22,7 +23,7 @@ class PushButtons(DeviceBase):
         Returns:
             bool: True if pressed, False otherwise.
         """
-        value = self.conn.execute(f'ReadSwitch {index}')
+        value = self.conn.execute(READ_SWITCH(index))
         # Treat any non-zero truthy integer as pressed
         try:
             return bool(int(value))
@@ -0,0 +1,270 @@
+"""Host-side LCD framebuffer that sends only what changed.
+
+A ``Canvas`` mirrors the 128x32 monochrome display. Drawing calls only update
+memory. ``flush()`` compares the frame with what the display already shows
+and sends the fewest commands it can:
+
+- Changed pixels are merged into horizontal runs, and leftover single pixels
+  into vertical runs. Each run is sent as one ``LCDLine``; pixels that stay
+  single are sent as ``LCDPixel``.
+- Text is kept as strings per position and printed opaquely. Text that
+  changed or was removed is overwritten, padded with spaces to its old
+  length, so the display never needs ``LCDClear`` between frames.
+- If a full redraw (``LCDClear`` then everything) is cheaper than the diff,
+  that is sent instead.
+
+The firmware draws lines in the foreground colour, so ``LCDOptions`` is sent
+only when the colour has to change.
+
+    canvas = bot.lcd.canvas()
+    canvas.text(0, 0, f"IR {ir:4d}")
+    canvas.rect(0, 10, 127, 31)
+    canvas.flush()                     # a handful of commands, not a full redraw
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from ..comm.commands import LCD_CLEAR, LCD_LINE, LCD_OPTIONS, LCD_PIXEL, LCD_PRINT, Call
+from ..enums import Colour
+
+# (x1, y1, x2, y2) of one run of pixels in a single colour
+_Run = Tuple[int, int, int, int]
+
+
+class Canvas:
+    """A framebuffer for the LCD with diffed updates.
+
+    Pixels under a text item belong to the text. They are not diffed, since
+    the host does not know the firmware's glyphs.
+
+    Args:
+        lcd (LCD): The display to draw on; its ``conn`` sends the commands.
+        width (int): Display width in pixels.
+        height (int): Display height in pixels.
+        char_width (int): Horizontal advance of one character in pixels.
+        char_height (int): Height of a line of text in pixels.
+
+    Attributes:
+        commands_sent (int): Commands sent by all flushes so far.
+    """
+
+    def __init__(self, lcd, width: int = 128, height: int = 32,
+                 char_width: int = 6, char_height: int = 8) -> None:
+        self.lcd = lcd
+        self.width = int(width)
+        self.height = int(height)
+        self.char_width = int(char_width)
+        self.char_height = int(char_height)
+        self._pixels = bytearray(self.width * self.height)
+        self._texts: Dict[Tuple[int, int], str] = {}
+        # What the display shows; None until the first flush
+        self._shown: Optional[bytearray] = None
+        self._shown_texts: Dict[Tuple[int, int], str] = {}
+        self._fg: Optional[int] = None
+        self.commands_sent = 0
+
+    # ----- drawing -----
+    def clear(self) -> None:
+        """Blanks the frame (nothing is sent until ``flush``)."""
+        self._pixels[:] = bytes(len(self._pixels))
+        self._texts.clear()
+
+    def get(self, x: int, y: int) -> int:
+        """Returns the pixel at ``(x, y)`` in the frame: 1 (on) or 0."""
+        return self._pixels[y * self.width + x]
+
+    def pixel(self, x: int, y: int, state: int = 1) -> None:
+        """Sets one pixel; coordinates off the display are ignored."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self._pixels[y * self.width + x] = 1 if state else 0
+
+    def line(self, x1: int, y1: int, x2: int, y2: int, state: int = 1) -> None:
+        """Draws a line (Bresenham) between two points, inclusive."""
+        if y1 == y2:
+            self._span(min(x1, x2), max(x1, x2), y1, state)
+            return
+        dx, dy = abs(x2 - x1), -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, state)
+            if x1 == x2 and y1 == y2:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def rect(self, x1: int, y1: int, x2: int, y2: int, state: int = 1, fill: bool = False) -> None:
+        """Draws a rectangle outline, or a filled rectangle with ``fill=True``."""
+        x1, x2 = sorted((x1, x2))
+        y1, y2 = sorted((y1, y2))
+        if fill:
+            for y in range(y1, y2 + 1):
+                self._span(x1, x2, y, state)
+            return
+        self._span(x1, x2, y1, state)
+        self._span(x1, x2, y2, state)
+        for y in range(y1 + 1, y2):
+            self.pixel(x1, y, state)
+            self.pixel(x2, y, state)
+
+    def text(self, x: int, y: int, text: str) -> None:
+        """Places text with its top-left corner at ``(x, y)``; an empty string removes it."""
+        if text:
+            self._texts[(x, y)] = str(text)
+        else:
+            self._texts.pop((x, y), None)
+
+    def number(self, x: int, y: int, value: int) -> None:
+        """Places a number as text at ``(x, y)``."""
+        self.text(x, y, str(int(value)))
+
+    def _span(self, x1: int, x2: int, y: int, state: int) -> None:
+        if not 0 <= y < self.height:
+            return
+        x1, x2 = max(x1, 0), min(x2, self.width - 1)
+        if x1 > x2:
+            return
+        row = y * self.width
+        self._pixels[row + x1:row + x2 + 1] = (b"\x01" if state else b"\x00") * (x2 - x1 + 1)
+
+    # ----- flushing -----
+    def invalidate(self) -> None:
+        """Forgets what the display shows, so the next flush redraws everything.
+
+        Call this after drawing on the LCD directly.
+        """
+        self._shown = None
+        self._shown_texts = {}
+        self._fg = None
+
+    def diff(self) -> List[Call]:
+        """Returns the commands ``flush`` would send, without sending them."""
+        return self._plan()[0]
+
+    def flush(self) -> int:
+        """Sends the commands that bring the display up to date with the frame.
+
+        Returns:
+            int: The number of commands sent.
+        """
+        commands, fg = self._plan()
+        execute = self.lcd.conn.execute
+        for command in commands:
+            execute(command, expect_response=False)
+        self._shown = bytearray(self._pixels)
+        self._shown_texts = dict(self._texts)
+        self._fg = fg
+        self.commands_sent += len(commands)
+        return len(commands)
+
+    def _plan(self) -> Tuple[List[Call], Optional[int]]:
+        full = self._plan_from(None, {}, self._fg)
+        if self._shown is None:
+            return full
+        diff = self._plan_from(self._shown, self._shown_texts, self._fg)
+        return diff if len(diff[0]) <= len(full[0]) else full
+
+    def _plan_from(self, shown: Optional[bytearray], shown_texts: Dict[Tuple[int, int], str],
+                   fg: Optional[int]) -> Tuple[List[Call], Optional[int]]:
+        out: List[Call] = []
+        if shown is None:
+            out.append(LCD_CLEAR())
+            shown = bytearray(len(self._pixels))
+        else:
+            shown = bytearray(shown)
+
+        def use(colour: int) -> None:
+            nonlocal fg
+            if fg != colour:
+                other = Colour.WHITE if colour == Colour.BLACK else Colour.BLACK
+                out.append(LCD_OPTIONS(colour, other, 0))
+                fg = colour
+
+        # Text first: opaque prints also blank the cells of shorter or removed text
+        for key in sorted(set(self._texts) | set(shown_texts)):
+            new, old = self._texts.get(key, ""), shown_texts.get(key, "")
+            if new == old:
+                continue
+            use(Colour.BLACK)
+            out.append(LCD_PRINT(key[0], key[1], new.ljust(len(old))))
+            self._blank(shown, key, max(len(new), len(old)))
+
+        mask = self._text_mask()
+        runs: Dict[int, List[_Run]] = {0: [], 1: []}
+        singles: Dict[int, List[Tuple[int, int]]] = {0: [], 1: []}
+        self._runs(shown, mask, runs, singles)
+        for state in (1, 0):
+            for x, y in singles[state]:
+                out.append(LCD_PIXEL(x, y, state))
+        for colour in (Colour.BLACK, Colour.WHITE):
+            state = 1 if colour == Colour.BLACK else 0
+            if runs[state]:
+                use(colour)
+                out.extend(LCD_LINE(*run) for run in runs[state])
+        return out, fg
+
+    def _blank(self, shown: bytearray, key: Tuple[int, int], chars: int) -> None:
+        x, y = key
+        x2 = min(self.width, x + chars * self.char_width)
+        for row in range(max(y, 0), min(self.height, y + self.char_height)):
+            base = row * self.width
+            shown[base + max(x, 0):base + x2] = bytes(max(0, x2 - max(x, 0)))
+
+    def _text_mask(self) -> bytearray:
+        mask = bytearray(len(self._pixels))
+        for (x, y), text in self._texts.items():
+            x2 = min(self.width, x + len(text) * self.char_width)
+            for row in range(max(y, 0), min(self.height, y + self.char_height)):
+                base = row * self.width
+                mask[base + max(x, 0):base + x2] = b"\x01" * max(0, x2 - max(x, 0))
+        return mask
+
+    def _runs(self, shown: bytearray, mask: bytearray,
+              runs: Dict[int, List[_Run]], singles: Dict[int, List[Tuple[int, int]]]) -> None:
+        width = self.width
+        pixels = self._pixels
+        lone: Dict[int, List[Tuple[int, int]]] = {0: [], 1: []}
+        for y in range(self.height):
+            base = y * width
+            if pixels[base:base + width] == shown[base:base + width]:
+                continue
+            x = 0
+            while x < width:
+                i = base + x
+                if pixels[i] == shown[i] or mask[i]:
+                    x += 1
+                    continue
+                state = pixels[i]
+                # Grow the run over pixels of the same colour; stop at text
+                end = x
+                last_changed = x
+                while end + 1 < width and pixels[base + end + 1] == state and not mask[base + end + 1]:
+                    end += 1
+                    if shown[base + end] != state:
+                        last_changed = end
+                if last_changed == x:
+                    lone[state].append((x, y))
+                else:
+                    runs[state].append((x, y, last_changed, y))
+                x = end + 1
+        # Stack single pixels of the same column and colour into vertical runs
+        for state, points in lone.items():
+            points.sort()
+            k = 0
+            while k < len(points):
+                x, y = points[k]
+                j = k
+                while j + 1 < len(points) and points[j + 1] == (x, points[j][1] + 1):
+                    j += 1
+                if j > k:
+                    runs[state].append((x, y, x, points[j][1]))
+                else:
+                    singles[state].append((x, y))
+                k = j + 1
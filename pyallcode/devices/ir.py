@@ -1,4 +1,5 @@
 """Module for interacting with the IR distance sensors."""
+from ..comm.commands import READ_IR
 from ..comm.connection import Connection
 from .base import DeviceBase
 
@@ -23,4 +24,4 @@ class IRSensors(DeviceBase):
         Returns:
             int: The sensor value.
         """
-        return int(self.conn.execute(f'ReadIR {index}') or -1)
+        return int(self.conn.execute(READ_IR(index)) or -1)
@@ -1,6 +1,18 @@
 """Module for interacting with the LCD display."""
+from ..comm.commands import (
+    LCD_BACKLIGHT,
+    LCD_CLEAR,
+    LCD_LINE,
+    LCD_NUMBER,
+    LCD_OPTIONS,
+    LCD_PIXEL,
+    LCD_PRINT,
+    LCD_RECT,
+    LCD_VERBOSE,
+)
 from ..comm.connection import Connection
 from .base import DeviceBase
+from .canvas import Canvas
 
 class LCD(DeviceBase):
     """Represents the LCD display.
@@ -15,7 +27,7 @@ class LCD(DeviceBase):
 
     def clear(self) -> None:
         """Clears the LCD display."""
-        self.conn.execute('LCDClear', expect_response=False)
+        self.conn.execute(LCD_CLEAR(), expect_response=False)
 
     def print(self, x: int, y: int, text: str) -> None:
         """Prints text on the LCD display at the specified coordinates.
@@ -25,7 +37,7 @@ class LCD(DeviceBase):
             y (int): The y-coordinate.
             text (str): The text to print.
         """
-        self.conn.execute(f'LCDPrint {int(x)} {int(y)} {text}', expect_response=False)
+        self.conn.execute(LCD_PRINT(x, y, text), expect_response=False)
 
     def number(self, x: int, y: int, value: int) -> None:
         """Displays a number on the LCD at the specified coordinates.
@@ -35,7 +47,7 @@ class LCD(DeviceBase):
             y (int): The y-coordinate.
             value (int): The number to display.
         """
-        self.conn.execute(f'LCDNumber {int(x)} {int(y)} {int(value)}', expect_response=False)
+        self.conn.execute(LCD_NUMBER(x, y, value), expect_response=False)
 
     def pixel(self, x: int, y: int, state: int) -> None:
         """Sets the state of a pixel on the LCD.
@@ -44,7 +56,7 @@ class LCD(DeviceBase):
             y (int): The y-coordinate.
             state (int): The pixel state (1 for on, 0 for off).
         """
-        self.conn.execute(f'LCDPixel {int(x)} {int(y)} {int(state)}', expect_response=False)
+        self.conn.execute(LCD_PIXEL(x, y, state), expect_response=False)
 
     def line(self, x1: int, y1: int, x2: int, y2: int) -> None:
         """Draws a line on the LCD.
@@ -54,7 +66,7 @@ class LCD(DeviceBase):
             x2 (int): The ending x-coordinate.
             y2 (int): The ending y-coordinate.
         """
-        self.conn.execute(f'LCDLine {int(x1)} {int(y1)} {int(x2)} {int(y2)}', expect_response=False)
+        self.conn.execute(LCD_LINE(x1, y1, x2, y2), expect_response=False)
 
     def rect(self, x1: int, y1: int, x2: int, y2: int) -> None:
         """Draws a rectangle on the LCD.
@@ -64,14 +76,14 @@ class LCD(DeviceBase):
             x2 (int): The bottom-right x-coordinate.
             y2 (int): The bottom-right y-coordinate.
         """
-        self.conn.execute(f'LCDRect {int(x1)} {int(y1)} {int(x2)} {int(y2)}', expect_response=False)
+        self.conn.execute(LCD_RECT(x1, y1, x2, y2), expect_response=False)
 
     def backlight(self, value: int) -> None:
         """Sets the backlight of the LCD.
         Args:
             value (int): The backlight value (1 for on, 0 for off).
         """
-        self.conn.execute(f'LCDBacklight {int(value)}', expect_response=False)
+        self.conn.execute(LCD_BACKLIGHT(value), expect_response=False)
 
     def options(self, fg: int, bg: int, transparent: int) -> None:
         """Sets the options for the LCD.
@@ -80,11 +92,20 @@ class LCD(DeviceBase):
             bg (int): The background color.
             transparent (int): The transparency (1 for on, 0 for off).
         """
-        self.conn.execute(f'LCDOptions {int(fg)} {int(bg)} {int(transparent)}', expect_response=False)
+        self.conn.execute(LCD_OPTIONS(fg, bg, transparent), expect_response=False)
 
     def verbose(self, value: int) -> None:
         """Sets the verbosity of the LCD.
         Args:
             value (int): The verbosity level (1 for on, 0 for off).
         """
-        self.conn.execute(f'LCDVerbose {int(value)}', expect_response=False)
+        self.conn.execute(LCD_VERBOSE(value), expect_response=False)
+
+    def canvas(self, width: int = 128, height: int = 32) -> Canvas:
+        """Returns a framebuffer that sends only changed pixels and text on ``flush()``.
+
+        Args:
+            width (int): Display width in pixels.
+            height (int): Display height in pixels.
+        """
+        return Canvas(self, width, height)
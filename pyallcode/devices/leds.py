@@ -1,4 +1,5 @@
 """Module for interacting with the device's LEDs."""
+from ..comm.commands import LED_OFF, LED_ON, LED_WRITE
 from ..comm.connection import Connection
 from .base import DeviceBase
 
@@ -18,18 +19,18 @@ class LEDs(DeviceBase):
         Args:
             value (int): The value to write (0-255).
         """
-        self.conn.execute(f'LEDWrite {int(value)}', expect_response=False)
+        self.conn.execute(LED_WRITE(value), expect_response=False)
 
     def on(self, index: int) -> None:
         """Turns on the specified LED.
         Args:
             index (int): The index of the LED to turn on.
         """
-        self.conn.execute(f'LEDOn {int(index)}', expect_response=False)
+        self.conn.execute(LED_ON(index), expect_response=False)
 
     def off(self, index: int) -> None:
         """Turns off the specified LED.
         Args:
             index (int): The index of the LED to turn off.
         """
-        self.conn.execute(f'LEDOff {int(index)}', expect_response=False)
+        self.conn.execute(LED_OFF(index), expect_response=False)
@@ -1,4 +1,5 @@
 """Module for interacting with the ambient light sensor."""
+from ..comm.commands import READ_LIGHT
 from ..comm.connection import Connection
 from .base import DeviceBase
 
@@ -18,4 +19,4 @@ class LightSensor(DeviceBase):
         Returns:
             int: The light sensor value.
         """
-        return int(self.conn.execute('ReadLight') or -1)
+        return int(self.conn.execute(READ_LIGHT()) or -1)
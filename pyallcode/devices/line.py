@@ -1,4 +1,5 @@
 """Module for interacting with the line sensors."""
+from ..comm.commands import READ_LINE
 from ..comm.connection import Connection
 from .base import DeviceBase
 
@@ -18,7 +19,7 @@ class LineSensors(DeviceBase):
         Returns:
             bool: True when the sensor reads line present (non-zero), False otherwise.
         """
-        value = self.conn.execute(f'ReadLine {index}')
+        value = self.conn.execute(READ_LINE(index))
         try:
             return bool(int(value))
         except Exception:
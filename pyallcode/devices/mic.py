@@ -1,4 +1,5 @@
 """Module for interacting with the microphone level sensor."""
+from ..comm.commands import READ_MIC
 from ..comm.connection import Connection
 from .base import DeviceBase
 
@@ -21,4 +22,4 @@ class Mic(DeviceBase):
         Returns:
             int: The microphone level (0-100) or -1 on error.
         """
-        return int(self.conn.execute('ReadMic') or -1)
+        return int(self.conn.execute(READ_MIC()) or -1)
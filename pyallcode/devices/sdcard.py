@@ -1,7 +1,99 @@
 """Module for interacting with the SD card device."""
+import io
+import os
+import zlib
+from typing import BinaryIO, Callable, Iterator, Optional, Union
+
+from ..comm.commands import (
+    CARD_BITMAP,
+    CARD_CREATE,
+    CARD_DELETE,
+    CARD_INIT,
+    CARD_OPEN,
+    CARD_PLAYBACK,
+    CARD_READ_BYTE,
+    CARD_RECORD_MIC,
+    CARD_WRITE_BYTE,
+)
+from ..comm.clock import clock_of
 from ..comm.connection import Connection
+from .audio import WavStream
 from .base import DeviceBase
 
+# Bytes, or a binary file (or path) to read from / write to
+Source = Union[bytes, bytearray, memoryview, BinaryIO, str]
+Progress = Callable[[int, Optional[int]], None]
+
+# Prebuilt CardWriteByte calls, indexed by byte value
+_WRITE_CALLS = [CARD_WRITE_BYTE(b) for b in range(256)]
+
+# Most bytes read from a file whose size is not given. A card that never
+# signals the end of a file would otherwise be read forever.
+MAX_FILE_SIZE = 8 * 1024 * 1024
+
+
+class SDTransferError(RuntimeError):
+    """Raised when a transfer fails or its checksum does not match."""
+
+
+class TransferStats:
+    """Outcome of ``SDCard.upload`` or ``SDCard.download``.
+
+    Attributes:
+        filename (str): The file on the SD card.
+        size (int): Bytes transferred.
+        seconds (float): Elapsed time on the connection's clock.
+        crc32 (int): CRC-32 of the transferred bytes (``zlib.crc32``).
+    """
+
+    __slots__ = ("filename", "size", "seconds", "crc32")
+
+    def __init__(self, filename: str, size: int, seconds: float, crc32: int) -> None:
+        self.filename = filename
+        self.size = size
+        self.seconds = seconds
+        self.crc32 = crc32
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Average throughput."""
+        return self.size / self.seconds if self.seconds > 0 else float("inf")
+
+    def __repr__(self) -> str:
+        return (f"TransferStats({self.filename!r}, size={self.size}, seconds={self.seconds:.3f}, "
+                f"crc32={self.crc32:#010x})")
+
+
+def _chunks(source: Source, size: int) -> Iterator[bytes]:
+    """Yields ``source`` in chunks of at most ``size`` bytes."""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from _chunks(f, size)
+        return
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source).cast("B")
+        for i in range(0, len(view), size):
+            yield view[i:i + size]
+        return
+    while True:
+        chunk = source.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ok(result: Optional[int]) -> bool:
+    """Whether a ``CardCreate``/``CardOpen`` reply reports success."""
+    return result is not None and result > 0
+
+
+def _length(source: Source) -> Optional[int]:
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source).nbytes
+    return None
+
 class SDCard(DeviceBase):
     """Represents the SD card interface on the robot.
     
@@ -17,7 +109,7 @@ class SDCard(DeviceBase):
 
     def init(self) -> int:
         """Initialize the SD card."""
-        return int(self.conn.execute('CardInit', True, 2) or -1)
+        return int(self.conn.execute(CARD_INIT(), True, 2) or -1)
 
     def create(self, filename: str) -> int:
         """Create a new file on the SD card.
@@ -28,7 +120,7 @@ class SDCard(DeviceBase):
             Returns:
                 int: The result of the create operation.
         """
-        return int(self.conn.execute(f'CardCreate {filename}', True, 2) or -1)
+        return int(self.conn.execute(CARD_CREATE(filename), True, 2) or -1)
 
     def open(self, filename: str) -> int:
         """Open a file on the SD card.
@@ -39,7 +131,7 @@ class SDCard(DeviceBase):
         Returns:
             int: The result of the open operation.
         """
-        return int(self.conn.execute(f'CardOpen {filename}', True, 2) or -1)
+        return int(self.conn.execute(CARD_OPEN(filename), True, 2) or -1)
 
     def delete(self, filename: str) -> int:
         """Delete a file on the SD card.
@@ -50,7 +142,7 @@ class SDCard(DeviceBase):
         Returns:
             int: The result of the delete operation.
         """
-        return int(self.conn.execute(f'CardDelete {filename}', True, 2) or -1)
+        return int(self.conn.execute(CARD_DELETE(filename), True, 2) or -1)
 
     def write_byte(self, data: int) -> None:
         """Write a byte to the SD card.
@@ -63,7 +155,7 @@ class SDCard(DeviceBase):
         """
         if not isinstance(data, int) or not (0 <= data <= 255):
             raise ValueError("write_byte expects 0..255")
-        self.conn.execute(f'CardWriteByte {data}', expect_response=False)
+        self.conn.execute(CARD_WRITE_BYTE(data), expect_response=False)
 
     def read_byte(self) -> int:
         """Read a byte from the SD card.
@@ -71,7 +163,7 @@ class SDCard(DeviceBase):
         Returns:
             int: The byte value read (0-255).
         """
-        return int(self.conn.execute('CardReadByte', True, 2) or -1)
+        return int(self.conn.execute(CARD_READ_BYTE(), True, 2) or -1)
 
     def record_mic(self, bitdepth: int, samplerate: int, seconds: int, filename: str, timeout: int | None = None) -> int:
         """Record audio from the microphone to a file on the SD card.
@@ -87,7 +179,8 @@ class SDCard(DeviceBase):
             int: The result of the record operation.
         """
         effective_timeout = seconds + 5 if timeout is None else timeout
-        return int(self.conn.execute(f'CardRecordMic {int(bitdepth)} {int(samplerate)} {int(seconds)} {filename}', True, effective_timeout) or -1)
+        return int(self.conn.execute(CARD_RECORD_MIC(bitdepth, samplerate, seconds, filename), True,
+                                     timeout=effective_timeout) or -1)
 
     def playback(self, filename: str, timeout: int = 50) -> int:
         """Play back an audio file from the SD card.
@@ -98,7 +191,7 @@ class SDCard(DeviceBase):
         Returns:
             int: The result of the playback operation.
         """
-        return int(self.conn.execute(f'CardPlayback {filename}', True, timeout) or -1)
+        return int(self.conn.execute(CARD_PLAYBACK(filename), True, timeout=timeout) or -1)
 
     def bitmap(self, x: int, y: int, filename: str) -> int:
         """Display a bitmap image on the LCD screen.
@@ -112,4 +205,319 @@ class SDCard(DeviceBase):
             int: The result of the bitmap operation.
         """
         safe_filename = '"' + str(filename).replace('"', '') + '"'
-        return int(self.conn.execute(f'CardBitmap {int(x)} {int(y)} {safe_filename}', True, 5) or -1)
+        return int(self.conn.execute(CARD_BITMAP(x, y, safe_filename), True, timeout=5) or -1)
+
+    # ----- bulk transfer -----
+    def _link(self) -> Connection:
+        # Bulk transfers need the connection itself, not a scheduler in front of it
+        return getattr(self.conn, "conn", self.conn)
+
+    def upload(self, source: Source, filename: str, chunk_size: int = 256,
+               progress: Optional[Progress] = None, verify: bool = False) -> TransferStats:
+        """Write a file to the SD card.
+
+        The bytes are sent as prebuilt ``CardWriteByte`` commands, ``chunk_size``
+        bytes per transport write, with no round trip per byte.
+
+        Args:
+            source (bytes | bytearray | memoryview | BinaryIO | str): The data,
+                an open binary file, or a local path.
+            filename (str): The name of the file to create on the card.
+            chunk_size (int): Bytes sent per transport write.
+            progress (Callable[[int, int | None], None] | None): Called with
+                ``(bytes_sent, total)`` after each chunk; total is None when
+                reading from a file object.
+            verify (bool): Read the file back and compare CRC-32 checksums.
+
+        Returns:
+            TransferStats: Size, elapsed time and checksum of the upload.
+
+        Raises:
+            SDTransferError: If ``verify`` finds different contents.
+        """
+        clock = clock_of(self._link())
+        total = _length(source)
+        start = clock.now()
+        crc = 0
+        sent = 0
+        with SDCardFile(self, filename, "w") as raw:
+            for chunk in _chunks(source, max(1, int(chunk_size))):
+                raw.write(chunk)
+                crc = zlib.crc32(chunk, crc)
+                sent += len(chunk)
+                if progress is not None:
+                    progress(sent, total)
+        stats = TransferStats(filename, sent, clock.now() - start, crc)
+        if verify:
+            check = self.download(filename, io.BytesIO(), size=sent)
+            if check.crc32 != crc or check.size != sent:
+                raise SDTransferError(f"{filename}: wrote {sent} bytes (crc {crc:#010x}), "
+                                      f"read back {check.size} (crc {check.crc32:#010x})")
+        return stats
+
+    def download(self, filename: str, dest: Union[BinaryIO, str],
+                 size: Optional[int] = None, window: int = 64,
+                 progress: Optional[Progress] = None,
+                 expected_crc32: Optional[int] = None,
+                 max_size: int = MAX_FILE_SIZE) -> TransferStats:
+        """Read a file from the SD card.
+
+        ``CardReadByte`` requests are pipelined, with up to ``window`` awaiting
+        replies, so the transfer is not limited by the round-trip time. The
+        window replaces the connection's ``max_in_flight`` for the transfer.
+
+        Args:
+            filename (str): The file on the card.
+            dest (BinaryIO | str): An open binary file or a local path to write to.
+            size (int | None): Bytes to read. When None, reading stops at the
+                first byte the card does not return (-1).
+            window (int): Number of read requests kept in flight.
+            progress (Callable[[int, int | None], None] | None): Called with
+                ``(bytes_received, size)`` after every ``window`` bytes.
+            expected_crc32 (int | None): Raise if the data's CRC-32 differs.
+            max_size (int): When ``size`` is None, give up after this many
+                bytes without reaching the end of the file.
+
+        Returns:
+            TransferStats: Size, elapsed time and checksum of the download.
+
+        Raises:
+            SDTransferError: If the file cannot be opened, a byte is missing
+                before ``size`` bytes were read, a read reply times out, the
+                file is longer than ``max_size``, or the checksum differs.
+        """
+        if isinstance(dest, str):
+            with open(dest, "wb") as f:
+                return self.download(filename, f, size, window, progress, expected_crc32, max_size)
+        clock = clock_of(self._link())
+        start = clock.now()
+        crc = 0
+        done = 0
+        block = bytearray(max(1, int(window)))
+        with SDCardFile(self, filename, "r", size, window, max_size) as raw:
+            while True:
+                n = raw.readinto(block)
+                if not n:
+                    break
+                chunk = bytes(block[:n])
+                crc = zlib.crc32(chunk, crc)
+                done += n
+                dest.write(chunk)
+                if progress is not None:
+                    progress(done, size)
+        if expected_crc32 is not None and crc != expected_crc32:
+            raise SDTransferError(f"{filename}: crc {crc:#010x}, expected {expected_crc32:#010x}")
+        return TransferStats(filename, done, clock.now() - start, crc)
+
+    def open_file(self, filename: str, mode: str = "rb", buffering: int = 512,
+                  size: Optional[int] = None, window: int = 64, max_size: int = MAX_FILE_SIZE):
+        """Open a file on the SD card as a Python binary file object.
+
+        Reads are pipelined ``CardReadByte`` requests, and writes are batched
+        ``CardWriteByte`` commands. ``buffering`` sets the read-ahead or
+        write-behind buffer, so standard library code (``shutil.copyfileobj``,
+        ``wave``) works on robot files efficiently. The firmware keeps one
+        file open at a time.
+
+        Args:
+            filename (str): The file on the card.
+            mode (str): ``'rb'`` to read or ``'wb'`` to create and write.
+            buffering (int): Buffer size in bytes; 0 returns the unbuffered
+                ``SDCardFile``.
+            size (int | None): File length, if known, for reads; otherwise
+                reading stops at the first byte the card does not return.
+            window (int): Read requests kept in flight.
+            max_size (int): When ``size`` is None, the longest file that can
+                be read before ``SDTransferError`` is raised.
+
+        Returns:
+            io.BufferedReader | io.BufferedWriter | SDCardFile: The open file.
+
+        Raises:
+            SDTransferError: If the file cannot be opened or created.
+        """
+        if mode not in ("r", "rb", "w", "wb"):
+            raise ValueError(f"unsupported mode {mode!r}; use 'rb' or 'wb'")
+        raw = SDCardFile(self, filename, mode[0], size, window, max_size)
+        if buffering == 0:
+            return raw
+        buffering = max(1, int(buffering))
+        return io.BufferedReader(raw, buffering) if raw.readable() else io.BufferedWriter(raw, buffering)
+
+    def stream_wav(self, filename: str, block_frames: int = 1024, chunk_size: int = 512,
+                   size: Optional[int] = None, **raw) -> WavStream:
+        """Stream a recording from the SD card as decoded blocks of samples.
+
+        The file is downloaded ``chunk_size`` bytes at a time as the blocks
+        are consumed, so only one chunk and one block are held in memory.
+
+            with bot.sd_card.stream_wav("REC.WAV") as stream:
+                for block in stream:
+                    ...
+
+        Args:
+            filename (str): The recording on the card.
+            block_frames (int): Frames per yielded block.
+            chunk_size (int): Bytes requested from the robot per burst.
+            size (int | None): File length, if known.
+            **raw: ``bitdepth``, ``samplerate`` and ``channels`` for a
+                headerless recording, e.g. the same ``BitDepth`` and
+                ``SampleRate`` passed to ``record_mic``; see ``WavStream``.
+
+        Returns:
+            WavStream: An iterable of blocks that closes the file when done.
+        """
+        f = self.open_file(filename, "rb", buffering=chunk_size, size=size)
+        try:
+            return WavStream(f, block_frames, **raw)
+        except Exception:
+            f.close()
+            raise
+
+    def download_bytes(self, filename: str, size: Optional[int] = None, window: int = 64,
+                       max_size: int = MAX_FILE_SIZE) -> bytes:
+        """Read a whole file from the SD card into memory; see ``download``."""
+        buf = io.BytesIO()
+        self.download(filename, buf, size, window, max_size=max_size)
+        return buf.getvalue()
+
+
+class SDCardFile(io.RawIOBase):
+    """Unbuffered binary file on the SD card; usually opened with ``SDCard.open_file``.
+
+    ``readinto`` fills the whole buffer with one pipelined burst of
+    ``CardReadByte`` requests, ``window`` of them in flight at a time.
+    ``write`` sends the bytes as one batched write of ``CardWriteByte``
+    commands. Seeking in a read file moves forward by reading, and moves back
+    by reopening the file. A -1 reply marks the end of the file; a reply that
+    never arrives raises ``SDTransferError`` rather than ending the file early.
+
+    Args:
+        card (SDCard): The SD card to use.
+        filename (str): The file on the card.
+        mode (str): ``'r'`` to read an existing file, ``'w'`` to create one.
+        size (int | None): Known file length for reads.
+        window (int): Read requests kept in flight; replaces the
+            connection's ``max_in_flight`` during each burst.
+        max_size (int): When ``size`` is None, reading more than this many
+            bytes raises ``SDTransferError``.
+
+    Raises:
+        SDTransferError: If the file cannot be opened or created.
+    """
+
+    def __init__(self, card: SDCard, filename: str, mode: str = "r", size: Optional[int] = None,
+                 window: int = 64, max_size: int = MAX_FILE_SIZE) -> None:
+        super().__init__()
+        if mode not in ("r", "w"):
+            raise ValueError("mode must be 'r' or 'w'")
+        self.card = card
+        self.name = filename
+        self.mode = mode + "b"
+        self.size = size
+        self.window = max(1, int(window))
+        self.max_size = int(max_size)
+        self._conn = card._link()
+        self._pos = 0
+        self._eof = False
+        if mode == "r":
+            self._reopen()
+        elif not _ok(self._conn.execute(CARD_CREATE(filename), True, 2)):
+            raise SDTransferError(f"{filename}: cannot create file on SD card")
+
+    def _reopen(self) -> None:
+        if not _ok(self._conn.execute(CARD_OPEN(self.name), True, 2)):
+            raise SDTransferError(f"{self.name}: cannot open file on SD card")
+        self._pos = 0
+        self._eof = False
+
+    def readable(self) -> bool:
+        return self.mode == "rb"
+
+    def writable(self) -> bool:
+        return self.mode == "wb"
+
+    def seekable(self) -> bool:
+        return self.mode == "rb"
+
+    def tell(self) -> int:
+        self._checkClosed()
+        return self._pos
+
+    def readinto(self, b) -> int:
+        self._checkClosed()
+        if not self.readable():
+            raise io.UnsupportedOperation("file not open for reading")
+        view = memoryview(b).cast("B")
+        n = len(view)
+        if self.size is not None:
+            n = min(n, self.size - self._pos)
+        else:
+            # One byte past max_size tells a file of exactly that length from a runaway read
+            n = min(n, self.max_size + 1 - self._pos)
+        if self._eof or n <= 0:
+            return 0
+        read = CARD_READ_BYTE()
+        conn = self._conn
+        got = 0
+        lost = None
+        with conn.pipeline_window(self.window):
+            pending = [conn.submit(read) for _ in range(n)]
+            for p in pending:
+                value = p.result()
+                if lost is not None:
+                    continue
+                if p.timed_out:
+                    # A lost reply is not the end of the file; drain the rest and fail
+                    lost = self._pos + got
+                    continue
+                if self._eof or value is None or not 0 <= value <= 255:
+                    # Past the end of the file; the remaining requests are drained
+                    self._eof = True
+                    continue
+                view[got] = value
+                got += 1
+        if lost is not None:
+            self._eof = True
+            raise SDTransferError(f"{self.name}: no reply reading byte {lost}; the link timed out")
+        self._pos += got
+        if self._eof and self.size is not None:
+            raise SDTransferError(f"{self.name}: read {self._pos} of {self.size} bytes")
+        if self.size is None and self._pos > self.max_size:
+            raise SDTransferError(f"{self.name}: no end of file within {self.max_size} bytes; "
+                                  "pass size or a larger max_size")
+        return got
+
+    def write(self, b) -> int:
+        self._checkClosed()
+        if not self.writable():
+            raise io.UnsupportedOperation("file not open for writing")
+        data = memoryview(b).cast("B")
+        calls = _WRITE_CALLS
+        self._conn.send_many([calls[v] for v in data])
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            if self.size is None:
+                raise io.UnsupportedOperation("seeking from the end needs the file size")
+            offset += self.size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"invalid whence {whence}")
+        if offset == self._pos:
+            return offset
+        if not self.seekable():
+            raise io.UnsupportedOperation("files being written cannot seek")
+        if offset < 0:
+            raise ValueError("negative seek position")
+        if offset < self._pos:
+            self._reopen()
+        skip = bytearray(512)
+        while self._pos < offset:
+            if not self.readinto(memoryview(skip)[:min(len(skip), offset - self._pos)]):
+                break
+        return self._pos
@@ -1,4 +1,11 @@
 """Module for interacting with the servo motors."""
+from ..comm.commands import (
+    SERVO_AUTO_MOVE,
+    SERVO_DISABLE,
+    SERVO_ENABLE,
+    SERVO_MOVE_SPEED,
+    SERVO_SET_POS,
+)
 from ..comm.connection import Connection
 from .base import DeviceBase
 
@@ -17,14 +24,14 @@ class Servos(DeviceBase):
         Args:
             index (int): The index of the servo motor to enable.
         """
-        self.conn.execute(f'ServoEnable {int(index)}', expect_response=False)
+        self.conn.execute(SERVO_ENABLE(index), expect_response=False)
 
     def disable(self, index: int) -> None:
         """Disable the specified servo motor.
         Args:
             index (int): The index of the servo motor to disable.
         """
-        self.conn.execute(f'ServoDisable {int(index)}', expect_response=False)
+        self.conn.execute(SERVO_DISABLE(index), expect_response=False)
 
     def set_pos(self, index: int, position: int) -> None:
         """Set the position of the specified servo motor.
@@ -32,7 +39,7 @@ class Servos(DeviceBase):
             index (int): The index of the servo motor to set.
             position (int): The position to set the servo motor to.
         """
-        self.conn.execute(f'ServoSetPos {int(index)} {int(position)}', expect_response=False)
+        self.conn.execute(SERVO_SET_POS(index, position), expect_response=False)
 
     def auto_move(self, index: int, position: int) -> None:
         """Move the specified servo motor to the desired position automatically.
@@ -40,11 +47,11 @@ class Servos(DeviceBase):
             index (int): The index of the servo motor to move.
             position (int): The position to move the servo motor to.
         """
-        self.conn.execute(f'ServoAutoMove {int(index)} {int(position)}', expect_response=False)
+        self.conn.execute(SERVO_AUTO_MOVE(index, position), expect_response=False)
 
     def move_speed(self, speed: int) -> None:
         """Set the speed of the specified servo motor.
         Args:
             speed (int): The speed to set the servo motor to.
         """
-        self.conn.execute(f'ServoMoveSpeed {int(speed)}', expect_response=False)
+        self.conn.execute(SERVO_MOVE_SPEED(speed), expect_response=False)
@@ -1,5 +1,6 @@
 """"Speaker device module."""
-import time
+from ..comm.clock import clock_of
+from ..comm.commands import PLAY_NOTE
 from ..comm.connection import Connection
 from .base import DeviceBase
 
@@ -19,5 +20,5 @@ class Speaker(DeviceBase):
             note (int): The note to play.
             length_ms (int): The duration of the note in milliseconds.
         """
-        self.conn.execute(f'PlayNote {int(note)} {int(length_ms)}', expect_response=False)
-        time.sleep(max(0, length_ms) / 1000.0)
+        self.conn.execute(PLAY_NOTE(note, length_ms), expect_response=False)
+        clock_of(self.conn).sleep(max(0, length_ms) / 1000.0)
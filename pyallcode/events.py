@@ -0,0 +1,295 @@
+"""Change events for buttons, line sensors and IR thresholds.
+
+An ``EventMonitor`` polls only the channels that currently have subscribers.
+Each tick is one pipelined burst through ``Connection.execute_many``, with
+every command sent once however many subscriptions share it. Edge detection
+and debouncing happen on the host, and callbacks run only when a channel's
+debounced state changes. A monitor with no subscriptions sends nothing.
+
+    monitor = EventMonitor(bot.conn, rate_hz=20)
+    monitor.on_button(Button.LEFT, lambda e: print("left", e.state))
+    monitor.on_ir(IRSensor.FRONT, 1500, lambda e: bot.set_motors(0, 0))
+    monitor.start()
+
+Like ``Sampler``, the monitor runs on a background thread, or as a timer
+when the connection has a ``VirtualClock``. Callbacks run on that thread.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .comm.clock import clock_of
+from .comm.commands import READ_IR, READ_LINE, READ_SWITCH
+
+# Maps a raw reading and the current state (None before the first reading)
+# to the new state.
+Classifier = Callable[[int, object], object]
+
+
+class Event:
+    """A debounced state change.
+
+    Attributes:
+        name (str): The subscription's name, e.g. ``'button 0'``.
+        state: The new state.
+        previous: The state before the change.
+        value (int): The raw reading that confirmed the change.
+        timestamp (float): Clock time of that reading.
+    """
+
+    __slots__ = ("name", "state", "previous", "value", "timestamp")
+
+    def __init__(self, name: str, state, previous, value: int, timestamp: float) -> None:
+        self.name = name
+        self.state = state
+        self.previous = previous
+        self.value = value
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        return f"Event({self.name!r}, {self.previous!r} -> {self.state!r}, value={self.value})"
+
+
+class Subscription:
+    """A callback attached to one read command; returned by ``EventMonitor.subscribe``.
+
+    Attributes:
+        name (str): Label copied into each ``Event``.
+        command (str): The read command polled for this subscription.
+        state: The current debounced state; None until the first reading.
+    """
+
+    __slots__ = ("name", "command", "classify", "callback", "debounce", "state",
+                 "_candidate", "_since", "_monitor")
+
+    def __init__(self, monitor: "EventMonitor", name: str, command: str, classify: Classifier,
+                 callback: Callable[[Event], None], debounce: float) -> None:
+        self.name = name
+        self.command = command
+        self.classify = classify
+        self.callback = callback
+        self.debounce = max(0.0, float(debounce))
+        self.state = None
+        self._candidate = None
+        self._since = 0.0
+        self._monitor: Optional[EventMonitor] = monitor
+
+    @property
+    def active(self) -> bool:
+        """False once cancelled."""
+        return self._monitor is not None
+
+    def cancel(self) -> None:
+        """Stops delivering events; the command is no longer polled for this subscription."""
+        monitor, self._monitor = self._monitor, None
+        if monitor is not None:
+            monitor._remove(self)
+
+    def _feed(self, value: int, t: float) -> Optional[Event]:
+        new = self.classify(value, self.state)
+        if self.state is None:
+            # First reading sets the baseline without an event
+            self.state = new
+            return None
+        if new == self.state:
+            self._candidate = None
+            return None
+        if new != self._candidate:
+            self._candidate = new
+            self._since = t
+        if t - self._since < self.debounce:
+            return None
+        previous, self.state, self._candidate = self.state, new, None
+        return Event(self.name, new, previous, value, t)
+
+
+def _truthy(value: int, state) -> bool:
+    return value != 0
+
+
+def threshold(level: int, hysteresis: int = 0) -> Classifier:
+    """Returns a classifier that is True at or above ``level``.
+
+    Once True it stays True until the reading drops below ``level -
+    hysteresis``, so a reading hovering at the threshold does not chatter.
+    """
+    def classify(value: int, state) -> bool:
+        if state:
+            return value >= level - hysteresis
+        return value >= level
+    return classify
+
+
+class EventMonitor:
+    """Polls subscribed channels at a fixed rate and delivers change events.
+
+    Args:
+        conn (Connection): The connection to read through.
+        rate_hz (float): Polling rate while any subscription is active.
+        clock (SystemClock | VirtualClock | None): Time source for pacing,
+            debouncing and timestamps; the connection's clock when None.
+
+    Attributes:
+        polls (int): Bursts sent so far.
+        error (BaseException | None): The exception that stopped the monitor, if any.
+    """
+
+    def __init__(self, conn, rate_hz: float = 20.0, clock=None) -> None:
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        self.conn = conn
+        self.period = 1.0 / float(rate_hz)
+        self.clock = clock if clock is not None else clock_of(conn)
+        self.polls = 0
+        self.error: Optional[BaseException] = None
+        self._subs: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._timer: Optional[int] = None
+
+    def __enter__(self) -> "EventMonitor":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ----- subscriptions -----
+    def subscribe(self, command: str, callback: Callable[[Event], None],
+                  classify: Optional[Classifier] = None, debounce: float = 0.0,
+                  name: Optional[str] = None) -> Subscription:
+        """Calls ``callback`` whenever the classified reading of ``command`` changes.
+
+        Args:
+            command (str): A read command, e.g. ``READ_IR(2)``.
+            callback (Callable[[Event], None]): Receives each change.
+            classify (Classifier | None): Maps ``(value, state)`` to a state;
+                non-zero is True by default.
+            debounce (float): Seconds a new state must persist before it is reported.
+            name (str | None): Label for events; the command text by default.
+
+        Returns:
+            Subscription: Call ``cancel()`` to unsubscribe.
+        """
+        sub = Subscription(self, name or str(command), command, classify or _truthy, callback, debounce)
+        with self._lock:
+            self._subs.append(sub)
+        return sub
+
+    def on_button(self, index: int, callback: Callable[[Event], None],
+                  debounce: float = 0.02) -> Subscription:
+        """Reports presses (state True) and releases of push button ``index``."""
+        return self.subscribe(READ_SWITCH(index), callback, debounce=debounce, name=f"button {int(index)}")
+
+    def on_line(self, index: int, callback: Callable[[Event], None],
+                debounce: float = 0.0) -> Subscription:
+        """Reports line sensor ``index`` finding (True) or losing the line."""
+        return self.subscribe(READ_LINE(index), callback, debounce=debounce, name=f"line {int(index)}")
+
+    def on_ir(self, index: int, level: int, callback: Callable[[Event], None],
+              hysteresis: int = 50, debounce: float = 0.0) -> Subscription:
+        """Reports IR sensor ``index`` crossing ``level`` (True means an obstacle is near).
+
+        Args:
+            index (int): The IR sensor index.
+            level (int): Reading at which the state becomes True.
+            callback (Callable[[Event], None]): Receives each change.
+            hysteresis (int): How far below ``level`` the reading must fall to become False again.
+            debounce (float): Seconds a new state must persist before it is reported.
+        """
+        return self.subscribe(READ_IR(index), callback, threshold(level, hysteresis), debounce,
+                              name=f"ir {int(index)}")
+
+    @property
+    def subscriptions(self) -> List[Subscription]:
+        """The active subscriptions."""
+        with self._lock:
+            return list(self._subs)
+
+    def _remove(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+    # ----- polling -----
+    @property
+    def running(self) -> bool:
+        """True while polling (on a thread, or as a virtual clock timer)."""
+        if self._timer is not None:
+            return True
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start polling in the background."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.error = None
+        if getattr(self.clock, "virtual", False):
+            self._timer = self.clock.call_every(self.period, self._tick)
+            return
+        self._thread = threading.Thread(target=self._run, name="pyallcode-events", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling and wait for the thread to exit."""
+        self._stop.set()
+        if self._timer is not None:
+            self.clock.cancel(self._timer)
+            self._timer = None
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+
+    def poll(self) -> List[Event]:
+        """Reads every subscribed channel once and dispatches the resulting events.
+
+        Returns:
+            list[Event]: The events delivered by this poll.
+        """
+        with self._lock:
+            subs = list(self._subs)
+        if not subs:
+            return []
+        # One read per distinct command, however many subscribers share it
+        index: Dict[str, int] = {}
+        for sub in subs:
+            index.setdefault(sub.command, len(index))
+        t = self.clock.now()
+        values = self.conn.execute_many(list(index))
+        self.polls += 1
+        events = []
+        for sub in subs:
+            value = values[index[sub.command]]
+            if value is None or value == -1 or not sub.active:
+                continue
+            event = sub._feed(value, t)
+            if event is not None:
+                events.append(event)
+                sub.callback(event)
+        return events
+
+    def _tick(self) -> None:
+        try:
+            self.poll()
+        except Exception as e:
+            self.error = e
+            self.stop()
+
+    def _run(self) -> None:
+        now = self.clock.now
+        period = self.period
+        next_tick = now()
+        try:
+            while not self._stop.is_set():
+                self.poll()
+                next_tick += period
+                delay = next_tick - now()
+                if delay < 0:
+                    next_tick = now()
+                elif self.clock.wait(self._stop, delay):
+                    break
+        except Exception as e:
+            self.error = e
@@ -6,7 +6,19 @@ It also provides static methods for discovering available serial ports and ident
 ports associated with the AllCode robot.
 """
 from .comm.transport import SerialTransport, SimulatedTransport, transport_mode_from_env
-from .comm.connection import Connection
+from .comm.commands import (
+    BACKWARDS,
+    FORWARDS,
+    GET_API_VERSION,
+    GET_BATTERY_VOLTAGE,
+    LEFT,
+    RIGHT,
+    SET_MOTORS,
+    move_timeout,
+)
+from .comm.connection import Connection, PendingReply
+from .comm.pool import default_pool
+from .comm.scheduler import CommandScheduler, Priority
 from .comm.ports import (
     list_available_ports,
     list_ports_detailed,
@@ -24,6 +36,7 @@ from .devices.mic import Mic
 from .devices.sdcard import SDCard
 from .devices.servos import Servos
 from .devices.speaker import Speaker
+from .snapshot import Snapshot, take_snapshot
 
 class Robot:
     """Represents the AllCode robot and provides methods to control it.
@@ -68,6 +81,7 @@ class Robot:
             # Default to real serial; fallback to simulated happens in open/autoconnect if needed
             self.transport = SerialTransport()
         self.conn = Connection(self.transport, verbose=verbose)
+        self._shared = False
         self.mm_per_sec = max(1, mm_per_sec)
         self.deg_per_sec = max(1, deg_per_sec)
         self.accelerometer = Accelerometer(self.conn)
@@ -81,6 +95,9 @@ class Robot:
         self.sd_card = SDCard(self.conn)
         self.servo = Servos(self.conn)
         self.speaker = Speaker(self.conn)
+        # Where commands are sent: the connection, or a scheduler once started
+        self._commands = self.conn
+        self.scheduler = None
         if autoconn:
             if forced_mode == "simulated":
                 # Open a friendly simulated connection immediately
@@ -92,24 +109,32 @@ class Robot:
 
     def open(self, port: str | int) -> None:
         """Open connection to the robot on the specified port.
+
+        The connection comes from the shared pool, so the robot and any
+        standalone devices on the same port use one open transport. If the
+        port cannot be opened, a simulated robot is used instead.
+
         Args:
             port (str | int): The port name or index to open.
         """
-        try:
-            self.conn.open(port)
-        except Exception as e:
-            # Fallback to simulated when we cannot open a real serial device
-            self.transport = SimulatedTransport()
-            self.conn.transport = self.transport
-            # Use a friendly pseudo-port label so user code can see something meaningful
-            label = str(port) if isinstance(port, str) else f"SIMULATED-{port}"
-            self.transport.open(label)
-            if self.conn.verbose:
-                print(f"[SimulatedRobot] Falling back to simulated transport: {e}")
+        priorities = self.scheduler.priorities if self.scheduler is not None else None
+        self.stop_scheduler()
+        if not self._unshare():
+            self.conn.close()
+        self._attach(default_pool.acquire(port, verbose=self.conn.verbose))
+        self._shared = True
+        if priorities is not None:
+            self.start_scheduler(priorities)
 
     def close(self) -> None:
-        """Close the connection to the robot."""
-        self.conn.close()
+        """Close the connection to the robot.
+
+        If standalone devices share the connection it stays open until they
+        are closed too.
+        """
+        self.stop_scheduler()
+        if not self._unshare():
+            self.conn.close()
 
     def autoconnect(self,
                     prefer_keywords: list[str] | None = None,
@@ -145,6 +170,66 @@ class Robot:
             print("[SimulatedRobot] No serial hardware detected; using simulated transport")
         return simulated_port
 
+    def _attach(self, conn: Connection) -> None:
+        """Use ``conn`` for the robot and all its subsystems."""
+        self.conn = conn
+        self.transport = conn.transport
+        self._route_commands(conn)
+
+    def _unshare(self) -> bool:
+        """Release the pool reference taken by ``open``; True if one was held."""
+        if not self._shared:
+            return False
+        self._shared = False
+        return default_pool.release(self.conn)
+
+    def start_scheduler(self, priorities: dict[str, Priority] | None = None) -> CommandScheduler:
+        """Route all commands through a priority scheduler.
+
+        Use this when several threads share the robot: commands from the
+        robot and its subsystems, including ``snapshot`` bursts, are queued to
+        a single writer thread, with ``SetMotors`` ahead of ordinary commands
+        and LCD/LED drawing last.
+
+        Two kinds of traffic still go straight to the connection, holding its
+        lock between scheduled commands rather than queueing:
+
+        - ``start_forwards`` and the other non-blocking moves, which would
+          otherwise hold the writer thread until the move finishes.
+        - SD card file transfers (``upload``, ``download``, ``open_file``),
+          whose pipelined bursts run for many round trips.
+
+        Args:
+            priorities (dict[str, Priority] | None): Per-command-head overrides
+                of the default scheduling classes.
+
+        Returns:
+            CommandScheduler: The running scheduler (also ``self.scheduler``).
+        """
+        if self.scheduler is None:
+            self.scheduler = CommandScheduler(self.conn, priorities)
+            self._route_commands(self.scheduler)
+        return self.scheduler
+
+    def stop_scheduler(self) -> None:
+        """Finish queued commands and send directly on the connection again."""
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+            self.scheduler = None
+            self._route_commands(self.conn)
+
+    def _route_commands(self, target) -> None:
+        self._commands = target
+        for device in (self.accelerometer, self.push_buttons, self.ir_sensors, self.lcd,
+                       self.leds, self.light_sensor, self.line_sensors, self.mic,
+                       self.sd_card, self.servo, self.speaker):
+            device.conn = target
+
+    @property
+    def clock(self):
+        """The connection's clock; ``clock.now()`` reports simulated time in virtual-time mode."""
+        return self.conn.clock
+
     def set_verbose(self, value: int) -> None:
         """Set the verbosity level of the connection.
         
@@ -161,14 +246,14 @@ class Robot:
         Returns:
             int: The API version number.
         """
-        return int(self.conn.execute('GetAPIVersion', True, 1) or -1)
+        return int(self._commands.execute(GET_API_VERSION(), True, 1) or -1)
     def get_battery_voltage(self) -> int:
         """Get the battery voltage in millivolts.
 
         Returns:
             int: The battery voltage in millivolts.
         """
-        return int(self.conn.execute('GetBatteryVoltage', True, 1) or -1)
+        return int(self._commands.execute(GET_BATTERY_VOLTAGE(), True, 1) or -1)
     
     def set_motors(self, left: int, right: int) -> None:
         """Set the left and right motor speeds.
@@ -177,7 +262,7 @@ class Robot:
             left (int): Speed for the left motor (-255 to 255).
             right (int): Speed for the right motor (-255 to 255).
         """
-        self.conn.execute(f'SetMotors {int(left)} {int(right)}', expect_response=False)
+        self._commands.execute(SET_MOTORS(left, right), expect_response=False)
 
     def forwards(self, distance_mm: int) -> int:
         """Move the robot forwards by the specified distance in millimeters.
@@ -185,33 +270,83 @@ class Robot:
         Args:
             distance_mm (int): Distance to move forwards in millimeters.
         """
-        timeout = max(1, abs(int(distance_mm / self.mm_per_sec)))
-        return int(self.conn.execute(f'Forwards {int(distance_mm)}', True, timeout) or -1)
+        timeout = move_timeout(distance_mm, self.mm_per_sec)
+        return int(self._commands.execute(FORWARDS(distance_mm), True, timeout=timeout) or -1)
 
     def backwards(self, distance_mm: int) -> int:
         """Move the robot backwards by the specified distance in millimeters.
         Args:
             distance_mm (int): Distance to move backwards in millimeters.
         """
-        timeout = max(1, abs(int(distance_mm / self.mm_per_sec)))
-        return int(self.conn.execute(f'Backwards {int(distance_mm)}', True, timeout) or -1)
+        timeout = move_timeout(distance_mm, self.mm_per_sec)
+        return int(self._commands.execute(BACKWARDS(distance_mm), True, timeout=timeout) or -1)
 
     def left(self, angle_deg: int) -> int:
         """Turn the robot left by the specified angle in degrees.
         Args:
             angle_deg (int): Angle to turn left in degrees.
         """
-        timeout = max(1, abs(int(angle_deg / self.deg_per_sec)))
-        return int(self.conn.execute(f'Left {int(angle_deg)}', True, timeout) or -1)
+        timeout = move_timeout(angle_deg, self.deg_per_sec)
+        return int(self._commands.execute(LEFT(angle_deg), True, timeout=timeout) or -1)
 
     def right(self, angle_deg: int) -> int:
         """Turn the robot right by the specified angle in degrees.
         Args:
             angle_deg (int): Angle to turn right in degrees.
         """
-        timeout = max(1, abs(int(angle_deg / self.deg_per_sec)))
-        return int(self.conn.execute(f'Right {int(angle_deg)}', True, timeout) or -1)
+        timeout = move_timeout(angle_deg, self.deg_per_sec)
+        return int(self._commands.execute(RIGHT(angle_deg), True, timeout=timeout) or -1)
+
+    # ----- non-blocking movement -----
+    def start_forwards(self, distance_mm: int) -> PendingReply:
+        """Start moving forwards and return without waiting for the move to end.
+
+        Commands issued while the move is in progress (sensor reads, LCD
+        updates) are queued behind it on the connection and every reply goes
+        to the command that asked for it. The firmware runs commands one at a
+        time, so on a real robot those replies arrive once the move is done.
+
+        Args:
+            distance_mm (int): Distance to move forwards in millimeters.
+
+        Returns:
+            PendingReply: Resolves to the firmware's completion reply;
+            ``poll()`` checks it without blocking, ``result()`` waits.
+        """
+        return self._start_move(FORWARDS(distance_mm), move_timeout(distance_mm, self.mm_per_sec))
+
+    def start_backwards(self, distance_mm: int) -> PendingReply:
+        """Start moving backwards; see ``start_forwards``."""
+        return self._start_move(BACKWARDS(distance_mm), move_timeout(distance_mm, self.mm_per_sec))
+
+    def start_left(self, angle_deg: int) -> PendingReply:
+        """Start turning left; see ``start_forwards``."""
+        return self._start_move(LEFT(angle_deg), move_timeout(angle_deg, self.deg_per_sec))
+
+    def start_right(self, angle_deg: int) -> PendingReply:
+        """Start turning right; see ``start_forwards``."""
+        return self._start_move(RIGHT(angle_deg), move_timeout(angle_deg, self.deg_per_sec))
+
+    def _start_move(self, command: str, timeout: float) -> PendingReply:
+        # Always on the connection: a scheduled move would hold the writer thread
+        return self.conn.submit(command, True, timeout=timeout)
     
+    # ----- batched sensor reads -----
+    def snapshot(self, sensors: list[str] | None = None) -> Snapshot:
+        """Read several sensors in one pipelined burst.
+
+        All underlying read commands are written back-to-back and their replies
+        matched in order, so a full sweep costs about one round trip.
+
+        Args:
+            sensors (list[str] | None): Sensor groups to read, any of
+                'ir', 'line', 'light', 'mic', 'accel', 'buttons'. Reads all when None.
+
+        Returns:
+            Snapshot: The timestamped readings; unrequested groups are None.
+        """
+        return take_snapshot(self._commands, sensors)
+
     # Convenience passthroughs for discovery utilities
     list_available_ports = staticmethod(list_available_ports)
     list_ports_detailed = staticmethod(list_ports_detailed)
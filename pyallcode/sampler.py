@@ -0,0 +1,254 @@
+"""High-rate background sampling of sensor channels into ring buffers.
+
+A ``Sampler`` polls a fixed set of read commands (e.g. ``ReadAxis 0``,
+``ReadMic``, ``ReadIR 2``) at a target rate on a background thread. Each tick
+is one pipelined burst through ``Connection.execute_many`` and is stored with
+its timestamp in a preallocated ``RingBuffer``.
+
+Timestamps come from the connection's clock. With a ``VirtualClock`` no
+thread is started: sampling runs as a clock timer, so samples are taken at
+exact simulated times as the clock is advanced.
+
+NumPy is used for the buffers when installed; otherwise the standard library
+``array`` module is used. Either way no per-sample objects are kept.
+"""
+from __future__ import annotations
+
+import threading
+from array import array
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+try:  # NumPy is optional; fall back to array-backed buffers without it
+    import numpy as _np  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    _np = None
+
+from .comm.clock import clock_of
+from .comm.commands import READ_AXIS, READ_IR, READ_LIGHT, READ_LINE, READ_MIC
+
+# Friendly channel names accepted by Sampler in addition to raw commands.
+CHANNELS = {
+    "accel_x": READ_AXIS(0),
+    "accel_y": READ_AXIS(1),
+    "accel_z": READ_AXIS(2),
+    "mic": READ_MIC(),
+    "light": READ_LIGHT(),
+    "line_left": READ_LINE(0),
+    "line_right": READ_LINE(1),
+    **{f"ir{i}": READ_IR(i) for i in range(8)},
+}
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of timestamped multi-channel integer samples.
+
+    Every sample is written twice, at ``k % capacity`` and ``k % capacity +
+    capacity``, so the most recent ``n`` samples are always contiguous and
+    ``window`` can return views without copying.
+
+    Args:
+        capacity (int): Number of samples kept.
+        channels (int): Values per sample.
+    """
+
+    def __init__(self, capacity: int, channels: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self.channels = max(1, int(channels))
+        self.total = 0
+        size = 2 * self.capacity
+        if _np is not None:
+            self._times = _np.zeros(size, dtype=_np.float64)
+            self._values = _np.zeros((size, self.channels), dtype=_np.int32)
+        else:
+            self._times = array("d", bytes(8 * size))
+            self._values = array("i", [0]) * (size * self.channels)
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, timestamp: float, values: Sequence[int]) -> None:
+        """Store one sample; the oldest sample is overwritten when full."""
+        cap = self.capacity
+        i = self.total % cap
+        j = i + cap
+        self._times[i] = self._times[j] = timestamp
+        if _np is not None:
+            self._values[i] = self._values[j] = values
+        else:
+            n = self.channels
+            self._values[i * n:(i + 1) * n] = self._values[j * n:(j + 1) * n] = array("i", values)
+        self.total += 1
+
+    def window(self, n: Optional[int] = None):
+        """Return ``(timestamps, values)`` for the latest ``n`` samples, oldest first.
+
+        The result is a view into the buffer, not a copy, and is overwritten
+        as new samples arrive. With NumPy, ``values`` has shape ``(n, channels)``;
+        otherwise both are ``memoryview`` objects and ``values`` is flat, row-major.
+
+        Args:
+            n (int | None): Number of samples; all available when None.
+        """
+        count = len(self) if n is None else max(0, min(int(n), len(self)))
+        start = (self.total - count) % self.capacity
+        if _np is not None:
+            return self._times[start:start + count], self._values[start:start + count]
+        ch = self.channels
+        return (memoryview(self._times)[start:start + count],
+                memoryview(self._values)[start * ch:(start + count) * ch])
+
+    def sample(self, k: int) -> Tuple[float, Tuple[int, ...]]:
+        """Return sample number ``k`` (counting from the first ever appended).
+
+        Raises:
+            IndexError: If ``k`` has been overwritten or not yet written.
+        """
+        if not (self.total - len(self) <= k < self.total):
+            raise IndexError("sample no longer (or not yet) in buffer")
+        i = k % self.capacity
+        if _np is not None:
+            return float(self._times[i]), tuple(int(v) for v in self._values[i])
+        ch = self.channels
+        return self._times[i], tuple(self._values[i * ch:(i + 1) * ch])
+
+
+class Sampler:
+    """Polls sensor channels at a fixed rate on a background thread.
+
+    Args:
+        conn (Connection): The connection to read through.
+        channels (Sequence[str]): Channel names from ``CHANNELS`` or raw read
+            commands such as ``'ReadIR 3'``.
+        rate_hz (float): Target sampling rate.
+        capacity (int): Number of samples kept in ``buffer``.
+        clock (SystemClock | VirtualClock | None): Time source for timestamps
+            and pacing; the connection's clock when None.
+
+    Attributes:
+        buffer (RingBuffer): The samples, one column per channel.
+        overruns (int): Ticks where a burst took longer than the sample period.
+    """
+
+    def __init__(self, conn, channels: Sequence[str], rate_hz: float = 100.0,
+                 capacity: int = 4096, clock=None) -> None:
+        if not channels:
+            raise ValueError("Sampler needs at least one channel")
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        self.conn = conn
+        self.channels: Tuple[str, ...] = tuple(channels)
+        self.commands: List[str] = [CHANNELS.get(c, c) for c in self.channels]
+        self.period = 1.0 / float(rate_hz)
+        self.clock = clock if clock is not None else clock_of(conn)
+        self.buffer = RingBuffer(capacity, len(self.commands))
+        self.overruns = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._timer: Optional[int] = None
+        self.error: Optional[BaseException] = None
+
+    def __enter__(self) -> "Sampler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        """True while sampling (on a thread, or as a virtual clock timer)."""
+        if self._timer is not None:
+            return True
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start sampling in the background."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.error = None
+        if getattr(self.clock, "virtual", False):
+            self._timer = self.clock.call_every(self.period, self._tick)
+            return
+        self._thread = threading.Thread(target=self._run, name="pyallcode-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the thread to exit."""
+        self._stop.set()
+        if self._timer is not None:
+            self.clock.cancel(self._timer)
+            self._timer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def window(self, n: Optional[int] = None):
+        """Zero-copy view of the latest ``n`` samples; see ``RingBuffer.window``."""
+        return self.buffer.window(n)
+
+    def stream(self, timeout: Optional[float] = None) -> Iterator[Tuple[float, Tuple[int, ...]]]:
+        """Yield ``(timestamp, values)`` for each new sample as it arrives.
+
+        Ends when the sampler stops or no sample arrives within ``timeout``.
+        With a virtual clock it ends once the buffered samples are consumed,
+        since no new samples arrive until the clock is advanced. A consumer
+        that falls more than ``capacity`` samples behind skips ahead to the
+        oldest sample still buffered.
+        """
+        buf = self.buffer
+        cursor = buf.total
+        while True:
+            with self._cond:
+                if buf.total <= cursor:
+                    if not self.running or self._timer is not None:
+                        return
+                    self._cond.wait(timeout)
+                    if buf.total <= cursor:
+                        if timeout is not None or not self.running:
+                            return
+                        continue
+                cursor = max(cursor, buf.total - len(buf))
+                item = buf.sample(cursor)
+            cursor += 1
+            yield item
+
+    __iter__ = stream
+
+    def _sample(self) -> None:
+        t = self.clock.now()
+        values = self.conn.execute_many(self.commands)
+        with self._cond:
+            self.buffer.append(t, [-1 if v is None else v for v in values])
+            self._cond.notify_all()
+
+    def _tick(self) -> None:
+        try:
+            self._sample()
+        except Exception as e:
+            self.error = e
+            self.stop()
+
+    def _run(self) -> None:
+        now = self.clock.now
+        period = self.period
+        next_tick = now()
+        try:
+            while not self._stop.is_set():
+                self._sample()
+                next_tick += period
+                delay = next_tick - now()
+                if delay < 0:
+                    # Fell behind: count it and re-anchor instead of bursting
+                    self.overruns += 1
+                    next_tick = now()
+                elif self.clock.wait(self._stop, delay):
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self._cond.notify_all()
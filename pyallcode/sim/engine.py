@@ -0,0 +1,319 @@
+"""Deterministic physics model of a single AllCode robot.
+
+``SimRobot`` tracks the robot's pose in a ``World`` and answers firmware
+commands from it: ``SetMotors``/``Forwards``/``Left``... move the robot,
+and ``ReadIR``/``ReadLine``/``ReadLight``... are computed from the pose.
+Simulated time only advances as commands are handled (or ``step`` is
+called), so simulations run as fast as Python allows. All noise comes from a
+private, seedable ``random.Random``.
+
+Given a ``VirtualClock`` the robot shares its timeline: time that passes on
+the clock (e.g. ``clock.sleep``) moves the robot under its current motor
+speeds when the next command arrives (or ``sync`` is called), and the time
+commands take is added to the clock.
+"""
+from __future__ import annotations
+
+import math
+import random
+from typing import Callable, Dict, List, Optional
+
+from .world import World
+
+# IR sensor bearing relative to the robot's heading, indexed like IRSensor.
+IR_BEARINGS = (90.0, 45.0, 0.0, -45.0, -90.0, -135.0, 180.0, 135.0)
+
+# Commands the firmware does not reply to.
+NO_REPLY = frozenset({
+    "SetMotors", "LEDWrite", "LEDOn", "LEDOff",
+    "LCDClear", "LCDPrint", "LCDNumber", "LCDPixel", "LCDLine", "LCDRect",
+    "LCDBacklight", "LCDOptions", "LCDVerbose",
+    "ServoEnable", "ServoDisable", "ServoSetPos", "ServoAutoMove", "ServoMoveSpeed",
+    "PlayNote", "CardWriteByte",
+})
+
+# SD card commands that act on files; see SimCard.
+CARD_FILE_HEADS = frozenset({"CardCreate", "CardOpen", "CardDelete", "CardWriteByte", "CardReadByte"})
+
+
+class SimRobot:
+    """Pose, motors and sensors of one simulated robot.
+
+    Args:
+        world (World | None): The arena; an empty 2 m square when None.
+        x, y (float): Start position in mm.
+        heading (float): Start heading in degrees, counter-clockwise from +x.
+        seed (int | None): Seed for sensor noise.
+        mm_per_sec (float): Speed used by ``Forwards``/``Backwards``.
+        deg_per_sec (float): Turn rate used by ``Left``/``Right``.
+        mm_per_unit (float): Wheel speed in mm/s per ``SetMotors`` unit.
+        wheelbase (float): Distance between the wheels in mm.
+        radius (float): Body radius in mm, used for collisions and sensor placement.
+        ir_range (float): Distance in mm beyond which IR reads background only.
+        sensor_noise (float): Standard deviation of analogue sensor noise in counts.
+        command_time (float): Simulated seconds each handled command takes.
+        clock (VirtualClock | None): Shared simulated clock.
+    """
+
+    def __init__(self, world: Optional[World] = None, x: float = 1000.0, y: float = 1000.0,
+                 heading: float = 90.0, seed: Optional[int] = None,
+                 mm_per_sec: float = 50.0, deg_per_sec: float = 45.0,
+                 mm_per_unit: float = 2.0, wheelbase: float = 95.0, radius: float = 65.0,
+                 ir_range: float = 250.0, sensor_noise: float = 8.0,
+                 command_time: float = 0.005, clock=None) -> None:
+        self.world = world if world is not None else World()
+        self.x = float(x)
+        self.y = float(y)
+        self.heading = float(heading)
+        self.rng = random.Random(seed)
+        self.mm_per_sec = float(mm_per_sec)
+        self.deg_per_sec = float(deg_per_sec)
+        self.mm_per_unit = float(mm_per_unit)
+        self.wheelbase = float(wheelbase)
+        self.radius = float(radius)
+        self.ir_range = float(ir_range)
+        self.sensor_noise = float(sensor_noise)
+        self.command_time = float(command_time)
+        self.left_speed = 0.0
+        self.right_speed = 0.0
+        self.clock = clock
+        self.time = clock.now() if clock is not None else 0.0
+        self.odometer = 0.0
+        self.collisions = 0
+        self.battery_mv = 4800
+        self.buttons: List[int] = [0, 0]
+        self.leds = 0
+        self.servos: Dict[int, int] = {}
+        self.card = SimCard(lambda: self.rng.randint(0, 255))
+
+    # ----- kinematics -----
+    def step(self, dt: float) -> None:
+        """Advance simulated time by ``dt`` seconds with the current motor speeds."""
+        if dt <= 0:
+            return
+        self.time += dt
+        vl = self.left_speed * self.mm_per_unit
+        vr = self.right_speed * self.mm_per_unit
+        if vl == 0.0 and vr == 0.0:
+            return
+        # Integrate in short sub-steps so arcs and collisions stay accurate
+        n = max(1, int(math.ceil(dt / 0.01)))
+        h = dt / n
+        v = (vl + vr) / 2.0
+        w = math.degrees((vr - vl) / self.wheelbase)
+        for _ in range(n):
+            self.heading = (self.heading + w * h) % 360.0
+            if v and not self._translate(v * h):
+                break
+
+    def sync(self) -> None:
+        """Catch up with the shared clock, if any, under the current motor speeds."""
+        if self.clock is not None:
+            self.step(self.clock.now() - self.time)
+
+    def drive(self, distance_mm: float) -> float:
+        """Drive straight, stopping at walls; returns the distance covered."""
+        remaining = float(distance_mm)
+        covered = 0.0
+        step = 5.0 if remaining >= 0 else -5.0
+        while abs(remaining) > 1e-9:
+            d = step if abs(remaining) > abs(step) else remaining
+            if not self._translate(d):
+                break
+            covered += d
+            remaining -= d
+        self.time += abs(covered) / self.mm_per_sec
+        return covered
+
+    def turn(self, angle_deg: float) -> None:
+        """Rotate in place by ``angle_deg`` (positive is left/counter-clockwise)."""
+        self.heading = (self.heading + angle_deg) % 360.0
+        self.time += abs(angle_deg) / self.deg_per_sec
+
+    def _translate(self, d: float) -> bool:
+        rad = math.radians(self.heading)
+        nx = self.x + d * math.cos(rad)
+        ny = self.y + d * math.sin(rad)
+        clear = self.world.clearance(nx, ny)
+        # Blocked if it would push into a wall; backing away is always allowed
+        if clear < self.radius and clear < self.world.clearance(self.x, self.y):
+            self.collisions += 1
+            self.left_speed = self.right_speed = 0.0
+            return False
+        self.x, self.y = nx, ny
+        self.odometer += abs(d)
+        return True
+
+    # ----- sensors -----
+    def _noisy(self, value: float, lo: int, hi: int) -> int:
+        if self.sensor_noise:
+            value += self.rng.gauss(0.0, self.sensor_noise)
+        return int(min(hi, max(lo, round(value))))
+
+    def read_ir(self, index: int) -> int:
+        """IR reading (0-4095): higher when a wall is closer to the sensor."""
+        bearing = self.heading + IR_BEARINGS[int(index) % 8]
+        rad = math.radians(bearing)
+        sx = self.x + self.radius * math.cos(rad)
+        sy = self.y + self.radius * math.sin(rad)
+        d = self.world.ray_distance(sx, sy, bearing, self.ir_range)
+        return self._noisy(4095.0 * (1.0 - d / self.ir_range) ** 2 + 20.0, 0, 4095)
+
+    def read_line(self, index: int) -> int:
+        """1 if the left (0) or right (1) line sensor is over a floor line."""
+        rad = math.radians(self.heading)
+        side = 12.0 if int(index) == 0 else -12.0
+        fx = self.x + self.radius * 0.6 * math.cos(rad) - side * math.sin(rad)
+        fy = self.y + self.radius * 0.6 * math.sin(rad) + side * math.cos(rad)
+        return 1 if self.world.on_line(fx, fy) else 0
+
+    def read_axis(self, index: int) -> int:
+        """Accelerometer reading; Z carries 1 g (16384 counts at the ±2 g range)."""
+        base = 16384.0 if int(index) == 2 else 0.0
+        return self._noisy(base, -32768, 32767)
+
+    def read_light(self) -> int:
+        """Ambient light reading (0-4095) from the world."""
+        return self._noisy(self.world.light, 0, 4095)
+
+    def read_mic(self) -> int:
+        """Microphone level (1-4095) from the world."""
+        return self._noisy(self.world.noise, 1, 4095)
+
+    def read_switch(self, index: int) -> int:
+        """1 while push button ``index`` is held."""
+        return self.buttons[index] if 0 <= index < len(self.buttons) else 0
+
+    # ----- actuators -----
+    def set_motors(self, left: float, right: float) -> None:
+        """Set the wheel speeds in ``SetMotors`` units."""
+        self.left_speed = float(left)
+        self.right_speed = float(right)
+
+    def set_servo(self, index: int, position: int) -> None:
+        """Record the target position of servo ``index``."""
+        self.servos[index] = position
+
+    @property
+    def files(self) -> Dict[str, bytearray]:
+        """Files on the simulated SD card, by name."""
+        return self.card.files
+
+    # ----- firmware protocol -----
+    def handle(self, command: str) -> Optional[int]:
+        """Apply a firmware command and return its reply (None if it has none)."""
+        if not command.split():
+            return None
+        self.sync()
+        reply = dispatch(self, command)
+        self.step(self.command_time)
+        if self.clock is not None:
+            self.clock.advance_to(self.time, run_timers=False)
+        return reply
+
+
+class SimCard:
+    """The SD card of a simulated robot: named files, one of them open.
+
+    Args:
+        random_byte (Callable[[], int]): Supplies ``CardReadByte`` replies
+            while no file is open.
+
+    Attributes:
+        files (dict[str, bytearray]): File contents by name.
+    """
+
+    def __init__(self, random_byte: Callable[[], int]) -> None:
+        self.files: Dict[str, bytearray] = {}
+        self._random_byte = random_byte
+        self._file: Optional[bytearray] = None
+        self._pos = 0
+
+    def handle(self, command: str) -> Optional[int]:
+        """Apply a ``Card*`` file command and return its reply (None if it has none)."""
+        head, _, rest = command.strip().partition(" ")
+        name = rest.strip()
+        arg0 = int(name) if name.lstrip("-").isdigit() else 0
+        if head == "CardCreate":
+            self._file = self.files[name] = bytearray()
+            self._pos = 0
+            return 1
+        if head == "CardOpen":
+            self._file = self.files.get(name)
+            self._pos = 0
+            return 1 if self._file is not None else 0
+        if head == "CardDelete":
+            if self.files.get(name) is self._file:
+                self._file = None
+            return 1 if self.files.pop(name, None) is not None else 0
+        if head == "CardWriteByte":
+            if self._file is not None:
+                self._file.append(arg0 & 0xFF)
+            return None
+        # CardReadByte: random bytes with no file open, -1 past the end of a file
+        if self._file is None:
+            return self._random_byte()
+        if self._pos >= len(self._file):
+            return -1
+        self._pos += 1
+        return self._file[self._pos - 1]
+
+
+def dispatch(robot, command: str) -> Optional[int]:
+    """Apply a firmware command to a simulated robot and return its reply.
+
+    This is the one definition of the firmware protocol for simulators.
+    ``robot`` provides the model: ``set_motors``, ``drive``, ``turn``,
+    ``read_ir``/``read_line``/``read_light``/``read_mic``/``read_axis``/
+    ``read_switch``, ``set_servo``, the ``leds`` and ``battery_mv``
+    attributes, and a ``SimCard`` as ``card``.
+
+    Returns:
+        int | None: The reply, or None for commands the firmware does not answer.
+    """
+    parts = command.split()
+    if not parts:
+        return None
+    head = parts[0]
+    args = [int(a) for a in parts[1:] if a.lstrip("-").isdigit()]
+    arg0 = args[0] if args else 0
+    if head == "SetMotors":
+        robot.set_motors(arg0, args[1] if len(args) > 1 else 0)
+        return None
+    if head in ("Forwards", "Backwards"):
+        robot.drive(arg0 if head == "Forwards" else -arg0)
+        return 1
+    if head in ("Left", "Right"):
+        robot.turn(arg0 if head == "Left" else -arg0)
+        return 1
+    if head == "ReadIR":
+        return robot.read_ir(arg0)
+    if head == "ReadLine":
+        return robot.read_line(arg0)
+    if head == "ReadLight":
+        return robot.read_light()
+    if head == "ReadMic":
+        return robot.read_mic()
+    if head == "ReadAxis":
+        return robot.read_axis(arg0)
+    if head == "ReadSwitch":
+        return robot.read_switch(arg0)
+    if head == "GetAPIVersion":
+        return 7
+    if head == "GetBatteryVoltage":
+        return robot.battery_mv
+    if head == "LEDWrite":
+        robot.leds = arg0 & 0xFF
+        return None
+    if head in ("LEDOn", "LEDOff"):
+        bit = 1 << (arg0 & 7)
+        robot.leds = (robot.leds | bit) if head == "LEDOn" else (robot.leds & ~bit & 0xFF)
+        return None
+    if head in ("ServoSetPos", "ServoAutoMove"):
+        robot.set_servo(arg0, args[1] if len(args) > 1 else 0)
+        return None
+    if head in CARD_FILE_HEADS:
+        return robot.card.handle(command)
+    if head in NO_REPLY:
+        return None
+    return 1
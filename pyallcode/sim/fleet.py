@@ -0,0 +1,410 @@
+"""Vectorized simulation of many AllCode robots sharing one world.
+
+``Fleet`` keeps the state of N robots (pose, motor speeds, cached sensor
+values) in NumPy arrays. ``Fleet.step`` advances every robot at once with
+differential-drive kinematics and wall collisions, and IR ray casts and line
+sensing are computed for all robots that need them in one batch.
+
+Each robot can still be driven by unmodified ``Connection``/``Robot`` code
+through a per-robot transport:
+
+    fleet = Fleet(500, world=World.from_file("arena.json"), seed=1)
+    robots = [fleet.robot(i) for i in range(len(fleet))]
+    for bot in robots:
+        bot.set_motors(40, 40)
+    fleet.step(0.5)
+    print(robots[0].ir_sensors.read(2))
+
+Unlike ``SimRobot``, handling a command does not advance time: the robots
+share the fleet's ``clock`` (a ``VirtualClock``), moved forward by ``step``.
+Connections, samplers and sleeps on a fleet robot run on that clock; time
+they advance (a ``sleep``, say) is caught up with before the next command.
+Blocking moves (``Forwards``/``Left``...) complete immediately for the robot
+that sent them.
+
+NumPy is required for this module (``pip install pyallcode[numpy]``).
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+try:  # NumPy is optional for the package; the fleet simulator needs it
+    import numpy as _np  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    _np = None
+
+from ..comm.clock import VirtualClock
+from .engine import IR_BEARINGS, SimCard, dispatch
+from .world import World
+
+
+def _ray_cast(walls, ox, oy, dx, dy, max_range: float):
+    """Distance along each ray (arrays of equal shape) to the nearest wall."""
+    if walls.shape[0] == 0:
+        return _np.full(ox.shape, max_range)
+    x1, y1 = walls[:, 0], walls[:, 1]
+    sx, sy = walls[:, 2] - x1, walls[:, 3] - y1
+    ox, oy, dx, dy = (a[..., None] for a in (ox, oy, dx, dy))
+    qx, qy = x1 - ox, y1 - oy
+    denom = dx * sy - dy * sx
+    parallel = denom == 0.0
+    safe = _np.where(parallel, 1.0, denom)
+    t = (qx * sy - qy * sx) / safe
+    u = (qx * dy - qy * dx) / safe
+    hit = ~parallel & (t >= 0.0) & (u >= 0.0) & (u <= 1.0)
+    return _np.minimum(_np.where(hit, t, max_range).min(axis=-1), max_range)
+
+
+def _segment_distance(segs, px, py):
+    """Distance from each point to each segment, shape ``px.shape + (M,)``."""
+    x1, y1 = segs[:, 0], segs[:, 1]
+    dx, dy = segs[:, 2] - x1, segs[:, 3] - y1
+    length_sq = dx * dx + dy * dy
+    px, py = px[..., None], py[..., None]
+    t = ((px - x1) * dx + (py - y1) * dy) / _np.where(length_sq == 0.0, 1.0, length_sq)
+    t = _np.clip(t, 0.0, 1.0)
+    return _np.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+def _clearance(walls, px, py):
+    if walls.shape[0] == 0:
+        return _np.full(px.shape, _np.inf)
+    return _segment_distance(walls, px, py).min(axis=-1)
+
+
+class FleetRobot:
+    """View of one robot in a ``Fleet``.
+
+    It has the ``handle`` method and ``clock`` that ``SimulatedTransport``
+    expects from a simulated robot, plus read-only access to the robot's
+    pose. It also provides the model interface that ``engine.dispatch``
+    drives.
+    """
+
+    __slots__ = ("fleet", "index")
+
+    def __init__(self, fleet: "Fleet", index: int) -> None:
+        self.fleet = fleet
+        self.index = index
+
+    @property
+    def x(self) -> float:
+        return float(self.fleet.x[self.index])
+
+    @property
+    def y(self) -> float:
+        return float(self.fleet.y[self.index])
+
+    @property
+    def heading(self) -> float:
+        return float(self.fleet.heading[self.index])
+
+    @property
+    def clock(self) -> VirtualClock:
+        """The clock shared by the whole fleet."""
+        return self.fleet.clock
+
+    def handle(self, command: str) -> Optional[int]:
+        """Apply a firmware command to this robot; see ``Fleet.handle``."""
+        self.fleet.sync()
+        return dispatch(self, command)
+
+    # ----- model interface for engine.dispatch -----
+    battery_mv = 4800
+
+    @property
+    def card(self) -> SimCard:
+        return self.fleet.card(self.index)
+
+    @property
+    def leds(self) -> int:
+        return int(self.fleet.leds[self.index])
+
+    @leds.setter
+    def leds(self, value: int) -> None:
+        self.fleet.leds[self.index] = value
+
+    def set_motors(self, left: float, right: float) -> None:
+        self.fleet.left_speed[self.index] = left
+        self.fleet.right_speed[self.index] = right
+
+    def drive(self, distance_mm: float) -> None:
+        self.fleet._drive(self.index, distance_mm)
+
+    def turn(self, angle_deg: float) -> None:
+        fleet = self.fleet
+        fleet.heading[self.index] = (fleet.heading[self.index] + angle_deg) % 360.0
+        fleet._dirty[self.index] = True
+
+    def read_ir(self, index: int) -> int:
+        return int(self.fleet.ir[self.index, index % len(IR_BEARINGS)])
+
+    def read_line(self, index: int) -> int:
+        return int(self.fleet.line[self.index, 1 if index == 1 else 0])
+
+    def read_light(self) -> int:
+        return self.fleet._noisy(self.fleet.world.light, 0, 4095)
+
+    def read_mic(self) -> int:
+        return self.fleet._noisy(self.fleet.world.noise, 1, 4095)
+
+    def read_axis(self, index: int) -> int:
+        return self.fleet._noisy(16384.0 if index == 2 else 0.0, -32768, 32767)
+
+    def read_switch(self, index: int) -> int:
+        return 0
+
+    def set_servo(self, index: int, position: int) -> None:
+        # Fleets do not model servos
+        pass
+
+
+class Fleet:
+    """State of N simulated robots held in NumPy arrays.
+
+    Args:
+        n (int): Number of robots.
+        world (World | None): The shared arena; an empty 2 m square when None.
+        seed (int | None): Seed for start poses and sensor noise.
+        positions (Sequence[Sequence[float]] | None): Start ``(x, y, heading)``
+            per robot. When None, robots are placed at random clear positions.
+        mm_per_unit (float): Wheel speed in mm/s per ``SetMotors`` unit.
+        wheelbase (float): Distance between the wheels in mm.
+        radius (float): Body radius in mm, used for collisions and sensor placement.
+        ir_range (float): Distance in mm beyond which IR reads background only.
+        sensor_noise (float): Standard deviation of analogue sensor noise in counts.
+        clock (VirtualClock | None): Clock shared by the fleet's robots; a new
+            one starting at 0 when None.
+
+    Attributes:
+        x, y, heading (numpy.ndarray): Poses in mm and degrees, shape ``(n,)``.
+        left_speed, right_speed (numpy.ndarray): Motor settings, shape ``(n,)``.
+        collisions (numpy.ndarray): Per-robot count of blocked moves.
+        time (float): Simulated seconds the robots have moved through.
+        clock (VirtualClock): The shared clock; ``step`` advances it.
+    """
+
+    def __init__(self, n: int, world: Optional[World] = None, seed: Optional[int] = None,
+                 positions: Optional[Sequence[Sequence[float]]] = None,
+                 mm_per_unit: float = 2.0, wheelbase: float = 95.0, radius: float = 65.0,
+                 ir_range: float = 250.0, sensor_noise: float = 8.0,
+                 clock: Optional[VirtualClock] = None) -> None:
+        if _np is None:
+            raise ImportError("Fleet requires NumPy; install it with 'pip install pyallcode[numpy]'")
+        if n < 1:
+            raise ValueError("Fleet needs at least one robot")
+        self.world = world if world is not None else World()
+        self.rng = _np.random.default_rng(seed)
+        self.mm_per_unit = float(mm_per_unit)
+        self.wheelbase = float(wheelbase)
+        self.radius = float(radius)
+        self.ir_range = float(ir_range)
+        self.sensor_noise = float(sensor_noise)
+        self._walls = _np.asarray(self.world.walls, dtype=_np.float64).reshape(-1, 4)
+        self._lines = _np.asarray(self.world.lines, dtype=_np.float64).reshape(-1, 4)
+        self._bearings = _np.asarray(IR_BEARINGS, dtype=_np.float64)
+
+        if positions is not None:
+            pose = _np.asarray(positions, dtype=_np.float64).reshape(-1, 3)
+            if pose.shape[0] != n:
+                raise ValueError(f"Expected {n} positions, got {pose.shape[0]}")
+        else:
+            pose = self._random_poses(n)
+        self.x = pose[:, 0].copy()
+        self.y = pose[:, 1].copy()
+        self.heading = pose[:, 2] % 360.0
+        self.left_speed = _np.zeros(n)
+        self.right_speed = _np.zeros(n)
+        self.collisions = _np.zeros(n, dtype=_np.int64)
+        self.leds = _np.zeros(n, dtype=_np.uint8)
+        self._cards: Dict[int, SimCard] = {}
+        self.clock = clock if clock is not None else VirtualClock()
+        self.time = self.clock.now()
+        self._ir = _np.zeros((n, len(IR_BEARINGS)), dtype=_np.int64)
+        self._line = _np.zeros((n, 2), dtype=_np.int64)
+        self._dirty = _np.ones(n, dtype=bool)
+
+    def __len__(self) -> int:
+        return int(self.x.shape[0])
+
+    def __getitem__(self, index: int) -> FleetRobot:
+        if not -len(self) <= index < len(self):
+            raise IndexError("robot index out of range")
+        return FleetRobot(self, index % len(self))
+
+    def _random_poses(self, n: int):
+        w, h, r = self.world.width, self.world.height, self.radius
+        pose = _np.empty((n, 3))
+        filled = 0
+        # Rejection-sample positions at least one body radius away from walls
+        for _ in range(100):
+            k = n - filled
+            xs = self.rng.uniform(r, max(r, w - r), 2 * k)
+            ys = self.rng.uniform(r, max(r, h - r), 2 * k)
+            ok = _clearance(self._walls, xs, ys) >= r
+            take = min(k, int(ok.sum()))
+            pose[filled:filled + take, 0] = xs[ok][:take]
+            pose[filled:filled + take, 1] = ys[ok][:take]
+            filled += take
+            if filled == n:
+                break
+        else:
+            raise ValueError("Could not find clear start positions in this world")
+        pose[:, 2] = self.rng.uniform(0.0, 360.0, n)
+        return pose
+
+    # ----- kinematics -----
+    def step(self, dt: float) -> None:
+        """Advance every robot by ``dt`` seconds with its current motor speeds.
+
+        The clock moves along, running timers (such as a ``Sampler`` on a
+        fleet robot) that fall due.
+        """
+        if dt <= 0:
+            return
+        target = self.time + dt
+        if self.clock.now() < target:
+            # Timers see the robots where they are at the time they fire
+            self.clock.advance_to(target)
+        self._integrate(target - self.time)
+
+    def sync(self) -> None:
+        """Catch up with time advanced on the clock directly, e.g. by a ``sleep``."""
+        self._integrate(self.clock.now() - self.time)
+
+    def _integrate(self, dt: float) -> None:
+        if dt <= 0:
+            return
+        self.time += dt
+        n = max(1, int(math.ceil(dt / 0.01)))
+        h = dt / n
+        walls, radius = self._walls, self.radius
+        clear = _clearance(walls, self.x, self.y)
+        for _ in range(n):
+            vl = self.left_speed * self.mm_per_unit
+            vr = self.right_speed * self.mm_per_unit
+            moving = (vl != 0.0) | (vr != 0.0)
+            if not moving.any():
+                break
+            v = (vl + vr) * 0.5
+            self.heading = (self.heading + _np.degrees((vr - vl) / self.wheelbase) * h) % 360.0
+            rad = _np.radians(self.heading)
+            nx = self.x + v * h * _np.cos(rad)
+            ny = self.y + v * h * _np.sin(rad)
+            new_clear = _clearance(walls, nx, ny)
+            # Blocked if it would push into a wall; backing away is always allowed
+            blocked = moving & (new_clear < radius) & (new_clear < clear)
+            go = moving & ~blocked
+            self.x = _np.where(go, nx, self.x)
+            self.y = _np.where(go, ny, self.y)
+            clear = _np.where(go, new_clear, clear)
+            if blocked.any():
+                self.collisions += blocked
+                self.left_speed[blocked] = 0.0
+                self.right_speed[blocked] = 0.0
+            self._dirty |= moving
+
+    def _drive(self, i: int, distance_mm: float) -> None:
+        rad = math.radians(float(self.heading[i]))
+        c, s = math.cos(rad), math.sin(rad)
+        world, radius = self.world, self.radius
+        x, y = float(self.x[i]), float(self.y[i])
+        remaining = float(distance_mm)
+        step = 5.0 if remaining >= 0 else -5.0
+        while abs(remaining) > 1e-9:
+            d = step if abs(remaining) > abs(step) else remaining
+            nx, ny = x + d * c, y + d * s
+            clear = world.clearance(nx, ny)
+            if clear < radius and clear < world.clearance(x, y):
+                self.collisions[i] += 1
+                break
+            x, y = nx, ny
+            remaining -= d
+        self.x[i], self.y[i] = x, y
+        self._dirty[i] = True
+
+    # ----- sensors -----
+    def sense(self, indices=None) -> None:
+        """Recompute IR and line readings for ``indices`` (all robots when None)."""
+        idx = _np.arange(len(self)) if indices is None else _np.asarray(indices, dtype=_np.intp)
+        if idx.size == 0:
+            return
+        r = self.radius
+        heading = self.heading[idx]
+        bearing = _np.radians(heading[:, None] + self._bearings)
+        cx, cy = self.x[idx, None], self.y[idx, None]
+        dx, dy = _np.cos(bearing), _np.sin(bearing)
+        d = _ray_cast(self._walls, cx + r * dx, cy + r * dy, dx, dy, self.ir_range)
+        ir = 4095.0 * (1.0 - d / self.ir_range) ** 2 + 20.0
+        if self.sensor_noise:
+            ir += self.rng.normal(0.0, self.sensor_noise, ir.shape)
+        self._ir[idx] = _np.clip(_np.rint(ir), 0, 4095)
+
+        if self._lines.shape[0]:
+            rad = _np.radians(heading)
+            c, s = _np.cos(rad), _np.sin(rad)
+            side = _np.array([12.0, -12.0])
+            fx = self.x[idx, None] + r * 0.6 * c[:, None] - side * s[:, None]
+            fy = self.y[idx, None] + r * 0.6 * s[:, None] + side * c[:, None]
+            dist = _segment_distance(self._lines, fx, fy).min(axis=-1)
+            self._line[idx] = dist <= self.world.line_width / 2.0
+        else:
+            self._line[idx] = 0
+        self._dirty[idx] = False
+
+    def _refresh(self) -> None:
+        # Batch every robot that moved since its last read into one ray cast
+        self.sense(_np.flatnonzero(self._dirty))
+
+    @property
+    def ir(self):
+        """IR readings, shape ``(n, 8)``, indexed like ``IRSensors``."""
+        self._refresh()
+        return self._ir
+
+    @property
+    def line(self):
+        """Line sensor readings (left, right), shape ``(n, 2)``."""
+        self._refresh()
+        return self._line
+
+    def _noisy(self, value: float, lo: int, hi: int) -> int:
+        if self.sensor_noise:
+            value += self.rng.normal(0.0, self.sensor_noise)
+        return int(min(hi, max(lo, round(value))))
+
+    # ----- firmware protocol -----
+    def handle(self, i: int, command: str) -> Optional[int]:
+        """Apply a firmware command to robot ``i`` and return its reply (None if it has none)."""
+        return FleetRobot(self, i).handle(command)
+
+    def card(self, i: int) -> SimCard:
+        """The simulated SD card of robot ``i``, created on first use."""
+        card = self._cards.get(i)
+        if card is None:
+            card = self._cards[i] = SimCard(lambda: int(self.rng.integers(0, 256)))
+        return card
+
+    # ----- adapters -----
+    def transport(self, i: int):
+        """Return an unopened ``SimulatedTransport`` that drives robot ``i``."""
+        from ..comm.transport import SimulatedTransport
+        return SimulatedTransport(robot=self[i], echo=False)
+
+    def robot(self, i: int, **kwargs):
+        """Return a ``Robot`` connected to robot ``i``.
+
+        Args:
+            i (int): Robot index.
+            **kwargs: Passed to ``Robot`` (e.g. ``mm_per_sec``).
+        """
+        from ..robot import Robot
+        bot = Robot(autoconn=False, **kwargs)
+        bot.transport = bot.conn.transport = self.transport(i)
+        bot.transport.open(f"FLEET-{i}")
+        return bot
+
+    def robots(self) -> List:
+        """Return a connected ``Robot`` for every robot in the fleet."""
+        return [self.robot(i) for i in range(len(self))]
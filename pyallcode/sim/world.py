@@ -0,0 +1,129 @@
+"""2D world model for the simulated robot.
+
+A world is a flat arena measured in millimetres with the origin at the
+bottom-left corner. It holds:
+
+- walls: line segments that block movement and reflect IR,
+- lines: line segments painted on the floor, seen by the line sensors,
+- ambient light and microphone levels.
+
+Worlds can be loaded from JSON:
+
+    {
+        "width": 2000, "height": 1500, "boundary": true,
+        "walls": [[500, 0, 500, 800]],
+        "lines": [[100, 100, 1900, 100]], "line_width": 20,
+        "light": 2200, "noise": 300
+    }
+"""
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Segment = Tuple[float, float, float, float]
+
+
+def _segment(seq: Sequence[float]) -> Segment:
+    if len(seq) != 4:
+        raise ValueError(f"Segment needs 4 coordinates (x1, y1, x2, y2), got {seq!r}")
+    x1, y1, x2, y2 = (float(v) for v in seq)
+    return (x1, y1, x2, y2)
+
+
+def point_segment_distance(px: float, py: float, seg: Segment) -> float:
+    """Distance in mm from point (px, py) to a segment."""
+    x1, y1, x2, y2 = seg
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0.0:
+        return math.hypot(px - x1, py - y1)
+    t = ((px - x1) * dx + (py - y1) * dy) / length_sq
+    t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+    return math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+def ray_segment_distance(ox: float, oy: float, dx: float, dy: float, seg: Segment) -> Optional[float]:
+    """Distance along the unit ray (ox, oy) + t*(dx, dy) to a segment, or None."""
+    x1, y1, x2, y2 = seg
+    sx, sy = x2 - x1, y2 - y1
+    denom = dx * sy - dy * sx
+    if denom == 0.0:
+        return None
+    qx, qy = x1 - ox, y1 - oy
+    t = (qx * sy - qy * sx) / denom
+    u = (qx * dy - qy * dx) / denom
+    if t >= 0.0 and 0.0 <= u <= 1.0:
+        return t
+    return None
+
+
+class World:
+    """A flat arena with walls, floor lines and ambient levels.
+
+    Args:
+        width (float): Arena width in mm.
+        height (float): Arena height in mm.
+        walls (Iterable[Sequence[float]]): Wall segments ``(x1, y1, x2, y2)``.
+        lines (Iterable[Sequence[float]]): Floor line segments ``(x1, y1, x2, y2)``.
+        line_width (float): Width of floor lines in mm.
+        light (int): Ambient light reading (0-4095).
+        noise (int): Ambient microphone level (0-4095).
+        boundary (bool): Add walls along the arena edges.
+    """
+
+    def __init__(self, width: float = 2000.0, height: float = 2000.0,
+                 walls: Iterable[Sequence[float]] = (), lines: Iterable[Sequence[float]] = (),
+                 line_width: float = 20.0, light: int = 2000, noise: int = 200,
+                 boundary: bool = True) -> None:
+        self.width = float(width)
+        self.height = float(height)
+        self.walls: List[Segment] = [_segment(w) for w in walls]
+        if boundary:
+            w, h = self.width, self.height
+            self.walls += [(0.0, 0.0, w, 0.0), (w, 0.0, w, h), (w, h, 0.0, h), (0.0, h, 0.0, 0.0)]
+        self.lines: List[Segment] = [_segment(s) for s in lines]
+        self.line_width = float(line_width)
+        self.light = int(light)
+        self.noise = int(noise)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "World":
+        """Build a world from a mapping using the JSON map keys."""
+        return cls(
+            width=data.get("width", 2000.0),
+            height=data.get("height", 2000.0),
+            walls=data.get("walls", ()),
+            lines=data.get("lines", ()),
+            line_width=data.get("line_width", 20.0),
+            light=data.get("light", 2000),
+            noise=data.get("noise", 200),
+            boundary=data.get("boundary", True),
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "World":
+        """Load a world from a JSON map file."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def ray_distance(self, x: float, y: float, heading_deg: float, max_range: float) -> float:
+        """Distance to the nearest wall along a heading, capped at ``max_range``."""
+        rad = math.radians(heading_deg)
+        dx, dy = math.cos(rad), math.sin(rad)
+        best = max_range
+        for seg in self.walls:
+            d = ray_segment_distance(x, y, dx, dy, seg)
+            if d is not None and d < best:
+                best = d
+        return best
+
+    def clearance(self, x: float, y: float) -> float:
+        """Distance from a point to the nearest wall."""
+        return min((point_segment_distance(x, y, s) for s in self.walls), default=math.inf)
+
+    def on_line(self, x: float, y: float) -> bool:
+        """True if the point lies on a floor line."""
+        half = self.line_width / 2.0
+        return any(point_segment_distance(x, y, s) <= half for s in self.lines)
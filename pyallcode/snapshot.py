@@ -0,0 +1,120 @@
+"""Batch sensor snapshots read in a single pipelined burst.
+
+A snapshot issues every underlying read command (``ReadIR``, ``ReadLine``,
+``ReadAxis``...) back-to-back through ``Connection.execute_many`` so a full
+sensor sweep costs roughly one round trip instead of one per sensor.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .comm.clock import clock_of
+from .comm.commands import READ_AXIS, READ_IR, READ_LIGHT, READ_LINE, READ_MIC, READ_SWITCH
+
+# Sensor groups and the commands used to read them, in reply order.
+SENSOR_COMMANDS = {
+    "ir": tuple(READ_IR(i) for i in range(8)),
+    "line": (READ_LINE(0), READ_LINE(1)),
+    "light": (READ_LIGHT(),),
+    "mic": (READ_MIC(),),
+    "accel": (READ_AXIS(0), READ_AXIS(1), READ_AXIS(2)),
+    "buttons": (READ_SWITCH(0), READ_SWITCH(1)),
+}
+
+SENSORS: Tuple[str, ...] = tuple(SENSOR_COMMANDS)
+
+
+class Snapshot:
+    """A timestamped set of sensor readings taken in one burst.
+
+    Groups that were not requested are None. Integer readings whose reply was
+    lost are -1; on/off readings whose reply was lost are None rather than
+    True.
+
+    Attributes:
+        timestamp (float): Connection clock time when the burst was sent.
+        ir (tuple[int, ...] | None): IR readings indexed by ``IRSensor``.
+        line (tuple[bool | None, bool | None] | None): Line sensors indexed by
+            ``LineSensor``.
+        light (int | None): Ambient light level.
+        mic (int | None): Microphone level.
+        accel (tuple[int, int, int] | None): Accelerometer X, Y, Z.
+        buttons (tuple[bool | None, bool | None] | None): Push buttons indexed
+            by ``Button``.
+    """
+
+    __slots__ = ("timestamp", "ir", "line", "light", "mic", "accel", "buttons")
+
+    def __init__(self, timestamp: float) -> None:
+        self.timestamp = timestamp
+        self.ir: Optional[Tuple[int, ...]] = None
+        self.line: Optional[Tuple[Optional[bool], ...]] = None
+        self.light: Optional[int] = None
+        self.mic: Optional[int] = None
+        self.accel: Optional[Tuple[int, ...]] = None
+        self.buttons: Optional[Tuple[Optional[bool], ...]] = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"Snapshot({fields})"
+
+
+def _int(value: Optional[int]) -> int:
+    return -1 if value is None else int(value)
+
+
+def _flag(value: Optional[int]) -> Optional[bool]:
+    # -1 is a lost reply, not a reading: don't report it as "on"
+    return None if value is None or value < 0 else bool(value)
+
+
+def resolve_sensors(sensors: Iterable[str] | None) -> Tuple[str, ...]:
+    """Validates a sensor selection, defaulting to every group.
+
+    Raises:
+        ValueError: If an unknown sensor group is requested.
+    """
+    if sensors is None:
+        return SENSORS
+    if isinstance(sensors, str):
+        sensors = (sensors,)
+    chosen = tuple(dict.fromkeys(sensors))
+    unknown = [s for s in chosen if s not in SENSOR_COMMANDS]
+    if unknown:
+        raise ValueError(f"Unknown sensor group(s) {unknown}; expected any of {SENSORS}")
+    return chosen
+
+
+def build_snapshot(timestamp: float, sensors: Sequence[str], replies: Sequence[Optional[int]]) -> Snapshot:
+    """Builds a Snapshot from replies ordered as ``SENSOR_COMMANDS`` for ``sensors``."""
+    snap = Snapshot(timestamp)
+    pos = 0
+    for name in sensors:
+        n = len(SENSOR_COMMANDS[name])
+        values = replies[pos:pos + n]
+        pos += n
+        if name in ("line", "buttons"):
+            # Same rule as the device classes: any non-zero reply is True
+            setattr(snap, name, tuple(_flag(v) for v in values))
+        elif n == 1:
+            setattr(snap, name, _int(values[0]))
+        else:
+            setattr(snap, name, tuple(_int(v) for v in values))
+    return snap
+
+
+def take_snapshot(conn, sensors: Iterable[str] | None = None) -> Snapshot:
+    """Reads the selected sensor groups in one pipelined burst.
+
+    Args:
+        conn (Connection): The connection to read through.
+        sensors (Iterable[str] | None): Sensor groups from ``SENSORS``; all when None.
+
+    Returns:
+        Snapshot: The readings and the time the burst was sent.
+    """
+    chosen = resolve_sensors(sensors)
+    commands: List[str] = [c for name in chosen for c in SENSOR_COMMANDS[name]]
+    timestamp = clock_of(conn).now()
+    # One burst, even when it is longer than the connection's max_in_flight
+    return build_snapshot(timestamp, chosen, conn.execute_many(commands, max_in_flight=len(commands)))
@@ -53,6 +53,14 @@ if 'serial' not in sys.modules:
     sys.modules['serial.tools.list_ports'] = list_ports_mod
 
 
+@pytest.fixture(autouse=True)
+def _isolated_port_cache(tmp_path, monkeypatch):
+    """Keep the autodetect port cache out of the user's home during tests."""
+    monkeypatch.setenv('PYALLCODE_CACHE_DIR', str(tmp_path / 'cache'))
+    from pyallcode.comm import ports
+    monkeypatch.setattr(ports, '_memo', None)
+
+
 class DummyTransport:
     """A test double for Transport interface used by Connection tests."""
     def __init__(self):
@@ -84,3 +92,24 @@ class DummyTransport:
 @pytest.fixture
 def dummy_transport():
     return DummyTransport()
+
+
+class ReplyingTransport(DummyTransport):
+    """A DummyTransport that queues a reply line for each command written.
+
+    ``responder`` maps the command text (without newline) to an int reply, or
+    None for fire-and-forget commands.
+    """
+    def __init__(self, responder=None):
+        super().__init__()
+        self.responder = responder or (lambda cmd: None)
+    def write(self, data: bytes) -> None:
+        super().write(data)
+        reply = self.responder(data.decode().strip())
+        if reply is not None:
+            self._lines.append(f"{reply}\n".encode())
+
+
+@pytest.fixture
+def replying_transport():
+    return ReplyingTransport()
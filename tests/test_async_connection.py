@@ -0,0 +1,105 @@
+import asyncio
+
+from tests.conftest import ReplyingTransport
+
+
+def test_async_execute_matches_concurrent_replies_in_order():
+    from pyallcode.comm.async_connection import AsyncConnection
+
+    t = ReplyingTransport(lambda cmd: int(cmd.split()[1]) + 100 if cmd.startswith('ReadIR') else None)
+    conn = AsyncConnection(t, poll_interval=0)
+
+    async def run():
+        results = await asyncio.gather(*(conn.execute(f'ReadIR {i}') for i in range(8)))
+        led = await conn.execute('LEDOn 1', expect_response=False)
+        return results, led
+
+    results, led = asyncio.run(run())
+    assert results == [100 + i for i in range(8)]
+    assert led is None
+    assert t._writes[-1] == b'LEDOn 1\n'
+
+
+def test_async_execute_times_out_with_minus_one():
+    from pyallcode.comm.async_connection import AsyncConnection
+
+    t = ReplyingTransport(lambda cmd: None)  # never replies
+    conn = AsyncConnection(t, poll_interval=0.001)
+
+    assert asyncio.run(conn.execute('ReadLight', timeout=0.01)) == -1
+
+
+def test_async_execute_respects_max_in_flight():
+    from pyallcode.comm.async_connection import AsyncConnection
+
+    t = ReplyingTransport(lambda cmd: 1)
+    conn = AsyncConnection(t, poll_interval=0, max_in_flight=2)
+    seen = []
+    orig_write = t.write
+
+    def write(data):
+        seen.append(len(conn._waiters))
+        orig_write(data)
+    t.write = write
+
+    async def run():
+        return await conn.execute_many(['ReadMic'] * 6)
+
+    assert asyncio.run(run()) == [1] * 6
+    assert max(seen) <= 2
+
+
+def test_async_late_reply_is_not_given_to_the_next_command():
+    from pyallcode.comm.async_connection import AsyncConnection
+    from tests.conftest import DummyTransport
+
+    t = DummyTransport()
+    conn = AsyncConnection(t, poll_interval=0.001)
+
+    async def run():
+        first = await conn.execute('ReadLight', timeout=0.01)
+        # The first reply turns up late, just before the second one
+        t._lines = [b'111\n', b'222\n']
+        second = await conn.execute('ReadMic', timeout=0.5)
+        # A reply that never came: the next line is the next command's own
+        lost = await conn.execute('ReadLight', timeout=0.01)
+        t._lines = [b'333\n']
+        third = await conn.execute('ReadMic', timeout=0.05)
+        return first, second, lost, third
+
+    assert asyncio.run(run()) == (-1, 222, -1, 333)
+    assert conn.stale_replies == 1 and conn._late == 0
+
+
+def test_async_reply_timeout_starts_after_the_move_before_it():
+    import time
+    from pyallcode.comm.async_connection import AsyncConnection
+    from pyallcode.comm.commands import FORWARDS, READ_IR
+    from tests.conftest import DummyTransport
+
+    class InOrderTransport(DummyTransport):
+        """Answers in order; the move takes 0.3 s and the read 0.01 s."""
+        def __init__(self):
+            super().__init__()
+            self.busy_until = 0.0
+            self.timed = []
+        def write(self, data):
+            super().write(data)
+            move = data.startswith(b'Forwards')
+            self.busy_until = max(self.busy_until, time.monotonic()) + (0.3 if move else 0.01)
+            self.timed.append((self.busy_until, b'0\n' if move else b'1234\n'))
+        @property
+        def in_waiting(self):
+            while self.timed and self.timed[0][0] <= time.monotonic():
+                self._lines.append(self.timed.pop(0)[1])
+            return len(self._lines)
+
+    conn = AsyncConnection(InOrderTransport(), poll_interval=0.001)
+
+    async def run():
+        move = conn.submit(FORWARDS(10), 2.0)
+        ir = await conn.execute(READ_IR(2), True, 0.2)
+        return await move, ir
+
+    assert asyncio.run(run()) == (0, 1234)
+    assert conn.stale_replies == 0
@@ -0,0 +1,57 @@
+import asyncio
+
+
+def test_async_robot_simulated_moves_and_snapshot(monkeypatch):
+    from pyallcode.async_robot import AsyncRobot
+    monkeypatch.setenv('PYALLCODE_TRANSPORT', 'simulated')
+
+    async def run():
+        async with AsyncRobot(mm_per_sec=100) as bot:
+            bot.conn.poll_interval = 0
+            moves = await asyncio.gather(bot.forwards(100), bot.left(90))
+            version = await bot.get_api_version()
+            ir = await bot.ir_sensors.read(2)
+            snap = await bot.snapshot(['ir', 'line'])
+            await bot.leds.on(1)
+            return moves, version, ir, snap
+
+    moves, version, ir, snap = asyncio.run(run())
+    assert moves == [1, 1]
+    assert version == 7
+    assert 0 <= ir <= 4095
+    assert len(snap.ir) == 8 and len(snap.line) == 2
+
+
+def test_async_robot_open_falls_back_to_simulated():
+    from pyallcode.async_robot import AsyncRobot
+    from pyallcode.comm.transport import SimulatedTransport
+
+    class Failing:
+        is_open = False
+        def open(self, port):
+            raise OSError('no such port')
+
+    bot = AsyncRobot()
+    bot.transport = bot.conn.transport = Failing()
+    asyncio.run(bot.open('COM99'))
+    assert isinstance(bot.transport, SimulatedTransport)
+    assert bot.conn.transport is bot.transport
+
+
+def test_async_robot_start_move_writes_before_later_commands(monkeypatch):
+    from pyallcode.async_robot import AsyncRobot
+    monkeypatch.setenv('PYALLCODE_TRANSPORT', 'simulated')
+
+    async def run():
+        async with AsyncRobot(mm_per_sec=100) as bot:
+            bot.conn.poll_interval = 0
+            writes = []
+            send = bot.conn.send
+            bot.conn.send = lambda cmd: (writes.append(str(cmd)), send(cmd))
+            move = bot.start_forwards(100)
+            ir = await bot.ir_sensors.read(2)
+            return writes, await move, ir
+
+    writes, done, ir = asyncio.run(run())
+    assert writes == ['Forwards 100', 'ReadIR 2']
+    assert done == 1 and 0 <= ir <= 4095
@@ -0,0 +1,108 @@
+import io
+import struct
+import wave
+
+import pytest
+
+
+def _wav(frames: bytes, width: int, channels: int = 1, rate: int = 8000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(width)
+        w.setframerate(rate)
+        w.writeframes(frames)
+    return buf.getvalue()
+
+
+def test_wav_stream_yields_fixed_blocks_in_recorded_format():
+    import numpy as np
+    from pyallcode.devices.audio import WavStream
+    samples = np.arange(-500, 500, dtype='<i2')
+    stream = WavStream(io.BytesIO(_wav(samples.tobytes(), 2, rate=16000)), block_frames=300)
+    assert (stream.samplerate, stream.bitdepth, stream.channels) == (16000, 16, 1)
+    assert stream.frames == 1000 and stream.duration == 1000 / 16000
+
+    blocks = list(stream)
+    assert [len(b) for b in blocks] == [300, 300, 300, 100]
+    assert all(b.dtype == np.int16 for b in blocks)
+    assert np.array_equal(np.concatenate(blocks), samples)
+    assert stream.position == 1000
+
+
+def test_wav_stream_skips_extra_chunks_and_shapes_channels():
+    import numpy as np
+    from pyallcode.devices.audio import WavStream
+    data = bytes(range(40))
+    wav = _wav(data, 1, channels=2)
+    # Insert an odd-sized LIST chunk (with its pad byte) before the data chunk
+    at = wav.index(b'data')
+    wav = wav[:at] + b'LIST' + struct.pack('<I', 3) + b'abc\x00' + wav[at:]
+    stream = WavStream(io.BytesIO(wav), block_frames=8)
+    block = stream.read()
+    assert block.dtype == np.uint8 and block.shape == (8, 2)
+    assert block[1].tolist() == [2, 3]
+    assert sum(len(b) for b in stream) == 12
+
+
+def test_wav_stream_reads_raw_pcm_and_falls_back_to_array(monkeypatch):
+    from array import array
+    from pyallcode.devices import audio
+    monkeypatch.setattr(audio, '_np', None)
+    raw = struct.pack('<5h', 1, -2, 300, -400, 5) + b'\x01'  # trailing partial frame
+    stream = audio.WavStream(io.BytesIO(raw), block_frames=2, bitdepth=16, samplerate=8000)
+    blocks = list(stream)
+    assert all(isinstance(b, array) and b.typecode == 'h' for b in blocks)
+    assert [list(b) for b in blocks] == [[1, -2], [300, -400], [5]]
+    assert stream.frames is None
+
+
+def test_wav_stream_rejects_unsupported_files():
+    from pyallcode.devices.audio import WavStream
+    with pytest.raises(ValueError):
+        WavStream(io.BytesIO(b'not a wav file at all'))
+    with pytest.raises(ValueError):
+        WavStream(io.BytesIO(_wav(bytes(12), 3)))
+    with pytest.raises(ValueError):
+        WavStream(io.BytesIO(b''), bitdepth=16)
+
+
+def test_stream_wav_downloads_a_recording_in_chunks():
+    import numpy as np
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.transport import SimulatedTransport
+    from pyallcode.devices.sdcard import SDCard
+    from pyallcode.sim.engine import SimRobot
+    robot = SimRobot(seed=1)
+    t = SimulatedTransport(robot=robot, echo=False)
+    t.open('SIM')
+    sd = SDCard(Connection(t))
+    samples = (np.arange(2000) % 256).astype(np.uint8)
+    robot.files['REC.WAV'] = bytearray(_wav(samples.tobytes(), 1))
+
+    reads = []
+    write = t.write
+    t.write = lambda d: (reads.append(d.count(b'CardReadByte')), write(d))
+    with sd.stream_wav('REC.WAV', block_frames=256, chunk_size=128) as stream:
+        first = next(iter(stream))
+        # Only the header and the first block have been fetched so far
+        assert sum(reads) < 512
+        rest = list(stream)
+    assert np.array_equal(np.concatenate([first] + rest), samples)
+    assert stream.file.closed
+
+
+def test_wav_stream_accepts_record_mic_codes_and_rejects_bad_rates():
+    from pyallcode.devices.audio import WavStream
+    from pyallcode.enums import BitDepth, SampleRate
+    raw = struct.pack('<3h', 1, 2, 3)
+    stream = WavStream(io.BytesIO(raw), bitdepth=BitDepth.BIT_16, samplerate=SampleRate.SR_8KHZ)
+    assert (stream.bitdepth, stream.samplerate) == (16, 8000)
+    assert list(next(iter(stream))) == [1, 2, 3]
+    assert WavStream(io.BytesIO(b''), bitdepth=BitDepth.BIT_8, samplerate=SampleRate.SR_16KHZ).samplerate == 16000
+    with pytest.raises(ValueError):
+        WavStream(io.BytesIO(raw), bitdepth=16, samplerate=-1)
+    header = bytearray(_wav(raw, 2))
+    header[24:28] = struct.pack('<I', 0)  # sample rate field of the fmt chunk
+    with pytest.raises(ValueError):
+        WavStream(io.BytesIO(bytes(header)))
@@ -0,0 +1,144 @@
+import struct
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+
+def _sim_card():
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.transport import SimulatedTransport
+    from pyallcode.devices.sdcard import SDCard
+    from pyallcode.sim.engine import SimRobot
+    robot = SimRobot(seed=1)
+    t = SimulatedTransport(robot=robot, echo=False)
+    t.open('SIM')
+    return SDCard(Connection(t)), robot, t
+
+
+def test_to_mono_thresholds_dithers_and_handles_colour():
+    from pyallcode.devices.bitmap import to_mono
+    gray = np.array([[0, 100, 200, 255]], dtype=np.uint8)
+    assert to_mono(gray).tolist() == [[True, True, False, False]]
+    assert to_mono(gray, threshold=50, invert=True).tolist() == [[False, True, True, True]]
+
+    rgba = np.zeros((1, 2, 4), dtype=np.uint8)
+    rgba[0, 0, 3] = 255  # opaque black; the second pixel is transparent
+    assert to_mono(rgba).tolist() == [[True, False]]
+
+    # A mid-gray fill dithers to half the pixels on
+    mono = to_mono(np.full((8, 8), 128, dtype=np.uint8), dither=True)
+    assert mono.sum() == 32 and mono[0, 0] != mono[0, 1]
+    with pytest.raises(ValueError):
+        to_mono(np.zeros((2, 2, 2)))
+
+
+def test_encode_bmp_writes_a_padded_bottom_up_1_bit_bitmap():
+    from pyallcode.devices.bitmap import encode_bmp
+    pixels = np.zeros((2, 10), dtype=bool)
+    pixels[0, 0] = pixels[1, 9] = True
+    data = encode_bmp(pixels)
+    magic, size, _, _, offset = struct.unpack('<2sIHHI', data[:14])
+    _, w, h, planes, bpp = struct.unpack('<IiiHH', data[14:30])
+    assert (magic, size, w, h, planes, bpp) == (b'BM', len(data), 10, 2, 1, 1)
+    rows = data[offset:]
+    assert len(rows) == 8  # two rows of 4 bytes
+    assert rows[:4] == b'\x00\x40\x00\x00'  # bottom row first: x=9
+    assert rows[4:] == b'\x80\x00\x00\x00'
+
+
+def test_bitmap_cache_uploads_once_and_reuses_the_manifest():
+    from pyallcode.devices.bitmap import (
+        MANIFEST, BitmapCache, content_digest, content_name, encode_bmp, to_mono)
+    sd, robot, t = _sim_card()
+    image = np.zeros((32, 128), dtype=np.uint8)
+    image[8:24, 16:112] = 255
+
+    cache = BitmapCache(sd)
+    assert cache.show(image, 0, 0) == 1
+    name = content_name(content_digest(encode_bmp(to_mono(image))))
+    assert robot.files[name][:2] == b'BM'
+    assert name.encode() in bytes(robot.files[MANIFEST])
+    assert (cache.uploads, cache.hits) == (1, 0)
+
+    writes = []
+    write = t.write
+    t.write = lambda d: (writes.append(d), write(d))
+    cache.show(image, 0, 0)
+    assert writes == [b'CardBitmap 0 0 "%s"\n' % name.encode()]
+
+    # A new session finds the image through the manifest on the card
+    fresh = BitmapCache(sd)
+    assert fresh.prepare(image) == name
+    assert (fresh.uploads, fresh.hits) == (0, 1)
+    fresh.prepare(np.zeros((32, 128), dtype=np.uint8))
+    assert fresh.uploads == 1 and len(BitmapCache(sd).entries) == 2
+
+
+def test_bitmap_cache_keeps_colliding_names_apart(monkeypatch):
+    from pyallcode.devices import bitmap
+    from pyallcode.devices.bitmap import BitmapCache, content_digest, encode_bmp
+    sd, robot, t = _sim_card()
+    first = encode_bmp(np.ones((4, 8), dtype=bool))
+    second = encode_bmp(np.zeros((4, 8), dtype=bool))
+    cache = BitmapCache(sd)
+    name = cache.ensure(first)
+    # Pretend the second image's digest starts like the first one's
+    real_digest = content_digest
+    real = content_digest(second)
+    fake = content_digest(first)[:8] + real[8:]
+    monkeypatch.setattr(bitmap, 'content_digest', lambda data: fake if data == second else real_digest(data))
+    other = cache.ensure(second)
+    assert other != name
+    assert bytes(robot.files[name]) == first and bytes(robot.files[other]) == second
+    assert len(BitmapCache(sd).entries) == 2
+
+
+def test_bitmap_cache_ignores_damaged_or_endless_manifests():
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.transport import SimulatedTransport
+    from pyallcode.devices.bitmap import MANIFEST, BitmapCache
+    from pyallcode.devices.sdcard import SDCard
+    sd, robot, t = _sim_card()
+    robot.files[MANIFEST] = bytearray(b'\x00garbage\nX 1 2\n')
+    assert BitmapCache(sd).entries == {}
+
+    # On the default simulator, with a card that never reports the end of a file
+    t = SimulatedTransport(echo=False)
+    t.open('SIM')
+    sd = SDCard(Connection(t))
+    sd.upload(b'x', MANIFEST)
+    handle = t.card.handle
+    t.card.handle = lambda cmd: 65 if cmd.startswith('CardReadByte') else handle(cmd)
+    cache = BitmapCache(sd)
+    assert cache.entries == {}
+    t.card.handle = handle
+    assert cache.show(np.zeros((8, 8))) == 1 and cache.uploads == 1
+
+
+def test_bitmap_cache_deletes_files_before_rewriting_them():
+    from pyallcode.devices.bitmap import (
+        MANIFEST, BitmapCache, content_digest, content_name, encode_bmp, to_mono)
+    sd, robot, t = _sim_card()
+    card = robot.card
+    handle = card.handle
+
+    def keep_on_create(cmd):
+        # A card whose CardCreate reopens an existing file instead of emptying it
+        name = cmd.partition(' ')[2].strip()
+        if cmd.startswith('CardCreate') and name in card.files:
+            card._file, card._pos = card.files[name], 0
+            return 1
+        return handle(cmd)
+    card.handle = keep_on_create
+
+    image = np.zeros((8, 8), dtype=np.uint8)
+    data = encode_bmp(to_mono(image))
+    name = content_name(content_digest(data))
+    robot.files[MANIFEST] = bytearray(b'stale manifest, longer than the new one\n' * 4)
+    robot.files[name] = bytearray(b'stale bitmap' * 20)
+
+    cache = BitmapCache(sd)
+    assert cache.show(image) == 1
+    assert bytes(robot.files[name]) == data
+    assert BitmapCache(sd).entries == cache.entries
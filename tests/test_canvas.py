@@ -0,0 +1,112 @@
+class FakeLCD:
+    def __init__(self):
+        self.conn = self
+        self.sent = []
+    def execute(self, command, expect_response=True, attempts=1):
+        assert not expect_response
+        self.sent.append(str(command))
+
+
+def _replay(sent, width=128, height=32):
+    """Applies pixel, line and clear commands to a bitmap, like the display would."""
+    screen = bytearray(width * height)
+    fg = 1
+    for cmd in sent:
+        head, *args = cmd.split()
+        if head == 'LCDClear':
+            screen[:] = bytes(len(screen))
+        elif head == 'LCDOptions':
+            fg = int(args[0])
+        elif head == 'LCDPixel':
+            x, y, s = map(int, args)
+            screen[y * width + x] = s
+        elif head == 'LCDLine':
+            x1, y1, x2, y2 = map(int, args)
+            for y in range(y1, y2 + 1):
+                for x in range(x1, x2 + 1):
+                    screen[y * width + x] = fg
+    return screen
+
+
+def test_first_flush_clears_and_merges_spans():
+    from pyallcode.devices.canvas import Canvas
+    lcd = FakeLCD()
+    canvas = Canvas(lcd)
+    canvas.rect(0, 0, 127, 31)
+    canvas.pixel(60, 15)
+    assert canvas.flush() == len(lcd.sent)
+    assert lcd.sent[0] == 'LCDClear'
+    # two edges as horizontal lines, two as vertical lines, one pixel, one colour setup
+    assert sorted(lcd.sent[1:]) == sorted([
+        'LCDOptions 1 0 0', 'LCDPixel 60 15 1',
+        'LCDLine 0 0 127 0', 'LCDLine 0 31 127 31', 'LCDLine 0 1 0 30', 'LCDLine 127 1 127 30',
+    ])
+    assert _replay(lcd.sent) == canvas._pixels
+
+
+def test_unchanged_frame_sends_nothing_and_changes_are_minimal():
+    from pyallcode.devices.canvas import Canvas
+    lcd = FakeLCD()
+    canvas = Canvas(lcd)
+
+    def frame(level):
+        canvas.clear()
+        canvas.rect(0, 0, 127, 31)
+        canvas.rect(2, 20, 2 + level, 28, fill=True)   # a bar graph
+        canvas.text(0, 2, f'IR {level:4d}')
+
+    frame(50)
+    canvas.flush()
+    sent = len(lcd.sent)
+    frame(50)
+    assert canvas.flush() == 0
+
+    frame(40)                       # bar shrinks by 10 columns
+    n = canvas.flush()
+    new = lcd.sent[sent:]
+    assert n == len(new) < 15
+    assert 'LCDPrint 0 2 IR   40' in new
+    assert 'LCDClear' not in new
+    pixels_only = [c for c in lcd.sent if not c.startswith('LCDPrint')]
+    shown = _replay(pixels_only)
+    mask = canvas._text_mask()
+    assert all(shown[i] == canvas._pixels[i] for i in range(len(shown)) if not mask[i])
+
+
+def test_removed_and_shorter_text_is_blanked_with_spaces():
+    from pyallcode.devices.canvas import Canvas
+    lcd = FakeLCD()
+    canvas = Canvas(lcd)
+    canvas.text(0, 0, 'hello')
+    canvas.text(0, 8, 'bye')
+    canvas.flush()
+    lcd.sent.clear()
+    canvas.text(0, 0, 'hi')
+    canvas.text(0, 8, '')
+    canvas.flush()
+    assert lcd.sent == ['LCDPrint 0 0 hi   ', 'LCDPrint 0 8    ']
+
+
+def test_full_redraw_is_used_when_cheaper_than_the_diff():
+    from pyallcode.devices.canvas import Canvas
+    lcd = FakeLCD()
+    canvas = Canvas(lcd)
+    for y in range(0, 32, 2):
+        for x in range(0, 128, 2):
+            canvas.pixel(x, y)
+    canvas.flush()
+    lcd.sent.clear()
+    canvas.clear()
+    canvas.pixel(5, 5)
+    assert canvas.diff() == canvas.diff()
+    canvas.flush()
+    assert lcd.sent == ['LCDClear', 'LCDPixel 5 5 1']
+
+
+def test_lcd_canvas_uses_the_device_connection():
+    from pyallcode.devices.lcd import LCD
+    lcd = LCD(FakeLCD())
+    canvas = lcd.canvas()
+    canvas.line(0, 0, 3, 3)
+    canvas.flush()
+    assert lcd.conn.sent[0] == 'LCDClear' and canvas.commands_sent == len(lcd.conn.sent)
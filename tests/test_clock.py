@@ -0,0 +1,102 @@
+import time
+
+
+def test_virtual_clock_sleep_is_instant_and_runs_timers_in_order():
+    from pyallcode.comm.clock import VirtualClock
+
+    clock = VirtualClock()
+    fired = []
+    tid = clock.call_every(0.25, lambda: fired.append(('a', clock.now())))
+    clock.call_every(0.5, lambda: fired.append(('b', clock.now())))
+
+    t0 = time.perf_counter()
+    clock.sleep(600.0)
+    assert time.perf_counter() - t0 < 1.0
+    assert clock.now() == 600.0
+    assert fired[:4] == [('a', 0.0), ('b', 0.0), ('a', 0.25), ('a', 0.5)]
+    assert len([f for f in fired if f[0] == 'a']) == 2401
+
+    clock.cancel(tid)
+    fired.clear()
+    clock.advance(1.0)
+    assert {name for name, _ in fired} == {'b'}
+
+
+def test_virtual_clock_silent_advance_defers_timers():
+    from pyallcode.comm.clock import VirtualClock
+
+    clock = VirtualClock(start=10.0)
+    fired = []
+    clock.call_every(1.0, lambda: fired.append(clock.now()))
+    clock.advance_to(13.5, run_timers=False)
+    assert fired == [] and clock.now() == 13.5
+    clock.advance(0.0)
+    clock.advance(0.1)
+    # the late timer fires once and re-anchors rather than bursting
+    assert fired == [13.5]
+
+
+def test_connection_clock_defaults_to_system_clock():
+    from pyallcode.comm.clock import system_clock, VirtualClock
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.transport import SimulatedTransport
+
+    assert Connection(SimulatedTransport(echo=False)).clock is system_clock
+    clock = VirtualClock()
+    assert Connection(SimulatedTransport(echo=False, clock=clock)).clock is clock
+
+
+def _virtual_robot(clock):
+    from pyallcode.robot import Robot
+    from pyallcode.comm.transport import SimulatedTransport
+    from pyallcode.sim.world import World
+
+    bot = Robot(autoconn=False)
+    bot.transport = bot.conn.transport = SimulatedTransport(world=World(), seed=1, echo=False, clock=clock)
+    bot.transport.open('SIM')
+    return bot
+
+
+def test_mission_runs_in_virtual_time(capsys):
+    from pyallcode.comm.clock import VirtualClock
+
+    clock = VirtualClock()
+    bot = _virtual_robot(clock)
+    robot = bot.transport.robot
+
+    t0 = time.perf_counter()
+    bot.forwards(500)                      # 10 s at 50 mm/s
+    assert 10.0 <= bot.clock.now() < 10.1
+    bot.left(90)                           # 2 s at 45 deg/s
+    bot.set_motors(25, 25)                 # 50 mm/s
+    clock.sleep(600.0)
+    bot.speaker.play_note(440, 500)
+    assert time.perf_counter() - t0 < 2.0
+    assert 612.5 <= clock.now() < 612.7
+    # ten minutes at 50 mm/s would leave the arena: the robot hit the wall
+    robot.sync()
+    assert robot.collisions == 1
+    assert robot.x < 100 and abs(robot.y - 1500) < 1e-6
+
+
+def test_sampler_uses_virtual_clock_timer():
+    from pyallcode.comm.clock import VirtualClock
+    from pyallcode.sampler import Sampler
+
+    clock = VirtualClock()
+    bot = _virtual_robot(clock)
+    sampler = Sampler(bot.conn, ['ir2', 'accel_z'], rate_hz=50, capacity=256)
+    assert sampler.clock is clock
+    sampler.start()
+    assert sampler.running
+    clock.sleep(1.01)
+    sampler.stop()
+    assert not sampler.running
+
+    times, values = sampler.window()
+    assert len(times) == 51
+    # each burst costs simulated command time but ticks stay on the 20 ms grid
+    assert abs(times[25] - 0.5) < 1e-9
+    assert list(sampler.stream()) == []
+    clock.sleep(1.0)
+    assert len(sampler.buffer) == 51
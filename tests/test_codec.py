@@ -0,0 +1,53 @@
+import pytest
+
+
+def test_ascii_codec_encodes_with_prebuilt_prefixes():
+    from pyallcode.comm.codec import AsciiCodec, ascii_codec
+
+    assert ascii_codec.prefix('ReadIR') is ascii_codec.prefix('ReadIR')
+    assert ascii_codec.encode_call('ReadIR', (3,)) == b'ReadIR 3\n'
+    assert ascii_codec.encode_call('LCDRect', (0, 1, -2, 3)) == b'LCDRect 0 1 -2 3\n'
+    assert ascii_codec.encode_call('ReadLight') == b'ReadLight\n'
+    assert AsciiCodec().encode('LEDOn 1') == b'LEDOn 1\n'
+    assert AsciiCodec().encode('LEDOn 1\n') == b'LEDOn 1\n'
+    assert AsciiCodec.label('ServoSetPos 1 90\n') == 'ServoSetPos'
+
+
+@pytest.mark.parametrize('line, expected', [
+    (b'123\n', 123), (b' -42\r\n', -42), (memoryview(b'7\n'), 7),
+    (bytearray(b'9\n'), 9), (b'\xff88\n', 88), (b'', None), (b'\r\n', None),
+])
+def test_ascii_codec_decodes_reply_bytes(line, expected):
+    from pyallcode.comm.codec import ascii_codec
+
+    assert ascii_codec.decode_int(line) == expected
+
+
+def test_ascii_codec_rejects_non_integers():
+    from pyallcode.comm.codec import ascii_codec
+
+    with pytest.raises(ValueError):
+        ascii_codec.decode_int(b'OK\n')
+
+
+def test_connection_uses_its_codec():
+    from pyallcode.comm.codec import AsciiCodec
+    from pyallcode.comm.connection import Connection
+    from tests.conftest import ReplyingTransport
+
+    class CountingCodec(AsciiCodec):
+        encoded = decoded = 0
+
+        def encode(self, command):
+            CountingCodec.encoded += 1
+            return super().encode(command)
+
+        def decode_int(self, line):
+            CountingCodec.decoded += 1
+            return super().decode_int(line)
+
+    t = ReplyingTransport(lambda cmd: 5)
+    conn = Connection(t, codec=CountingCodec())
+    assert conn.execute('ReadMic') == 5
+    assert conn.execute_many(['ReadIR 0', 'ReadIR 1']) == [5, 5]
+    assert CountingCodec.encoded == 3 and CountingCodec.decoded == 3
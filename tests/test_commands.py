@@ -0,0 +1,63 @@
+import pytest
+
+
+def test_command_calls_are_strings_with_payload():
+    from pyallcode.comm.commands import LCD_PRINT, READ_IR, READ_LIGHT, SET_MOTORS
+
+    call = SET_MOTORS(40, -40)
+    assert call == 'SetMotors 40 -40'
+    assert call.payload == b'SetMotors 40 -40\n' and call.head == 'SetMotors'
+    assert READ_LIGHT() == 'ReadLight' and READ_LIGHT().payload == b'ReadLight\n'
+    assert READ_IR(2.0) == 'ReadIR 2'
+    assert LCD_PRINT(1, 2, 'Hi there').payload == b'LCDPrint 1 2 Hi there\n'
+
+
+def test_command_calls_are_reused_from_cache():
+    from pyallcode.comm.commands import Command, READ_IR
+
+    assert READ_IR(3) is READ_IR(3)
+    small = Command('ServoSetPos', 2, cache_size=2)
+    first = small(1, 10)
+    small(1, 20)
+    small(1, 30)          # cache full: cleared and restarted
+    assert small(1, 10) is not first and small(1, 10) == first
+
+
+def test_text_argument_is_cached_by_its_printed_form():
+    from pyallcode.comm.commands import LCD_PRINT
+
+    # Equal as dict keys, but each is sent as Python prints it
+    assert LCD_PRINT(0, 0, 1) == 'LCDPrint 0 0 1'
+    assert LCD_PRINT(0, 0, True) == 'LCDPrint 0 0 True'
+    assert LCD_PRINT(0, 0, 1.0).payload == b'LCDPrint 0 0 1.0\n'
+    assert LCD_PRINT(0, 0, 1.0) is LCD_PRINT(0, 0, 1.0)
+
+
+def test_command_checks_argument_count():
+    from pyallcode.comm.commands import READ_IR, CARD_OPEN
+
+    with pytest.raises(TypeError):
+        READ_IR()
+    with pytest.raises(TypeError):
+        CARD_OPEN()
+
+
+def test_registry_covers_firmware_heads():
+    from pyallcode.comm.codec import FIRMWARE_HEADS
+    from pyallcode.comm.commands import COMMANDS
+
+    assert set(COMMANDS) == set(FIRMWARE_HEADS)
+
+
+def test_connection_writes_call_payload_without_reencoding():
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.commands import READ_IR, LED_ON
+    from tests.conftest import ReplyingTransport
+
+    t = ReplyingTransport(lambda cmd: 9 if cmd.startswith('Read') else None)
+    conn = Connection(t)
+    call = READ_IR(4)
+    assert conn.execute(call) == 9
+    conn.execute(LED_ON(1), expect_response=False)
+    assert conn.execute_many([READ_IR(0), READ_IR(1)]) == [9, 9]
+    assert t._writes == [b'ReadIR 4\n', b'LEDOn 1\n', b'ReadIR 0\n', b'ReadIR 1\n']
@@ -109,3 +109,389 @@ def test_read_value_all_invalid_returns_minus_one():
 
     t._lines = [b'bad\n', b'also bad\n']
     assert conn.read_value('Label', attempts=2) == -1
+
+
+def test_submit_pipelines_writes_and_matches_replies_fifo():
+    from pyallcode.comm.connection import Connection
+    from tests.conftest import ReplyingTransport
+    t = ReplyingTransport(lambda cmd: int(cmd.split()[1]) * 10 if cmd.startswith('ReadIR') else None)
+    conn = Connection(t)
+
+    handles = [conn.submit(f'ReadIR {i}') for i in range(8)]
+    # All commands are written before any reply is read
+    assert len(t._writes) == 8
+    assert conn.in_flight == 8
+    assert not handles[0].done()
+
+    assert handles[3].result() == 30
+    # Resolving a later handle reads the earlier replies first
+    assert handles[0].done() and handles[0].result() == 0
+    assert [h.result() for h in handles] == [i * 10 for i in range(8)]
+    assert conn.in_flight == 0
+
+
+def test_submit_fire_and_forget_not_queued():
+    from pyallcode.comm.connection import Connection
+    from tests.conftest import ReplyingTransport
+    t = ReplyingTransport(lambda cmd: 5 if cmd == 'ReadLight' else None)
+    conn = Connection(t)
+
+    led = conn.submit('LEDOn 1', expect_response=False)
+    light = conn.submit('ReadLight')
+    assert led.done() and led.result() is None
+    assert conn.in_flight == 1
+    assert light.result() == 5
+
+
+def test_submit_respects_max_in_flight():
+    from pyallcode.comm.connection import Connection
+    from tests.conftest import ReplyingTransport
+    t = ReplyingTransport(lambda cmd: 1)
+    conn = Connection(t, max_in_flight=2)
+
+    handles = [conn.submit('ReadMic') for _ in range(5)]
+    assert conn.in_flight == 2
+    assert all(h.done() for h in handles[:3])
+
+
+def test_execute_many_and_execute_drain_in_flight():
+    from pyallcode.comm.connection import Connection
+    from tests.conftest import ReplyingTransport
+    t = ReplyingTransport(lambda cmd: len(cmd))
+    conn = Connection(t)
+
+    assert conn.execute_many(['ReadLine 0', 'ReadLight']) == [10, 9]
+    pending = conn.submit('ReadIR 1')
+    # A plain execute queues behind outstanding replies and resolves them
+    assert conn.execute('ReadMic') == 7
+    assert pending.result() == 8
+
+
+def test_execute_is_serialised_across_threads():
+    import threading
+    import time
+    from pyallcode.comm.connection import Connection
+    from tests.conftest import ReplyingTransport
+
+    class SlowTransport(ReplyingTransport):
+        def readline(self):
+            time.sleep(0.001)  # widen the window for interleaving
+            return super().readline()
+
+    t = SlowTransport(lambda cmd: int(cmd.split()[1]))
+    conn = Connection(t)
+    errors = []
+
+    def worker(base):
+        for i in range(20):
+            if conn.execute(f'ReadIR {base + i}') != base + i:
+                errors.append(base + i)
+
+    threads = [threading.Thread(target=worker, args=(b,)) for b in (0, 100, 200)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert errors == []
+
+
+class _ResettableTransport(DummyTransport):
+    def __init__(self):
+        super().__init__()
+        self.resets = 0
+        self.polls = 0
+    def reset_input_buffer(self):
+        self.resets += 1
+        self._lines.clear()
+    @property
+    def in_waiting(self):
+        self.polls += 1
+        return len(self._lines)
+
+
+def test_default_flush_policy_does_no_io_until_a_read_fails():
+    from pyallcode.comm.connection import Connection
+    t = _ResettableTransport()
+    conn = Connection(t)
+    assert conn.flush_policy == 'on_error'
+
+    t._lines = [b'1\n']
+    assert conn.execute('ReadMic') == 1
+    conn.execute('LEDOn 1', expect_response=False)
+    assert t.resets == 0 and t.polls == 0
+
+    assert conn.execute('ReadMic') == -1     # timed out
+    t._lines = [b'99\n']                      # the late reply shows up
+    conn.execute('LEDOn 2', expect_response=False)
+    assert t.resets == 1 and t._lines == []
+    conn.execute('LEDOn 3', expect_response=False)
+    assert t.resets == 1
+
+
+def test_always_and_reset_policies_flush_before_every_command():
+    from pyallcode.comm.connection import Connection
+    t = DummyTransport()
+    conn = Connection(t, flush_policy='always')
+    t._lines = [b'5\n', b'6\n']
+    conn.execute('LEDOn 1', expect_response=False)
+    assert t._lines == [] and conn.stale_replies == 2
+
+    r = _ResettableTransport()
+    conn = Connection(r, flush_policy='reset')
+    conn.execute('LEDOn 1', expect_response=False)
+    conn.execute('LEDOn 2', expect_response=False)
+    assert r.resets == 2 and r.polls == 0
+
+    # Without reset_input_buffer the reset policy never reads lines
+    t = DummyTransport()
+    t._lines = [b'5\n']
+    Connection(t, flush_policy='reset').execute('LEDOn 1', expect_response=False)
+    assert t._lines == [b'5\n']
+
+
+def test_tagged_policy_discards_late_reply_after_timeout():
+    from pyallcode.comm.connection import Connection
+    t = DummyTransport()
+    conn = Connection(t, flush_policy='tagged')
+
+    assert conn.execute('ReadIR 0') == -1      # reply did not arrive in time
+    t._lines = [b'111\n', b'222\n']            # late reply, then ours
+    assert conn.execute('ReadIR 1') == 222
+    assert conn.stale_replies == 1
+
+
+def test_tagged_policy_recovers_when_earlier_reply_was_lost():
+    from pyallcode.comm.connection import Connection
+    t = DummyTransport()
+    conn = Connection(t, flush_policy='tagged')
+
+    assert conn.execute('ReadIR 0') == -1      # reply lost for good
+    t._lines = [b'222\n']                      # only our reply arrives
+    assert conn.execute('ReadIR 1') == 222
+    assert conn.stale_replies == 0
+    t._lines = [b'333\n']
+    assert conn.execute('ReadIR 2') == 333
+
+
+def test_invalid_flush_policy_is_rejected():
+    import pytest
+    from pyallcode.comm.connection import Connection
+    with pytest.raises(ValueError):
+        Connection(DummyTransport(), flush_policy='sometimes')
+
+
+class _TimedTransport(DummyTransport):
+    """Serves each reply once the virtual clock reaches its arrival time."""
+    def __init__(self, clock, delays):
+        super().__init__()
+        self.clock = clock
+        self._delays = list(delays)
+        self._timed = []
+    def write(self, data):
+        super().write(data)
+        if self._delays:
+            delay = self._delays.pop(0)
+            if delay is not None:
+                self._timed.append((self.clock.now() + delay, b'42\n'))
+    def _arrive(self):
+        while self._timed and self._timed[0][0] <= self.clock.now():
+            self._lines.append(self._timed.pop(0)[1])
+    def readline(self):
+        self._arrive()
+        return super().readline()
+    @property
+    def in_waiting(self):
+        self._arrive()
+        return len(self._lines)
+
+
+def test_timeout_returns_as_soon_as_the_reply_arrives():
+    from pyallcode.comm.clock import VirtualClock
+    from pyallcode.comm.connection import Connection
+    clock = VirtualClock()
+    conn = Connection(_TimedTransport(clock, [2.5]))
+    assert conn.execute('Forwards 100', timeout=3.0) == 42
+    assert 2.5 <= clock.now() < 2.55
+
+
+def test_timeout_gives_up_at_the_deadline():
+    from pyallcode.comm.clock import VirtualClock
+    from pyallcode.comm.connection import Connection
+    clock = VirtualClock()
+    conn = Connection(_TimedTransport(clock, [None]), timeout=0.05)
+    assert conn.execute('ReadIR 2') == -1
+    assert abs(clock.now() - 0.05) < 1e-9
+
+
+def test_submit_deadline_is_measured_from_send():
+    from pyallcode.comm.clock import VirtualClock
+    from pyallcode.comm.connection import Connection
+    clock = VirtualClock()
+    conn = Connection(_TimedTransport(clock, [0.1, 0.15]))
+    first = conn.submit('ReadIR 0', timeout=0.2)
+    second = conn.submit('ReadIR 1', timeout=0.2)
+    assert (first.result(), second.result()) == (42, 42)
+    assert clock.now() < 0.2
+
+
+class _InOrderTransport(DummyTransport):
+    """Answers commands one at a time, like the firmware: each reply comes
+    ``durations[head]`` seconds after the previous one (or after its write)."""
+    def __init__(self, clock, durations, replies):
+        super().__init__()
+        self.clock = clock
+        self.durations = durations
+        self.replies = replies
+        self._busy_until = 0.0
+        self._timed = []
+    def write(self, data):
+        super().write(data)
+        head = data.decode().split()[0]
+        self._busy_until = max(self._busy_until, self.clock.now()) + self.durations[head]
+        self._timed.append((self._busy_until, f'{self.replies[head]}\n'.encode()))
+    def _arrive(self):
+        while self._timed and self._timed[0][0] <= self.clock.now():
+            self._lines.append(self._timed.pop(0)[1])
+    def readline(self):
+        self._arrive()
+        return super().readline()
+    @property
+    def in_waiting(self):
+        self._arrive()
+        return len(self._lines)
+
+
+def test_reply_timeout_starts_when_the_reply_before_it_resolves():
+    from pyallcode.comm.clock import VirtualClock
+    from pyallcode.comm.commands import FORWARDS, READ_IR
+    from pyallcode.comm.connection import Connection
+    clock = VirtualClock()
+    t = _InOrderTransport(clock, {'Forwards': 1.0, 'ReadIR': 0.1}, {'Forwards': 0, 'ReadIR': 1234})
+    conn = Connection(t, timeout=0.2)
+    move = conn.submit(FORWARDS(10), True, timeout=2.0)
+    # The read is answered only after the move, well past 0.2 s after it was sent
+    assert conn.execute(READ_IR(2)) == 1234
+    assert move.result() == 0 and conn.stale_replies == 0
+    assert 1.1 <= clock.now() < 1.15
+
+
+def test_retry_policy_resends_reads_but_not_moves():
+    from pyallcode.comm.clock import VirtualClock
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.retry import RetryPolicy
+    clock = VirtualClock()
+    t = _TimedTransport(clock, [None, None, 0.01])
+    conn = Connection(t, timeout=0.1, retry=RetryPolicy(retries=2, backoff=0.01, jitter=0))
+    assert conn.execute('ReadIR 2') == 42
+    assert t._writes == [b'ReadIR 2\n'] * 3
+    # 0.1 + 0.01 + 0.1 + 0.02 + 0.01, plus polling granularity
+    assert 0.24 <= clock.now() < 0.25
+
+    t = _TimedTransport(clock, [None])
+    conn.transport = t
+    assert conn.execute('Forwards 100') == -1
+    assert t._writes == [b'Forwards 100\n']
+
+
+def test_retry_policy_applies_while_a_move_is_in_flight():
+    from pyallcode.comm.clock import VirtualClock
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.retry import RetryPolicy
+    clock = VirtualClock()
+    t = _TimedTransport(clock, [0.05, None, 0.01])
+    conn = Connection(t)
+    move = conn.submit('Forwards 100', timeout=1.0)
+    flushes = []
+    flush = conn.flush_input
+    conn.flush_input = lambda: (flushes.append(clock.now()), flush())
+    # Queued behind the move; the lost reply is resent once the move is done
+    assert conn.execute('ReadIR 2', timeout=0.1, retry=RetryPolicy(retries=1, backoff=0.01, jitter=0)) == 42
+    assert move.done() and move.result() == 42 and not move.timed_out
+    assert t._writes == [b'Forwards 100\n', b'ReadIR 2\n', b'ReadIR 2\n']
+    # The timed-out read marks the input dirty, so the resend flushes first
+    assert len(flushes) == 1
+
+
+def test_poll_resolves_only_replies_that_have_arrived():
+    from pyallcode.comm.connection import Connection
+    t = DummyTransport()
+    conn = Connection(t)
+    first = conn.submit('Forwards 100')
+    second = conn.submit('ReadIR 2')
+    assert conn.poll() == 0 and not first.poll()
+
+    t._lines = [b'1\n']
+    assert first.poll() and first.result() == 1
+    assert not second.done() and conn.in_flight == 1
+    t._lines = [b'7\n']
+    assert conn.poll() == 1 and second.result() == 7
+
+
+class _ByteSerial:
+    """Fake pyserial port whose readline returns a partial line at its timeout."""
+    def __init__(self, *_, port=None, timeout=None, **__):
+        self.is_open = True
+        self._timeout = timeout
+        self.reconfigured = 0
+        self.buf = b''
+        self.waited = 0.0
+    @property
+    def timeout(self):
+        return self._timeout
+    @timeout.setter
+    def timeout(self, value):
+        # pyserial reconfigures the port on every assignment
+        self.reconfigured += 1
+        self._timeout = value
+    def write(self, data):
+        pass
+    def read(self, n=1):
+        out, self.buf = self.buf[:n], self.buf[n:]
+        return out
+    def readline(self):
+        if b'\n' not in self.buf:
+            self.waited += self._timeout
+            out, self.buf = self.buf, b''
+            return out
+        line, _, self.buf = self.buf.partition(b'\n')
+        return line + b'\n'
+    @property
+    def in_waiting(self):
+        return len(self.buf)
+
+
+def test_partial_serial_line_does_not_outlast_the_deadline(monkeypatch):
+    import pyallcode.comm.transport as transport_mod
+    from pyallcode.comm.connection import Connection
+    monkeypatch.setattr(transport_mod.serial, 'Serial', _ByteSerial)
+    t = transport_mod.SerialTransport(timeout=1.0)
+    t.open('COM5')
+    conn = Connection(t, timeout=0.05)
+    t.raw.buf = b'4'
+    # Only half the reply has arrived: the read waits no longer than the deadline
+    assert conn.execute('ReadIR 2') == -1
+    assert t.raw.waited == 0 and t.raw.reconfigured == 0
+
+    # The timeout flushes the stale half before the next command
+    pending = conn.submit('ReadIR 3', timeout=None)
+    t.raw.buf += b'4'
+    assert conn.poll() == 0 and not pending.done()
+    t.raw.buf += b'2\n'
+    # The kept half is joined with the rest rather than read as its own reply
+    assert conn.poll() == 1 and pending.result() == 42
+
+    # Two replies taken off the port in one read are both served
+    first, second = conn.submit('ReadIR 4', timeout=0.05), conn.submit('ReadIR 5', timeout=0.05)
+    t.raw.buf += b'5\n6\n'
+    assert (first.result(), second.result()) == (5, 6)
+    assert t.raw.waited == 0 and t.raw.reconfigured == 0
+
+
+def test_send_many_writes_commands_in_one_transport_write():
+    from pyallcode.comm.commands import LED_ON
+    from pyallcode.comm.connection import Connection
+    t = DummyTransport()
+    conn = Connection(t)
+    assert conn.send_many([LED_ON(1), 'LEDOff 2']) == len(b'LEDOn 1\nLEDOff 2\n')
+    assert t._writes == [b'LEDOn 1\nLEDOff 2\n']
+    assert conn.send_many([]) == 0 and len(t._writes) == 1
@@ -0,0 +1,90 @@
+from tests.conftest import ReplyingTransport
+
+
+def _robot(values):
+    """A connection whose replies come from the mutable ``values`` dict."""
+    from pyallcode.comm.clock import VirtualClock
+    from pyallcode.comm.connection import Connection
+    t = ReplyingTransport(lambda cmd: values.get(cmd))
+    t.clock = VirtualClock()
+    return t, Connection(t)
+
+
+def test_idle_monitor_sends_nothing():
+    from pyallcode.events import EventMonitor
+    t, conn = _robot({})
+    with EventMonitor(conn, rate_hz=50) as monitor:
+        conn.clock.advance(1.0)
+        assert monitor.polls == 0
+    assert t._writes == []
+
+
+def test_shared_commands_are_read_once_per_tick():
+    from pyallcode.events import EventMonitor
+    values = {'ReadLine 0': 0, 'ReadIR 2': 100}
+    t, conn = _robot(values)
+    monitor = EventMonitor(conn)
+    monitor.on_line(0, lambda e: None)
+    monitor.on_line(0, lambda e: None)
+    monitor.on_ir(2, 1000, lambda e: None)
+    monitor.poll()
+    assert sorted(t._writes) == [b'ReadIR 2\n', b'ReadLine 0\n']
+
+
+def test_edges_are_reported_once_and_cancel_stops_polling():
+    from pyallcode.events import EventMonitor
+    values = {'ReadLine 1': 0}
+    t, conn = _robot(values)
+    monitor = EventMonitor(conn, rate_hz=10)
+    seen = []
+    sub = monitor.on_line(1, seen.append)
+    monitor.start()
+    conn.clock.advance(0.25)          # baseline, no event
+    values['ReadLine 1'] = 1
+    conn.clock.advance(0.3)
+    values['ReadLine 1'] = 0
+    conn.clock.advance(0.3)
+    assert [(e.name, e.previous, e.state) for e in seen] == [('line 1', False, True), ('line 1', True, False)]
+
+    sub.cancel()
+    writes = len(t._writes)
+    conn.clock.advance(1.0)
+    assert len(t._writes) == writes
+    monitor.stop()
+    assert not monitor.running
+
+
+def test_button_debounce_ignores_short_glitches():
+    from pyallcode.events import EventMonitor
+    values = {'ReadSwitch 0': 0}
+    t, conn = _robot(values)
+    monitor = EventMonitor(conn)
+    seen = []
+    monitor.on_button(0, seen.append, debounce=0.05)
+    clock = conn.clock
+    monitor.poll()
+    values['ReadSwitch 0'] = 1          # a one-sample bounce
+    monitor.poll()
+    values['ReadSwitch 0'] = 0
+    clock.advance(0.01)
+    monitor.poll()
+    assert seen == []
+
+    values['ReadSwitch 0'] = 1          # a real press
+    for _ in range(4):
+        monitor.poll()
+        clock.advance(0.02)
+    assert [e.state for e in seen] == [True]
+
+
+def test_ir_threshold_uses_hysteresis():
+    from pyallcode.events import EventMonitor
+    values = {'ReadIR 2': 0}
+    t, conn = _robot(values)
+    monitor = EventMonitor(conn)
+    seen = []
+    monitor.on_ir(2, 1000, seen.append, hysteresis=100)
+    for reading in (500, 1000, 950, 1010, 901, 899, 950):
+        values['ReadIR 2'] = reading
+        monitor.poll()
+    assert [(e.state, e.value) for e in seen] == [(True, 1000), (False, 899)]
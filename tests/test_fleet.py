@@ -0,0 +1,118 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+def _fleet(n=3, **kw):
+    from pyallcode.sim.fleet import Fleet
+    from pyallcode.sim.world import World
+
+    world = kw.pop('world', World(width=1000, height=1000))
+    return Fleet(n, world=world, seed=1, **kw)
+
+
+def test_fleet_step_matches_single_robot_kinematics():
+    from pyallcode.sim.engine import SimRobot
+
+    fleet = _fleet(2, positions=[(500, 500, 0), (500, 500, 90)], sensor_noise=0)
+    fleet.handle(0, 'SetMotors 30 40')
+    fleet.handle(1, 'SetMotors 20 20')
+    fleet.step(1.0)
+
+    single = SimRobot(fleet.world, x=500, y=500, heading=0, command_time=0)
+    single.handle('SetMotors 30 40')
+    single.step(1.0)
+    assert math.isclose(fleet.x[0], single.x, abs_tol=1e-6)
+    assert math.isclose(fleet.heading[0], single.heading, abs_tol=1e-6)
+    assert math.isclose(fleet.y[1], 540.0) and math.isclose(fleet.x[1], 500.0)
+
+
+def test_fleet_stops_robots_at_walls():
+    fleet = _fleet(2, positions=[(900, 500, 0), (500, 500, 180)])
+    fleet.handle(0, 'SetMotors 100 100')
+    fleet.handle(1, 'SetMotors 100 100')
+    fleet.step(2.0)
+    assert fleet.collisions[0] == 1 and fleet.left_speed[0] == 0
+    assert fleet.x[0] <= 1000 - fleet.radius + 2
+    assert math.isclose(fleet.x[1], 100.0, abs_tol=2)
+
+
+def test_fleet_ir_and_line_sensing_matches_single_robot():
+    from pyallcode.sim.engine import SimRobot
+    from pyallcode.sim.world import World
+
+    world = World(width=1000, height=1000, walls=[[600, 0, 600, 1000]], lines=[[0, 539, 1000, 539]])
+    poses = [(500, 500, 90), (450, 300, 0), (100, 100, 45)]
+    fleet = _fleet(3, world=world, positions=poses, sensor_noise=0)
+    for i, (x, y, h) in enumerate(poses):
+        single = SimRobot(world, x=x, y=y, heading=h, sensor_noise=0)
+        assert fleet.ir[i].tolist() == [single.read_ir(k) for k in range(8)]
+        assert fleet.line[i].tolist() == [single.read_line(0), single.read_line(1)]
+
+
+def test_fleet_drives_unmodified_robot_code():
+    fleet = _fleet(4, positions=[(200 + 150 * i, 200, 90) for i in range(4)], sensor_noise=0)
+    bots = fleet.robots()
+    for bot in bots:
+        assert bot.get_api_version() == 7
+        bot.set_motors(25, 25)
+    fleet.step(1.0)
+    assert np.allclose(fleet.y, 250.0)
+
+    assert bots[2].forwards(100) == 1
+    assert math.isclose(fleet[2].y, 350.0)
+    assert bots[2].ir_sensors.read(2) == int(fleet.ir[2, 2])
+    bots[0].leds.write(0x0F)
+    assert fleet.leds.tolist() == [0x0F, 0, 0, 0]
+    for bot in bots:
+        bot.close()
+
+
+def test_fleet_is_deterministic_and_places_robots_clear_of_walls():
+    a, b = _fleet(200), _fleet(200)
+    assert np.array_equal(a.x, b.x) and np.array_equal(a.ir, b.ir)
+    assert min(a.world.clearance(x, y) for x, y in zip(a.x, a.y)) >= a.radius
+
+
+def test_fleet_rejects_mismatched_positions():
+    with pytest.raises(ValueError):
+        _fleet(2, positions=[(0, 0, 0)])
+
+
+def test_fleet_robots_share_the_single_robot_protocol():
+    from pyallcode.sim.engine import SimRobot
+
+    fleet = _fleet(2, positions=[(500, 500, 90), (500, 500, 90)], sensor_noise=0)
+    single = SimRobot(fleet.world, x=500, y=500, heading=90, sensor_noise=0, command_time=0)
+    for command in ('LEDOn 3', 'LEDOff 3', 'LEDOn 1', 'ReadAxis 2', 'GetBatteryVoltage',
+                    'CardCreate A.BIN', 'CardWriteByte 7', 'CardOpen A.BIN',
+                    'CardReadByte', 'CardReadByte', 'ServoSetPos 1 90', 'LCDClear', 'Forwards 20'):
+        assert fleet.handle(0, command) == single.handle(command), command
+    assert fleet.leds[0] == single.leds == 2
+    # Each robot has its own card
+    assert bytes(fleet.card(0).files['A.BIN']) == b'\x07' and not fleet.card(1).files
+
+
+def test_fleet_robots_run_on_the_fleet_clock():
+    from pyallcode.comm.clock import clock_of
+    from pyallcode.sampler import Sampler
+
+    fleet = _fleet(1, positions=[(500, 500, 0)], sensor_noise=0)
+    bot = fleet.robot(0)
+    assert fleet.transport(0).clock is fleet.clock and clock_of(bot.conn) is fleet.clock
+    bot.set_motors(50, 50)
+    fleet.step(0.5)
+    assert fleet.clock.now() == pytest.approx(0.5)
+    moved = float(fleet.x[0])
+    # Time slept on the clock is caught up with before the next command
+    fleet.clock.sleep(0.5)
+    bot.leds.write(1)
+    assert fleet.time == pytest.approx(1.0) and float(fleet.x[0]) > moved
+
+    with Sampler(bot.conn, ['ReadAxis 0'], rate_hz=10) as sampler:
+        fleet.step(0.25)
+    times, _ = sampler.window()
+    assert list(times) == pytest.approx([1.0, 1.1, 1.2])
+    bot.close()
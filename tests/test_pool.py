@@ -0,0 +1,134 @@
+from tests.conftest import DummyTransport
+
+
+def _patch_serial(monkeypatch, created):
+    from pyallcode.comm import pool as pool_mod
+
+    def make():
+        t = DummyTransport()
+        created.append(t)
+        return t
+    monkeypatch.setattr(pool_mod, 'SerialTransport', make)
+    monkeypatch.delenv('PYALLCODE_TRANSPORT', raising=False)
+    return pool_mod
+
+
+def test_pool_shares_and_refcounts_connection(monkeypatch):
+    created = []
+    pool_mod = _patch_serial(monkeypatch, created)
+    pool = pool_mod.ConnectionPool()
+
+    a = pool.acquire('/dev/ttyUSB0')
+    b = pool.acquire('/dev/ttyUSB0')
+    assert a is b
+    assert len(created) == 1 and created[0].opened_with == '/dev/ttyUSB0'
+    assert pool.port_of(a) == '/dev/ttyUSB0'
+
+    pool.release(a)
+    assert created[0].closed is False
+    pool.release(b)
+    assert created[0].closed is True
+    assert pool.port_of(a) is None
+
+
+def test_pool_autodetects_once_and_reuses_registered(monkeypatch):
+    from pyallcode.comm.connection import Connection
+    created = []
+    pool_mod = _patch_serial(monkeypatch, created)
+    calls = []
+    monkeypatch.setattr(pool_mod, 'autodetect_robot_port', lambda: calls.append(1) or 'COM7')
+    pool = pool_mod.ConnectionPool()
+
+    robot_conn = Connection(DummyTransport())
+    pool.register('COM7', robot_conn)
+    assert pool.acquire() is robot_conn
+    assert created == []
+
+
+def test_devices_share_pooled_connection(monkeypatch):
+    from pyallcode.comm import pool as pool_mod
+    from pyallcode.devices.leds import LEDs
+    from pyallcode.devices.light import LightSensor
+    created = []
+    _patch_serial(monkeypatch, created)
+    monkeypatch.setattr(pool_mod, 'default_pool', pool_mod.ConnectionPool())
+    import pyallcode.devices.base as base_mod
+    monkeypatch.setattr(base_mod, 'default_pool', pool_mod.default_pool)
+
+    leds = LEDs(port='COM7')
+    light = LightSensor(port='COM7')
+    assert leds.conn is light.conn
+    assert len(created) == 1
+
+    leds.close()
+    assert created[0].closed is False
+    light.close()
+    assert created[0].closed is True
+
+
+def test_pool_falls_back_to_shared_simulated(monkeypatch):
+    from pyallcode.comm.transport import SimulatedTransport
+    created = []
+    pool_mod = _patch_serial(monkeypatch, created)
+    monkeypatch.setattr(pool_mod, 'autodetect_robot_port', lambda: None)
+    pool = pool_mod.ConnectionPool()
+
+    a = pool.acquire()
+    b = pool.acquire()
+    assert a is b and isinstance(a.transport, SimulatedTransport)
+    assert pool.port_of(a) == 'SIMULATED'
+
+
+def test_robot_and_devices_share_one_open_port(monkeypatch):
+    import pyallcode.devices.base as base_mod
+    import pyallcode.robot as robot_mod
+    from pyallcode.devices.leds import LEDs
+    created = []
+    pool_mod = _patch_serial(monkeypatch, created)
+    pool = pool_mod.ConnectionPool()
+    monkeypatch.setattr(base_mod, 'default_pool', pool)
+    monkeypatch.setattr(robot_mod, 'default_pool', pool)
+
+    leds = LEDs(port='COM7')
+    bot = robot_mod.Robot(autoconn=False)
+    bot.open('COM7')
+    assert bot.conn is leds.conn and bot.lcd.conn is leds.conn
+    assert len(created) == 1
+
+    bot.close()
+    assert created[0].closed is False
+    leds.close()
+    assert created[0].closed is True
+
+
+def test_pool_register_refuses_a_second_connection_for_a_port(monkeypatch):
+    import pytest
+    from pyallcode.comm.connection import Connection
+    created = []
+    pool_mod = _patch_serial(monkeypatch, created)
+    pool = pool_mod.ConnectionPool()
+    live = pool.acquire('COM7')
+    with pytest.raises(ValueError):
+        pool.register('COM7', Connection(DummyTransport()))
+    assert pool.acquire('COM7') is live
+
+
+def test_pool_simulated_fallback_does_not_claim_the_real_port(monkeypatch):
+    from pyallcode.comm.transport import SimulatedTransport
+    created = []
+    pool_mod = _patch_serial(monkeypatch, created)
+    pool = pool_mod.ConnectionPool()
+
+    class Failing(DummyTransport):
+        def open(self, port):
+            raise OSError('busy')
+
+    monkeypatch.setattr(pool_mod, 'SerialTransport', Failing)
+    fallback = pool.acquire('COM7')
+    assert isinstance(fallback.transport, SimulatedTransport)
+    assert pool.port_of(fallback) == 'SIMULATED-COM7'
+
+    # Once the port can be opened, the real connection is used
+    monkeypatch.setattr(pool_mod, 'SerialTransport', lambda: created.append(DummyTransport()) or created[-1])
+    real = pool.acquire('COM7')
+    assert real is not fallback and created[-1].opened_with == 'COM7'
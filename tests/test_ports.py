@@ -67,3 +67,141 @@ def test_find_robot_ports_custom_keywords(monkeypatch):
     assert len(found) == 1
     assert found[0]['device'] == 'COM3'
     assert 'description' in found[0] and 'hwid' in found[0]
+
+
+def _fake_probe(responsive, delay):
+    import time
+
+    def probe(port, write_timeout=0.25, read_timeout=0.75, cancel=None):
+        end = time.monotonic() + delay.get(port, 0.2)
+        while time.monotonic() < end:
+            if cancel is not None and cancel.is_set():
+                return False
+            time.sleep(0.005)
+        return port in responsive
+    return probe
+
+
+def test_autodetect_probes_ports_concurrently(monkeypatch):
+    import time
+    from pyallcode.comm import ports
+
+    devs = [f'/dev/ttyUSB{i}' for i in range(10)]
+    monkeypatch.setattr(ports, 'candidate_ports', lambda kw=None: devs)
+    monkeypatch.setattr(ports, 'probe_port_is_robot',
+                        _fake_probe({'/dev/ttyUSB7'}, {'/dev/ttyUSB7': 0.05}))
+
+    start = time.monotonic()
+    assert ports.autodetect_robot_port() == '/dev/ttyUSB7'
+    # first responder wins well before the slow probes finish
+    assert time.monotonic() - start < 0.19
+
+
+def test_autodetect_ports_returns_all_responsive_in_rank_order(monkeypatch):
+    from pyallcode.comm import ports
+
+    devs = ['COM3', 'COM4', 'COM5', 'COM6']
+    monkeypatch.setattr(ports, 'candidate_ports', lambda kw=None: devs)
+    monkeypatch.setattr(ports, 'probe_port_is_robot',
+                        _fake_probe({'COM6', 'COM4'}, {'COM6': 0.01, 'COM4': 0.05}))
+
+    assert ports.autodetect_robot_ports() == ['COM4', 'COM6']
+
+
+def test_autodetect_global_deadline(monkeypatch):
+    import time
+    from pyallcode.comm import ports
+
+    monkeypatch.setattr(ports, 'candidate_ports', lambda kw=None: ['COM3', 'COM4'])
+    monkeypatch.setattr(ports, 'probe_port_is_robot', _fake_probe({'COM3'}, {'COM3': 1.0}))
+
+    start = time.monotonic()
+    assert ports.autodetect_robot_port(deadline=0.05) is None
+    assert time.monotonic() - start < 0.5
+
+
+def test_losing_probes_close_their_ports_before_autodetect_returns(monkeypatch):
+    import time
+    from pyallcode.comm import ports
+
+    opened = []
+
+    class SlowSerial:
+        """Only COM3 answers; readline waits out the port timeout like pyserial."""
+        def __init__(self, port=None, timeout=None, **_):
+            self.port, self.timeout, self.is_open = port, timeout, True
+            self.reply = b''
+            opened.append(self)
+        in_waiting = 0
+        def write(self, data):
+            if self.port == 'COM3':
+                self.reply = b'3\n'
+        def readline(self):
+            if self.reply:
+                line, self.reply = self.reply, b''
+                return line
+            time.sleep(self.timeout)
+            return b''
+        def close(self):
+            self.is_open = False
+
+    monkeypatch.setattr(ports, 'candidate_ports', lambda kw=None: ['COM4', 'COM5', 'COM3'])
+    monkeypatch.setattr(ports.serial, 'Serial', SlowSerial)
+    start = time.monotonic()
+    assert ports.autodetect_robot_port(per_port_timeout=2.0, use_cache=False) == 'COM3'
+    # The silent ports gave up at the next read slice, not after 2 s
+    assert time.monotonic() - start < 0.5
+    assert opened and not any(s.is_open for s in opened)
+
+
+def _robot_on(monkeypatch, ports, ports_list, robot_dev, probes):
+    import serial.tools.list_ports
+    monkeypatch.setattr(serial.tools.list_ports, 'comports', lambda: ports_list)
+
+    def probe(port, write_timeout=0.25, read_timeout=0.75, cancel=None):
+        # Like the real probe, a cancelled one never touches its port
+        if cancel is not None and cancel.is_set():
+            return False
+        probes.append(port)
+        return port == robot_dev
+    monkeypatch.setattr(ports, 'probe_port_is_robot', probe)
+
+
+def test_autodetect_memo_and_disk_cache(monkeypatch):
+    from pyallcode.comm import ports, port_cache
+
+    ports_list = [make_port('COM3', 'USB Serial Device', 'HWID1'),
+                  make_port('COM7', 'Bluetooth Port', 'BT-7')]
+    probes = []
+    _robot_on(monkeypatch, ports, ports_list, 'COM7', probes)
+
+    assert ports.autodetect_robot_port() == 'COM7'
+    assert 'COM7' in probes
+    assert port_cache.load_cached_port() == {'device': 'COM7', 'description': 'Bluetooth Port', 'hwid': 'BT-7'}
+
+    # same process: memo, no probing at all (the scan has joined its probes,
+    # so none of them can still be recording)
+    probes.clear()
+    assert ports.autodetect_robot_port() == 'COM7'
+    assert probes == []
+
+    # new process (memo empty): one validating probe of the cached port
+    monkeypatch.setattr(ports, '_memo', None)
+    assert ports.autodetect_robot_port() == 'COM7'
+    assert probes == ['COM7']
+
+
+def test_autodetect_cache_invalidated_on_hwid_mismatch(monkeypatch):
+    from pyallcode.comm import ports, port_cache
+
+    port_cache.save_cached_port('COM7', 'Bluetooth Port', 'OLD-HWID')
+    ports_list = [make_port('COM7', 'Bluetooth Port', 'NEW-HWID'),
+                  make_port('COM9', 'USB Serial Device', 'HWID9')]
+    probes = []
+    _robot_on(monkeypatch, ports, ports_list, 'COM9', probes)
+
+    assert ports.autodetect_robot_port() == 'COM9'
+    assert port_cache.load_cached_port()['device'] == 'COM9'
+
+    ports.forget_robot_port()
+    assert port_cache.load_cached_port() is None
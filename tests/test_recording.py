@@ -0,0 +1,116 @@
+import io
+import json
+
+import pytest
+
+
+def _record(sink, commands, **kw):
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.recording import RecordingTransport
+    from pyallcode.comm.transport import SimulatedTransport
+
+    rec = RecordingTransport(SimulatedTransport(seed=5, echo=False, **kw), sink)
+    conn = Connection(rec)
+    rec.open('COM9')
+    replies = [conn.execute(c, expect_response=not c.startswith('LED')) for c in commands]
+    conn.close()
+    return rec, replies
+
+
+COMMANDS = ['GetAPIVersion', 'ReadIR 2', 'LEDWrite 5', 'ReadMic', 'ReadAxis 0']
+
+
+def test_recording_writes_compact_jsonl():
+    buf = io.StringIO()
+    rec, _ = _record(buf, COMMANDS)
+    lines = buf.getvalue().splitlines()
+    records = [json.loads(l) for l in lines]
+    assert records[0] == {'t': 0.0, 'open': 'COM9'}
+    assert records[1]['w'] == 'GetAPIVersion\n' and records[2]['r'] == '7\n'
+    assert records[-1]['close'] == 1
+    assert ' ' not in lines[2] and rec.records_written == len(lines)
+
+
+def test_replay_serves_recorded_replies(tmp_path):
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.recording import ReplayTransport
+
+    path = str(tmp_path / 'session.jsonl.gz')
+    _, replies = _record(path, COMMANDS)
+
+    replay = ReplayTransport(path, speed=None)
+    conn = Connection(replay)
+    replay.open('ANY')
+    assert replay.port == 'COM9'
+    assert [conn.execute(c, expect_response=not c.startswith('LED')) for c in COMMANDS] == replies
+    conn.close()
+
+
+def test_replay_matches_pipelined_controller_to_sequential_recording():
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.recording import ReplayTransport
+
+    buf = io.StringIO()
+    reads = ['ReadIR 0', 'ReadIR 1', 'ReadLight']
+    _, replies = _record(buf, reads)
+    buf.seek(0)
+    replay = ReplayTransport(buf, speed=None)
+    replay.open('X')
+    assert Connection(replay).execute_many(reads) == replies
+
+
+def test_replay_detects_diverging_commands():
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.recording import ReplayMismatch, ReplayTransport
+
+    buf = io.StringIO()
+    _record(buf, ['ReadIR 0', 'ReadIR 1'])
+
+    buf.seek(0)
+    strict = ReplayTransport(buf, speed=None)
+    strict.open('X')
+    with pytest.raises(ReplayMismatch):
+        Connection(strict).execute('ReadIR 7')
+
+    buf.seek(0)
+    lenient = ReplayTransport(buf, speed=None, strict=False)
+    lenient.open('X')
+    conn = Connection(lenient)
+    conn.execute('ReadIR 7')
+    assert lenient.mismatches == [('ReadIR 0\n', 'ReadIR 7\n')]
+    conn.execute('ReadIR 1')
+    with pytest.raises(ReplayMismatch):
+        conn.execute('ReadIR 1')   # recording has ended
+
+
+def test_replay_reproduces_latency_at_chosen_speed():
+    from pyallcode.comm.clock import VirtualClock
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.recording import ReplayTransport
+    from pyallcode.sim.world import World
+
+    buf = io.StringIO()
+    _record(buf, ['Forwards 100', 'ReadIR 2'], world=World(), clock=VirtualClock())
+    latencies = {}
+    for speed in (1.0, 4.0):
+        buf.seek(0)
+        clock = VirtualClock()
+        replay = ReplayTransport(buf, speed=speed, clock=clock)
+        replay.open('X')
+        Connection(replay).execute('Forwards 100')
+        latencies[speed] = clock.now()
+    # 100 mm at 50 mm/s plus the simulated command time
+    assert latencies[1.0] == pytest.approx(2.005)
+    assert latencies[4.0] == pytest.approx(2.005 / 4)
+
+
+def test_recording_buffer_is_bounded():
+    from pyallcode.comm.recording import RecordingTransport
+    from pyallcode.comm.transport import SimulatedTransport
+
+    buf = io.StringIO()
+    rec = RecordingTransport(SimulatedTransport(echo=False), buf, buffer_records=3)
+    rec.open('X')
+    for _ in range(4):
+        rec.write(b'LEDWrite 1\n')
+    assert rec.records_written == 3 and len(buf.getvalue().splitlines()) == 3
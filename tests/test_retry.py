@@ -0,0 +1,25 @@
+def test_delays_grow_exponentially_up_to_the_cap():
+    from pyallcode.comm.retry import RetryPolicy
+    p = RetryPolicy(retries=5, backoff=0.01, factor=2.0, max_backoff=0.05, jitter=0)
+    assert [round(p.delay(n), 6) for n in range(5)] == [0.01, 0.02, 0.04, 0.05, 0.05]
+
+
+def test_jitter_stays_within_bounds_and_is_seeded():
+    from pyallcode.comm.retry import RetryPolicy
+    a = RetryPolicy(backoff=0.1, jitter=0.5, seed=3)
+    b = RetryPolicy(backoff=0.1, jitter=0.5, seed=3)
+    delays = [a.delay(0) for _ in range(50)]
+    assert delays == [b.delay(0) for _ in range(50)]
+    assert all(0.05 <= d <= 0.1 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_only_read_commands_are_retried_by_default():
+    import pytest
+    from pyallcode.comm.retry import NO_RETRY, RetryPolicy
+    p = RetryPolicy()
+    assert p.applies_to('ReadIR') and p.applies_to('GetBatteryVoltage')
+    assert not p.applies_to('Forwards') and not p.applies_to('CardWriteByte')
+    assert not NO_RETRY.applies_to('ReadIR')
+    with pytest.raises(ValueError):
+        RetryPolicy(jitter=2)
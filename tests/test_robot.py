@@ -19,15 +19,16 @@ class FakeConnection:
         self.opened_with = port
     def close(self):
         self.closed = True
-    def execute(self, command: str, expect_response: bool = True, attempts: int = 1):
+    def execute(self, command: str, expect_response: bool = True, attempts: int = 1, timeout=None):
         self.last_execute = (command.strip(), expect_response, attempts)
+        self.last_timeout = timeout
         head = command.strip().split()[0]
         if head == 'GetAPIVersion':
             return 7
         if head == 'GetBatteryVoltage':
             return 5000
-        # Return the attempts so tests can verify timeout math
-        return attempts
+        # Return the timeout so tests can verify timeout math
+        return attempts if timeout is None else timeout
 
 
 def test_robot_initialization_and_clamping(monkeypatch):
@@ -47,12 +48,18 @@ def test_robot_initialization_and_clamping(monkeypatch):
 
 def test_robot_open_close_and_verbose(monkeypatch):
     import pyallcode.robot as robot_mod
+    from pyallcode.comm import pool as pool_mod
     monkeypatch.setattr(robot_mod, 'SerialTransport', lambda *a, **k: DummyTransport())
     monkeypatch.setattr(robot_mod, 'Connection', FakeConnection)
+    # Robot.open takes its connection from the pool
+    monkeypatch.setattr(pool_mod, 'SerialTransport', lambda *a, **k: DummyTransport())
+    monkeypatch.setattr(pool_mod, 'Connection', FakeConnection)
+    monkeypatch.setattr(robot_mod, 'default_pool', pool_mod.ConnectionPool())
 
     r = robot_mod.Robot(verbose=0)
     r.open('COM9')
     assert r.conn.opened_with == 'COM9'
+    assert r.leds.conn is r.conn and r.transport is r.conn.transport
     r.set_verbose(2)
     assert r.conn.verbose == 2
     r.close()
@@ -69,14 +76,16 @@ def test_robot_queries_and_movement_timeouts(monkeypatch):
     assert r.get_api_version() == 7
     assert r.get_battery_voltage() == 5000
 
-    # movement: Forwards 100mm at 50 mm/s -> timeout = 2
-    assert r.forwards(100) == 2
-    # Backwards -100mm -> timeout uses abs -> 2
-    assert r.backwards(-100) == 2
-    # Left 90 deg at 45 deg/s -> timeout = 2
-    assert r.left(90) == 2
-    # Right -90 -> abs -> 2
-    assert r.right(-90) == 2
+    # movement: Forwards 100mm at 50 mm/s -> 2 s plus 1 s slack
+    assert r.forwards(100) == 3
+    # Backwards -100mm -> timeout uses abs -> 3
+    assert r.backwards(-100) == 3
+    # Left 90 deg at 45 deg/s -> 3
+    assert r.left(90) == 3
+    # Right -90 -> abs -> 3
+    assert r.right(-90) == 3
+    assert r.conn.last_execute == ('Right -90', True, 1)
+    assert r.conn.last_timeout == 3.0
 
 
 def test_robot_discovery_static_passthrough(monkeypatch):
@@ -90,3 +99,121 @@ def test_robot_discovery_static_passthrough(monkeypatch):
     assert robot_mod.Robot.list_available_ports() == ['A']
     assert robot_mod.Robot.list_ports_detailed() == [('A','desc','id')]
     assert robot_mod.Robot.find_robot_ports() == [{'device':'A'}]
+
+
+def test_robot_snapshot_reads_sensors_in_one_burst():
+    import pyallcode.robot as robot_mod
+    from tests.conftest import ReplyingTransport
+
+    def responder(cmd):
+        head, *args = cmd.split()
+        return {'ReadIR': 100, 'ReadLight': 42, 'ReadLine': 1, 'ReadAxis': -5}.get(head, 0) + sum(map(int, args))
+
+    r = robot_mod.Robot(autoconn=False)
+    t = ReplyingTransport(responder)
+    r.conn.transport = t
+    events = []
+    write, readline = t.write, t.readline
+    t.write = lambda data: (events.append('write'), write(data))[1]
+    t.readline = lambda: (events.append('read'), readline())[1]
+
+    snap = r.snapshot(['ir', 'light', 'line', 'accel'])
+    # every command was written before the first reply was consumed
+    assert events == ['write'] * 14 + ['read'] * 14
+    assert snap.ir == tuple(100 + i for i in range(8))
+    assert snap.light == 42
+    assert snap.line == (True, True)
+    assert snap.accel == (-5, -4, -3)
+    assert snap.mic is None and snap.buttons is None
+    assert snap.timestamp > 0
+    assert not hasattr(snap, '__dict__')
+
+
+def test_robot_full_snapshot_is_one_burst_beyond_max_in_flight():
+    import pyallcode.robot as robot_mod
+    from tests.conftest import ReplyingTransport
+
+    r = robot_mod.Robot(autoconn=False)
+    t = ReplyingTransport(lambda cmd: 1)
+    r.conn.transport = t
+    events = []
+    write, readline = t.write, t.readline
+    t.write = lambda data: (events.append('write'), write(data))[1]
+    t.readline = lambda: (events.append('read'), readline())[1]
+
+    snap = r.snapshot()
+    assert r.conn.max_in_flight == 16
+    assert events == ['write'] * 17 + ['read'] * 17
+    assert snap.buttons == (True, True)
+
+
+def test_robot_snapshot_does_not_report_lost_switch_replies_as_pressed():
+    import pyallcode.robot as robot_mod
+    from tests.conftest import ReplyingTransport
+
+    r = robot_mod.Robot(autoconn=False)
+    r.conn.transport = ReplyingTransport(lambda cmd: -1 if cmd.endswith(' 1') else 0)
+    snap = r.snapshot(['line', 'buttons'])
+    assert snap.line == (False, None)
+    assert snap.buttons == (False, None)
+
+
+def test_robot_snapshot_rejects_unknown_group():
+    import pyallcode.robot as robot_mod
+
+    r = robot_mod.Robot(autoconn=False)
+    try:
+        r.snapshot(['sonar'])
+        assert False, 'Expected ValueError'
+    except ValueError:
+        pass
+
+
+def test_robot_scheduler_routes_subsystems(monkeypatch):
+    import pyallcode.robot as robot_mod
+    monkeypatch.setattr(robot_mod, 'SerialTransport', lambda *a, **k: DummyTransport())
+    monkeypatch.setattr(robot_mod, 'Connection', FakeConnection)
+
+    r = robot_mod.Robot(autoconn=False)
+    sched = r.start_scheduler()
+    assert r.lcd.conn is sched and r.ir_sensors.conn is sched
+    assert r.get_api_version() == 7
+    r.set_motors(5, 5)
+    assert r.conn.last_execute == ('SetMotors 5 5', False, 1)
+
+    r.stop_scheduler()
+    assert r.scheduler is None and r.lcd.conn is r.conn
+
+
+def test_robot_start_move_interleaves_other_commands():
+    import pyallcode.robot as robot_mod
+    from tests.conftest import ReplyingTransport
+
+    class MovingTransport(ReplyingTransport):
+        """Holds the move's completion reply until released."""
+        def __init__(self):
+            super().__init__(lambda cmd: 100 + int(cmd.split()[1]) if cmd.startswith('ReadIR') else None)
+            self.held = []
+        def write(self, data):
+            if data.startswith(b'Forwards'):
+                self._writes.append(bytes(data))
+                self.held.append(b'1\n')
+                return
+            super().write(data)
+        def release(self):
+            self._lines.insert(0, self.held.pop(0))
+
+    r = robot_mod.Robot(autoconn=False)
+    t = MovingTransport()
+    r.conn.transport = t
+
+    move = r.start_forwards(100)
+    assert not move.poll()
+    r.lcd.print(0, 0, 'moving')
+    assert t._writes[-1] == b'LCDPrint 0 0 moving\n'
+    assert not move.done()
+
+    t.release()
+    assert r.ir_sensors.read(2) == 102
+    assert move.done() and move.result() == 1
+    assert r.conn.in_flight == 0
@@ -0,0 +1,71 @@
+import pytest
+
+
+@pytest.fixture(params=['numpy', 'array'])
+def backend(request, monkeypatch):
+    import pyallcode.sampler as sampler_mod
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(sampler_mod, '_np', None)
+    return sampler_mod
+
+
+def test_ring_buffer_window_is_contiguous_after_wrap(backend):
+    buf = backend.RingBuffer(capacity=4, channels=2)
+    for k in range(6):
+        buf.append(float(k), [k, -k])
+
+    times, values = buf.window(3)
+    assert list(times) == [3.0, 4.0, 5.0]
+    flat = values.reshape(-1).tolist() if hasattr(values, 'reshape') else values.tolist()
+    assert flat == [3, -3, 4, -4, 5, -5]
+    assert len(buf) == 4 and buf.total == 6
+    assert buf.sample(5) == (5.0, (5, -5))
+    with pytest.raises(IndexError):
+        buf.sample(1)
+
+
+def test_ring_buffer_window_is_a_view(backend):
+    buf = backend.RingBuffer(capacity=3, channels=1)
+    buf.append(1.0, [10])
+    times, _ = buf.window(1)
+    buf.append(2.0, [20])
+    buf.append(3.0, [30])
+    buf.append(4.0, [40])  # overwrites the slot the view points at
+    assert times[0] == 4.0
+
+
+def test_sampler_polls_channels_and_streams(backend):
+    from pyallcode.comm.connection import Connection
+    from tests.conftest import ReplyingTransport
+
+    counter = {'n': 0}
+
+    def responder(cmd):
+        counter['n'] += 1
+        return {'ReadAxis 2': 1000, 'ReadMic': 7}.get(cmd)
+
+    conn = Connection(ReplyingTransport(responder))
+    sampler = backend.Sampler(conn, ['accel_z', 'ReadMic'], rate_hz=500, capacity=64)
+    assert sampler.commands == ['ReadAxis 2', 'ReadMic']
+
+    with sampler:
+        received = []
+        for t, values in sampler.stream(timeout=1.0):
+            received.append((t, values))
+            if len(received) == 5:
+                break
+
+    assert [v for _, v in received] == [(1000, 7)] * 5
+    assert all(a[0] < b[0] for a, b in zip(received, received[1:]))
+    assert sampler.buffer.total >= 5
+    assert not sampler.running and sampler.error is None
+
+
+def test_sampler_validates_arguments():
+    from pyallcode.sampler import Sampler
+    with pytest.raises(ValueError):
+        Sampler(object(), [])
+    with pytest.raises(ValueError):
+        Sampler(object(), ['mic'], rate_hz=0)
@@ -0,0 +1,145 @@
+import threading
+
+
+class GatedConnection:
+    """Connection double whose first command blocks until released."""
+    def __init__(self):
+        self.executed = []
+        self.verbose = 0
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.closed = False
+    def execute(self, command, expect_response=True, attempts=1, timeout=None):
+        if not self.executed:
+            self.started.set()
+            self.gate.wait(2)
+        self.executed.append(command)
+        return len(command) if expect_response else None
+    def close(self):
+        self.closed = True
+
+
+def test_priority_for_defaults_and_overrides():
+    from pyallcode.comm.scheduler import Priority, priority_for
+
+    assert priority_for('SetMotors 10 10') == Priority.CRITICAL
+    assert priority_for('LCDPrint 0 0 hi') == Priority.LOW
+    assert priority_for('ReadIR 2') == Priority.NORMAL
+    assert priority_for('ReadIR 2', {'ReadIR': Priority.HIGH}) == Priority.HIGH
+
+
+def test_scheduler_runs_higher_priority_first_and_returns_own_reply():
+    from pyallcode.comm.scheduler import CommandScheduler
+
+    conn = GatedConnection()
+    sched = CommandScheduler(conn)
+    first = sched.submit('ReadMic')
+    assert conn.started.wait(2)
+    # queued while the writer is busy
+    lcd = sched.submit('LCDPrint 0 0 hello', expect_response=False)
+    ir = sched.submit('ReadIR 1')
+    stop = sched.submit('SetMotors 0 0', expect_response=False)
+    conn.gate.set()
+
+    assert ir.result(2) == len('ReadIR 1')
+    assert first.result(2) == len('ReadMic')
+    assert stop.result(2) is None and lcd.result(2) is None
+    assert conn.executed == ['ReadMic', 'SetMotors 0 0', 'ReadIR 1', 'LCDPrint 0 0 hello']
+
+    sched.close()
+    assert conn.closed
+    try:
+        sched.submit('ReadMic')
+        assert False, 'Expected RuntimeError after shutdown'
+    except RuntimeError:
+        pass
+
+
+def test_scheduler_as_device_connection_from_threads():
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.scheduler import CommandScheduler
+    from pyallcode.devices.ir import IRSensors
+    from tests.conftest import ReplyingTransport
+
+    t = ReplyingTransport(lambda cmd: int(cmd.split()[1]) if cmd.startswith('ReadIR') else None)
+    sched = CommandScheduler(Connection(t))
+    ir = IRSensors(sched)
+    results = {}
+
+    def worker(i):
+        results[i] = [ir.read(i) for _ in range(10)]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    sched.shutdown()
+    assert results == {i: [i] * 10 for i in range(1, 8)}
+
+
+def test_scheduler_runs_a_burst_as_one_request():
+    from pyallcode.comm.scheduler import CommandScheduler, Priority
+
+    class BurstConnection(GatedConnection):
+        def execute_many(self, commands, attempts=1, timeout=None, max_in_flight=None):
+            self.executed.append(list(commands))
+            return [len(c) for c in commands]
+
+    conn = BurstConnection()
+    sched = CommandScheduler(conn)
+    first = sched.submit('ReadMic')
+    assert conn.started.wait(2)
+    lcd = sched.submit('LCDPrint 0 0 hello', expect_response=False)
+    burst = sched.submit_many(['ReadIR 1', 'SetMotors 0 0'])
+    conn.gate.set()
+
+    # The burst takes the class of its most urgent command and is not split
+    assert burst.result(2) == [len('ReadIR 1'), len('SetMotors 0 0')]
+    assert first.result(2) and lcd.result(2) is None
+    assert conn.executed == ['ReadMic', ['ReadIR 1', 'SetMotors 0 0'], 'LCDPrint 0 0 hello']
+    assert sched.execute_many(['ReadIR 2'], priority=Priority.LOW) == [len('ReadIR 2')]
+    sched.shutdown()
+
+
+def test_robot_snapshot_goes_through_the_scheduler():
+    from pyallcode.robot import Robot
+
+    r = Robot()
+    sched = r.start_scheduler()
+    bursts = []
+    submit_many = sched.submit_many
+    sched.submit_many = lambda commands, *a, **k: (bursts.append(list(commands)), submit_many(commands, *a, **k))[1]
+    try:
+        assert r.snapshot(['ir']).ir is not None
+    finally:
+        r.stop_scheduler()
+    assert len(bursts) == 1 and all(c.startswith('ReadIR') for c in bursts[0])
+
+
+def test_submit_racing_shutdown_is_still_run():
+    import time
+    from pyallcode.comm.scheduler import CommandScheduler
+
+    class InstantConnection:
+        verbose = 0
+        def execute(self, command, expect_response=True, attempts=1, timeout=None):
+            return 1
+
+    sched = CommandScheduler(InstantConnection())
+    queue_put = sched._queue.put
+
+    def slow_put(item):
+        if item[2] is not None:
+            time.sleep(0.05)  # a submit that has passed the closed check but not yet queued
+        queue_put(item)
+    sched._queue.put = slow_put
+
+    futures = []
+    submitter = threading.Thread(target=lambda: futures.append(sched.submit('ReadIR 1')))
+    submitter.start()
+    time.sleep(0.01)
+    sched.shutdown()
+    submitter.join(2)
+    # The accepted command ran before the writer exited instead of hanging
+    assert futures[0].result(1) == 1
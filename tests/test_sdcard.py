@@ -2,8 +2,8 @@ class FakeConnection:
     def __init__(self):
         self.calls = []
         self.to_return = []
-    def execute(self, command: str, expect_response: bool = True, attempts: int = 1):
-        self.calls.append((command, expect_response, attempts))
+    def execute(self, command: str, expect_response: bool = True, attempts: int = 1, timeout=None):
+        self.calls.append((command, expect_response, attempts if timeout is None else timeout))
         return self.to_return.pop(0) if self.to_return else None
 
 
@@ -58,3 +58,182 @@ def test_sdcard_record_and_playback_and_bitmap():
     assert conn.calls[1] == ('CardPlayback rec.wav', True, 50)
     # filename quoted
     assert conn.calls[2][0] == 'CardBitmap 1 2 "image name.bmp"'
+
+
+def _sim_card():
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.transport import SimulatedTransport
+    from pyallcode.devices.sdcard import SDCard
+    from pyallcode.sim.engine import SimRobot
+    robot = SimRobot(seed=1)
+    t = SimulatedTransport(robot=robot, echo=False)
+    t.open('SIM')
+    return SDCard(Connection(t)), robot, t
+
+
+def test_upload_batches_writes_and_round_trips_with_download():
+    import io
+    import zlib
+    data = bytes(range(256)) * 20 + b'tail'
+    sd, robot, t = _sim_card()
+    writes = []
+    write = t.write
+    t.write = lambda d: (writes.append(d), write(d))
+    seen = []
+
+    stats = sd.upload(memoryview(data), 'img.bmp', chunk_size=1024,
+                      progress=lambda n, total: seen.append((n, total)), verify=True)
+    assert bytes(robot.files['img.bmp']) == data
+    assert stats.size == len(data) and stats.crc32 == zlib.crc32(data)
+    # one write per chunk, not per byte (plus CardCreate and the verify reads)
+    assert sum(1 for w in writes if w.startswith(b'CardWriteByte')) == 6
+    assert seen[-1] == (len(data), len(data)) and len(seen) == 6
+
+    out = io.BytesIO()
+    stats = sd.download('img.bmp', out, window=100, expected_crc32=zlib.crc32(data))
+    assert out.getvalue() == data and stats.size == len(data)
+    assert stats.bytes_per_second > 0
+
+
+def test_upload_from_file_object_and_download_to_path(tmp_path):
+    import io
+    sd, robot, t = _sim_card()
+    sd.upload(io.BytesIO(b'hello card'), 'a.txt')
+    path = tmp_path / 'a.txt'
+    sd.download('a.txt', str(path), size=10)
+    assert path.read_bytes() == b'hello card'
+    assert sd.download_bytes('a.txt') == b'hello card'
+
+
+def test_download_errors():
+    import io
+    import pytest
+    from pyallcode.devices.sdcard import SDTransferError
+    sd, robot, t = _sim_card()
+    robot.files['short.bin'] = bytearray(b'abc')
+    with pytest.raises(SDTransferError):
+        sd.download('missing.bin', io.BytesIO())
+    with pytest.raises(SDTransferError):
+        sd.download('short.bin', io.BytesIO(), size=10)
+    with pytest.raises(SDTransferError):
+        sd.download('short.bin', io.BytesIO(), expected_crc32=0)
+
+
+def test_download_fails_on_a_lost_read_instead_of_truncating():
+    import io
+    import pytest
+    from pyallcode.devices.sdcard import SDTransferError
+    sd, robot, t = _sim_card()
+    robot.files['log.txt'] = bytearray(b'0123456789' * 10)
+    reads = []
+    write = t.write
+
+    def flaky(data):
+        if data.startswith(b'CardReadByte'):
+            reads.append(data)
+            if len(reads) == 40:
+                return  # lost on the way: no reply ever comes
+        write(data)
+    t.write = flaky
+    # Without a size, only a -1 reply may end the file
+    with pytest.raises(SDTransferError, match='timed out'):
+        sd.download('log.txt', io.BytesIO())
+
+
+def test_open_file_works_with_standard_library_consumers():
+    import io
+    import shutil
+    import wave
+    sd, robot, t = _sim_card()
+
+    frames = bytes(range(200)) * 5
+    with sd.open_file('tone.wav', 'wb') as f:
+        with wave.open(f, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(1)
+            w.setframerate(8000)
+            w.setnframes(len(frames))
+            w.writeframes(frames)
+    assert bytes(robot.files['tone.wav'][:4]) == b'RIFF'
+
+    with sd.open_file('tone.wav', 'rb', buffering=128) as f:
+        with wave.open(f, 'rb') as w:
+            assert w.getframerate() == 8000
+            assert w.readframes(w.getnframes()) == frames
+
+    out = io.BytesIO()
+    with sd.open_file('tone.wav') as f:
+        shutil.copyfileobj(f, out)
+    assert out.getvalue() == bytes(robot.files['tone.wav'])
+
+
+def test_sdcard_file_reads_ahead_in_bursts_and_seeks():
+    import io
+    from pyallcode.devices.sdcard import SDCardFile
+    sd, robot, t = _sim_card()
+    robot.files['data.bin'] = bytearray(range(100))
+
+    f = sd.open_file('data.bin', buffering=0, size=100)
+    assert isinstance(f, SDCardFile) and f.seekable()
+    assert f.read(10) == bytes(range(10))
+    assert f.seek(50) == 50 and f.read(5) == bytes(range(50, 55))
+    assert f.seek(-10, io.SEEK_END) == 90 and f.read() == bytes(range(90, 100))
+    assert f.seek(5) == 5 and f.read(2) == bytes([5, 6])
+    f.close()
+
+    with sd.open_file('out.bin', 'wb', buffering=64) as w:
+        for i in range(100):
+            w.write(bytes([i]))
+        assert w.tell() == 100
+    assert bytes(robot.files['out.bin']) == bytes(range(100))
+    try:
+        sd.open_file('x.bin', 'a')
+        assert False, 'Expected ValueError'
+    except ValueError:
+        pass
+
+
+def test_default_simulator_models_the_card_and_reads_stop():
+    import pytest
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.transport import SimulatedTransport
+    from pyallcode.devices.sdcard import SDCard, SDTransferError
+    t = SimulatedTransport(echo=False)
+    t.open('SIM')
+    sd = SDCard(Connection(t))
+    sd.upload(b'hello', 'A.BIN')
+    assert sd.download_bytes('A.BIN') == b'hello'
+    assert sd.download_bytes('A.BIN', max_size=5) == b'hello'
+
+    # A card that never reports the end of a file is cut off at max_size
+    handle = t.card.handle
+    t.card.handle = lambda cmd: 5 if cmd.startswith('CardReadByte') else handle(cmd)
+    with pytest.raises(SDTransferError):
+        sd.download_bytes('A.BIN', max_size=100)
+    # ... and a failed create is reported instead of uploading into nothing
+    t.card.handle = lambda cmd: 0 if cmd.startswith('CardCreate') else handle(cmd)
+    with pytest.raises(SDTransferError):
+        sd.upload(b'data', 'B.BIN')
+
+
+def test_download_keeps_its_window_in_flight():
+    import io
+    sd, robot, t = _sim_card()
+    robot.files['big.bin'] = bytearray(300)
+    outstanding = [0, 0]
+    write, readline = t.write, t.readline
+
+    def counting_write(data):
+        outstanding[0] += data.count(b'CardReadByte')
+        outstanding[1] = max(outstanding[1], outstanding[0])
+        write(data)
+
+    def counting_readline():
+        # CardOpen's reply is read before any CardReadByte is sent
+        outstanding[0] = max(0, outstanding[0] - 1)
+        return readline()
+
+    t.write, t.readline = counting_write, counting_readline
+    assert sd.conn.max_in_flight == 16
+    sd.download('big.bin', io.BytesIO(), size=300, window=64)
+    assert outstanding[1] == 64 and sd.conn.max_in_flight == 16
@@ -0,0 +1,101 @@
+import math
+
+
+def test_world_ray_and_line_queries():
+    from pyallcode.sim.world import World
+
+    world = World(width=1000, height=1000, lines=[[0, 500, 1000, 500]], line_width=20)
+    # facing +x from the middle: boundary wall at x=1000
+    assert math.isclose(world.ray_distance(500, 500, 0, 2000), 500)
+    assert world.ray_distance(500, 500, 0, 100) == 100
+    assert world.on_line(300, 505) and not world.on_line(300, 520)
+    assert math.isclose(world.clearance(100, 500), 100)
+
+
+def test_world_from_dict_and_file(tmp_path):
+    import json
+    from pyallcode.sim.world import World
+
+    data = {'width': 800, 'height': 600, 'boundary': False, 'walls': [[0, 0, 10, 0]], 'light': 3000}
+    path = tmp_path / 'map.json'
+    path.write_text(json.dumps(data))
+    world = World.from_file(str(path))
+    assert world.walls == [(0.0, 0.0, 10.0, 0.0)] and world.light == 3000
+
+
+def test_sim_robot_moves_turns_and_stops_at_walls():
+    from pyallcode.sim.engine import SimRobot
+    from pyallcode.sim.world import World
+
+    bot = SimRobot(World(width=1000, height=1000), x=500, y=500, heading=0, mm_per_sec=100)
+    assert bot.handle('Forwards 200') == 1
+    assert math.isclose(bot.x, 700, abs_tol=1e-6) and math.isclose(bot.y, 500, abs_tol=1e-6)
+    assert math.isclose(bot.time, 2.0 + bot.command_time)
+
+    bot.handle('Left 90')
+    assert math.isclose(bot.heading, 90)
+    bot.handle('Forwards 5000')
+    # stopped one body radius from the top wall
+    assert bot.collisions == 1
+    assert math.isclose(bot.y, 1000 - bot.radius, abs_tol=5)
+
+
+def test_sim_robot_set_motors_integrates_over_time():
+    from pyallcode.sim.engine import SimRobot
+
+    bot = SimRobot(x=1000, y=1000, heading=0, mm_per_unit=2.0)
+    assert bot.handle('SetMotors 50 50') is None
+    bot.step(1.0)
+    assert math.isclose(bot.x, 1000 + 100 + 100 * bot.command_time, rel_tol=1e-6)
+    bot.handle('SetMotors -20 20')
+    bot.step(1.0)
+    assert bot.heading != 0
+
+
+def test_sim_robot_sensors_follow_the_world():
+    from pyallcode.sim.engine import SimRobot
+    from pyallcode.sim.world import World
+
+    world = World(width=1000, height=1000, lines=[[0, 539, 1000, 539]], light=1234)
+    near = SimRobot(world, x=500, y=120, heading=90, sensor_noise=0)
+    far = SimRobot(world, x=500, y=500, heading=90, sensor_noise=0)
+    # IR 6 (BACK) faces the bottom wall
+    assert near.handle('ReadIR 6') > far.handle('ReadIR 6')
+    assert far.handle('ReadIR 6') == 20
+    assert near.handle('ReadLight') == 1234
+    assert far.handle('ReadLine 0') == 1 and far.handle('ReadLine 1') == 1
+    assert near.handle('ReadLine 0') == 0
+
+
+def test_simulated_transport_with_world_is_deterministic():
+    from pyallcode.comm.connection import Connection
+    from pyallcode.comm.transport import SimulatedTransport
+    from pyallcode.sim.world import World
+
+    def run():
+        t = SimulatedTransport(world=World(), seed=42, echo=False)
+        t.open('SIM')
+        conn = Connection(t)
+        conn.execute('Forwards 100')
+        return conn.execute_many(['ReadIR 2', 'ReadMic', 'ReadAxis 2']), t.robot.y
+
+    assert run() == run()
+
+
+def test_simulated_transport_seeded_random_mode_leaves_global_rng_alone():
+    import random
+    from pyallcode.comm.transport import SimulatedTransport
+
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    t = SimulatedTransport(seed=3, echo=False)
+    t.open('SIM')
+    t.write(b'ReadIR 0\n')
+    first = t.readline()
+    assert random.random() == expected
+
+    t2 = SimulatedTransport(seed=3, echo=False)
+    t2.open('SIM')
+    t2.write(b'ReadIR 0\n')
+    assert t2.readline() == first
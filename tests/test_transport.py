@@ -133,3 +133,104 @@ def test_in_waiting_reports_zero_when_closed(monkeypatch):
     assert tr.in_waiting == 2
     tr.readline()
     assert tr.in_waiting == 1
+
+
+class StreamingSerial:
+    """Fake pyserial port that serves queued bytes through read(n)."""
+    def __init__(self, *_, port=None, **__):
+        import threading
+        self.port = port
+        self.is_open = True
+        self._buf = bytearray()
+        self._cond = threading.Condition()
+        self.readline_calls = 0
+    def feed(self, data: bytes):
+        with self._cond:
+            self._buf += data
+            self._cond.notify_all()
+    def open(self):
+        self.is_open = True
+    def close(self):
+        self.is_open = False
+        self.cancel_read()
+    def cancel_read(self):
+        with self._cond:
+            self._cond.notify_all()
+    def write(self, data: bytes):
+        pass
+    def read(self, n=1) -> bytes:
+        with self._cond:
+            if not self._buf and self.is_open:
+                self._cond.wait(0.05)
+            out = bytes(self._buf[:n])
+            del self._buf[:n]
+            return out
+    def readline(self) -> bytes:
+        self.readline_calls += 1
+        return b''
+    @property
+    def in_waiting(self):
+        return len(self._buf)
+
+
+def _wait_for(predicate, timeout=2.0):
+    import time
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_reader_thread_splits_lines_into_buffer(monkeypatch):
+    import pyallcode.comm.transport as transport_mod
+    monkeypatch.setattr(transport_mod.serial, 'Serial', StreamingSerial)
+
+    tr = transport_mod.SerialTransport(timeout=0.5, reader_thread=True)
+    tr.open('COM5')
+    try:
+        tr.raw.feed(b'12\n3')
+        assert _wait_for(lambda: tr.in_waiting == 3)
+        # partial line is not counted until its newline arrives
+        tr.raw.feed(b'4\n')
+        assert _wait_for(lambda: tr.in_waiting == 6)
+        assert tr.readline() == b'12\n'
+        assert tr.readline() == b'34\n'
+        assert tr.raw.readline_calls == 0
+    finally:
+        tr.close()
+    assert tr.is_open is False
+
+
+def test_reader_thread_readline_times_out_and_reset_is_o1(monkeypatch):
+    import pyallcode.comm.transport as transport_mod
+    monkeypatch.setattr(transport_mod.serial, 'Serial', StreamingSerial)
+
+    tr = transport_mod.SerialTransport(timeout=0.05, reader_thread=True, max_buffered_lines=2)
+    tr.open('COM5')
+    try:
+        assert tr.readline() == b''
+        tr.raw.feed(b'1\n2\n3\n')
+        assert _wait_for(lambda: tr.dropped_lines == 1)
+        assert tr.in_waiting == 4
+        tr.reset_input_buffer()
+        assert tr.in_waiting == 0
+    finally:
+        tr.close()
+
+
+def test_reader_thread_reset_drops_the_partial_line(monkeypatch):
+    import pyallcode.comm.transport as transport_mod
+    monkeypatch.setattr(transport_mod.serial, 'Serial', StreamingSerial)
+
+    tr = transport_mod.SerialTransport(timeout=0.5, reader_thread=True)
+    tr.open('COM5')
+    try:
+        import time
+        tr.raw.feed(b'12')
+        assert _wait_for(lambda: tr.raw.in_waiting == 0)
+        time.sleep(0.02)  # let the reader hold '12' as its partial line
+        tr.reset_input_buffer()
+        tr.raw.feed(b'7\n')
+        assert tr.readline() == b'7\n'
+    finally:
+        tr.close()